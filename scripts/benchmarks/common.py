@@ -0,0 +1,260 @@
+"""基准测试脚本共用工具。"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SRC_DIR = PROJECT_ROOT / "src"
+TESTS_DIR = PROJECT_ROOT / "tests"
+
+# 网关替身位于 tests/ 下，与测试共用
+for _path in (SRC_DIR, TESTS_DIR):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+ARTIFACTS_ROOT = PROJECT_ROOT / "artifacts"
+BENCHMARKS_ROOT = ARTIFACTS_ROOT / "benchmarks"
+
+# 结果文件格式版本，字段不兼容变化时递增
+RESULTS_VERSION = 1
+
+_PROC = Path("/proc")
+
+
+def slugify(value: str) -> str:
+    """将标签转换为适合文件名的短字符串。"""
+    slug = "".join(c if c.isalnum() or c in "._-" else "-" for c in value.strip())
+    return slug.strip("-._") or "run"
+
+
+def create_run_dir(script_name: str, label: str | None = None) -> Path:
+    """创建本次基准测试运行目录。"""
+    BENCHMARKS_ROOT.mkdir(parents=True, exist_ok=True)
+
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    name = f"{timestamp}-{script_name}"
+    if label:
+        name = f"{name}-{slugify(label)}"
+
+    run_dir = BENCHMARKS_ROOT / name
+    run_dir.mkdir(parents=True, exist_ok=False)
+    return run_dir
+
+
+def write_json(path: Path, payload: Any) -> None:
+    """写入 UTF-8 JSON。"""
+    path.write_text(
+        json.dumps(payload, ensure_ascii=False, indent=2) + "\n",
+        encoding="utf-8",
+    )
+
+
+def read_json(path: Path) -> Any:
+    """读取 UTF-8 JSON。"""
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def run_metadata(label: str | None, args: dict[str, Any]) -> dict[str, Any]:
+    """记录运行环境，便于比较两次结果时判断是否可比。"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+
+    return {
+        "version": RESULTS_VERSION,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "label": label or "",
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": args,
+    }
+
+
+# region 统计
+
+
+def summarize(samples_sec: list[float], errors: int = 0) -> dict[str, Any]:
+    """将耗时样本（秒）汇总为毫秒单位的分位数。"""
+    if not samples_sec:
+        return {"n": 0, "errors": errors}
+
+    ms = sorted(s * 1000 for s in samples_sec)
+    if len(ms) > 1:
+        q = statistics.quantiles(ms, n=100, method="inclusive")
+        p50, p95, p99 = q[49], q[94], q[98]
+    else:
+        p50 = p95 = p99 = ms[0]
+
+    return {
+        "n": len(ms),
+        "errors": errors,
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "min_ms": round(ms[0], 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+# endregion
+
+# region 内存
+
+
+def _read_rss_kb(pid: int) -> int:
+    try:
+        with open(_PROC / str(pid) / "status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _descendants(root: int) -> list[int]:
+    """扫描 /proc 得到 ``root`` 的所有子孙进程。"""
+    children: dict[int, list[int]] = {}
+    for entry in _PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text(encoding="ascii", errors="replace")
+        except OSError:
+            continue
+        # comm 字段可能包含空格与括号，从最后一个右括号之后解析
+        fields = stat[stat.rfind(")") + 2 :].split()
+        children.setdefault(int(fields[1]), []).append(int(entry.name))
+
+    found: list[int] = []
+    stack = [root]
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def tree_rss_kb(root: int) -> tuple[int, int]:
+    """返回 ``root`` 自身与其子孙进程（如 Chromium）的 RSS 之和（KiB）。"""
+    own = _read_rss_kb(root)
+    children = sum(_read_rss_kb(pid) for pid in _descendants(root))
+    return own, children
+
+
+class PeakRssSampler:
+    """在后台线程中定期采样进程树 RSS，记录峰值。
+
+    Linux 下读取 /proc，包含浏览器等子进程；其他平台退化为
+    ``getrusage`` 报告的本进程峰值。
+
+    Args:
+        pid: 被采样的根进程，默认为当前进程。
+        interval_sec: 采样间隔（秒）。
+    """
+
+    def __init__(self, pid: int | None = None, *, interval_sec: float = 0.05):
+        self.pid = pid or os.getpid()
+        self.interval_sec = interval_sec
+        self.peak_self_kb = 0
+        self.peak_children_kb = 0
+        self.peak_total_kb = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def supported(self) -> bool:
+        return (_PROC / str(self.pid) / "status").exists()
+
+    def sample(self) -> None:
+        own, children = tree_rss_kb(self.pid)
+        self.peak_self_kb = max(self.peak_self_kb, own)
+        self.peak_children_kb = max(self.peak_children_kb, children)
+        self.peak_total_kb = max(self.peak_total_kb, own + children)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            self.sample()
+
+    def __enter__(self) -> PeakRssSampler:
+        if self.supported:
+            self.sample()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.sample()
+        elif self.pid == os.getpid():
+            # ru_maxrss 在 Linux 上单位为 KiB，在 macOS 上为字节
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            if sys.platform == "darwin":
+                peak //= 1024
+            self.peak_self_kb = self.peak_total_kb = peak
+
+    def result(self) -> dict[str, Any]:
+        return {
+            "method": "proc" if self._thread is not None else "getrusage",
+            "peak_self_mib": round(self.peak_self_kb / 1024, 1),
+            "peak_children_mib": round(self.peak_children_kb / 1024, 1),
+            "peak_total_mib": round(self.peak_total_kb / 1024, 1),
+        }
+
+
+# endregion
+
+
+def timed(fn, *args, **kwargs) -> float:
+    """执行一次 ``fn`` 并返回耗时（秒）。"""
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def print_run_summary(script_name: str, run_dir: Path) -> None:
+    """打印产物位置。"""
+    sys.stdout.write(f"[{script_name}] 产物目录: {run_dir}\n")
+    sys.stdout.write(f"[{script_name}] 可查看: {run_dir / 'results.json'}\n")
+
+
+__all__ = [
+    "ARTIFACTS_ROOT",
+    "BENCHMARKS_ROOT",
+    "PROJECT_ROOT",
+    "RESULTS_VERSION",
+    "SRC_DIR",
+    "PeakRssSampler",
+    "create_run_dir",
+    "print_run_summary",
+    "read_json",
+    "run_metadata",
+    "summarize",
+    "timed",
+    "tree_rss_kb",
+    "write_json",
+]
@@ -0,0 +1,101 @@
+"""对比两次 ``run_benchmarks.py`` 的结果。"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any
+
+from common import RESULTS_VERSION, read_json
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="对比两次基准测试结果。")
+    parser.add_argument("baseline", type=Path, help="基线 results.json。")
+    parser.add_argument("current", type=Path, help="本次 results.json。")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="相对变化超过该比例时标记为回退（默认 0.2，即 20%%）。",
+    )
+    return parser.parse_args()
+
+
+def _load(path: Path) -> dict[str, Any]:
+    payload = read_json(path)
+    version = payload.get("meta", {}).get("version")
+    if version != RESULTS_VERSION:
+        raise SystemExit(f"{path}: 不支持的结果版本 {version}")
+    return payload
+
+
+def _change(before: float, after: float) -> float:
+    return (after - before) / before if before else 0.0
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[str]:
+    """逐项打印变化，返回超过阈值的回退项。"""
+    regressions: list[str] = []
+    base_results = baseline["results"]
+
+    for name, result in current["results"].items():
+        base = base_results.get(name)
+        if base is None or base.get("skipped") or result.get("skipped"):
+            sys.stdout.write(f"{name:<20} 无可比数据\n")
+            continue
+        if not base.get("n") or not result.get("n"):
+            sys.stdout.write(f"{name:<20} 无有效样本\n")
+            continue
+
+        cells = []
+        for metric in METRICS:
+            change = _change(base[metric], result[metric])
+            flag = ""
+            if change > threshold:
+                flag = " !"
+                regressions.append(f"{name}.{metric}")
+            cells.append(f"{metric[:3]} {result[metric]:>8.1f}ms ({change:+6.1%}){flag}")
+
+        rss_before = base["rss"]["peak_total_mib"]
+        rss_after = result["rss"]["peak_total_mib"]
+        rss_change = _change(rss_before, rss_after)
+        rss_flag = ""
+        if rss_change > threshold:
+            rss_flag = " !"
+            regressions.append(f"{name}.rss")
+        cells.append(f"RSS {rss_after:>6.1f}MiB ({rss_change:+6.1%}){rss_flag}")
+
+        sys.stdout.write(f"{name:<20} " + "  ".join(cells) + "\n")
+
+    return regressions
+
+
+def main() -> int:
+    args = parse_args()
+    baseline = _load(args.baseline)
+    current = _load(args.current)
+
+    for label, payload in (("基线", baseline), ("本次", current)):
+        meta = payload["meta"]
+        sys.stdout.write(
+            f"{label}: {meta['timestamp']} {meta['commit'] or '-'} "
+            f"{meta['label']} ({meta['platform']})\n"
+        )
+    if baseline["meta"]["platform"] != current["meta"]["platform"]:
+        sys.stdout.write("警告: 两次运行的平台不同，结果可能不可比\n")
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        sys.stdout.write(f"超过阈值的回退: {', '.join(regressions)}\n")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
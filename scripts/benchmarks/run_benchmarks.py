@@ -0,0 +1,391 @@
+"""对本地网关替身测量状态探测、登录与掉线恢复耗时。
+
+测量项：
+
+- ``probe``：``get_status`` 单次耗时；
+- ``login_http``：HTTP 引擎登录耗时；
+- ``login_browser_cold``：每次临时启动 Chromium 的浏览器引擎登录耗时；
+- ``login_browser_warm``：复用常驻浏览器的登录耗时；
+- ``recover``：保活进程运行中模拟掉线，到网关重新记录为在线的耗时；
+- ``log``：保活循环中记录一条日志（写入文件日志，含轮转与压缩）的耗时。
+
+每项同时记录进程树（含浏览器子进程）的峰值 RSS。结果写入
+``artifacts/benchmarks/<timestamp>-run_benchmarks[-label]/results.json``，
+可用 ``compare_results.py`` 与之前的结果对比。
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from common import (
+    SRC_DIR,
+    PeakRssSampler,
+    create_run_dir,
+    print_run_summary,
+    run_metadata,
+    summarize,
+    timed,
+    write_json,
+)
+
+USERNAME = "test_user"
+PASSWORD = "test_password"
+SCRIPT_NAME = "run_benchmarks"
+BENCHMARKS = (
+    "probe",
+    "login_http",
+    "login_browser_cold",
+    "login_browser_warm",
+    "recover",
+    "log",
+)
+
+
+def _reserve_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# 网关地址在导入 buaalogin_cli 时读取，必须先于导入设置
+if "BUAA_GATEWAY_URL" not in os.environ:
+    os.environ["BUAA_GATEWAY_URL"] = f"http://127.0.0.1:{_reserve_port()}"
+
+from buaalogin_cli.constants import GATEWAY_URL, LoginEngine  # noqa: E402
+from buaalogin_cli.log import LOG_FORMAT_FILE, QueuedFileSink, logger  # noqa: E402
+from buaalogin_cli.service import LoginError, WarmBrowser, login  # noqa: E402
+from buaalogin_cli.status import NetworkStatus, get_status  # noqa: E402
+from mock_gateway import MockGateway  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="对本地网关替身测量探测、登录与掉线恢复耗时。"
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=BENCHMARKS,
+        default=list(BENCHMARKS),
+        help="只运行指定测量项。",
+    )
+    parser.add_argument(
+        "--probe-runs", type=int, default=200, help="状态探测的采样次数。"
+    )
+    parser.add_argument(
+        "--login-runs", type=int, default=20, help="每种登录方式的采样次数。"
+    )
+    parser.add_argument(
+        "--recover-runs", type=int, default=10, help="掉线恢复的采样次数。"
+    )
+    parser.add_argument(
+        "--log-records", type=int, default=20000, help="日志记录的采样次数。"
+    )
+    parser.add_argument(
+        "--log-rotation",
+        type=int,
+        default=1024 * 1024,
+        help="日志测量中文件轮转的大小（字节），调小以便采样包含轮转与压缩。",
+    )
+    parser.add_argument(
+        "--recover-engine",
+        choices=[e.value for e in LoginEngine],
+        default=LoginEngine.HTTP.value,
+        help="掉线恢复测量中保活进程使用的登录引擎。",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=1,
+        help="掉线恢复测量中保活进程的检查间隔（秒）。",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="网关替身每个请求的响应延迟（秒）。",
+    )
+    parser.add_argument("--label", help="附加到输出目录名的标签。")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="结果文件路径，默认写入 artifacts/benchmarks/ 下的运行目录。",
+    )
+    return parser.parse_args()
+
+
+def chromium_available() -> bool:
+    """本机是否已安装 Playwright 的 Chromium。"""
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        return False
+    try:
+        with sync_playwright() as p:
+            return Path(p.chromium.executable_path).exists()
+    except Exception:
+        return False
+
+
+def _sample(
+    runs: int,
+    fn: Callable[[], Any],
+    *,
+    before: Callable[[], None] | None = None,
+) -> dict[str, Any]:
+    """重复执行 ``fn`` 并采样耗时与峰值 RSS，``before`` 不计入耗时。"""
+    samples: list[float] = []
+    errors = 0
+    with PeakRssSampler() as rss:
+        for _ in range(runs):
+            if before is not None:
+                before()
+            try:
+                samples.append(timed(fn))
+            except (LoginError, OSError) as e:
+                errors += 1
+                sys.stderr.write(f"  失败: {e}\n")
+    return {**summarize(samples, errors), "rss": rss.result()}
+
+
+def bench_probe(gateway: MockGateway, runs: int) -> dict[str, Any]:
+    gateway.logged_in = True
+
+    def probe() -> None:
+        if get_status().status != NetworkStatus.LOGGED_IN:
+            raise OSError("探测结果不是 LOGGED_IN")
+
+    return _sample(runs, probe)
+
+
+def bench_login(
+    gateway: MockGateway,
+    runs: int,
+    engine: LoginEngine,
+    browser: WarmBrowser | None = None,
+) -> dict[str, Any]:
+    # login 先探测状态，每次采样前先下线，确保走完整登录流程
+    return _sample(
+        runs,
+        lambda: login(USERNAME, PASSWORD, engine=engine, browser=browser),
+        before=gateway.logout,
+    )
+
+
+def bench_recover(
+    gateway: MockGateway,
+    runs: int,
+    *,
+    engine: str,
+    interval: int,
+) -> dict[str, Any]:
+    """启动 ``buaalogin run`` 子进程，测量从掉线到网关记录重新在线的耗时。
+
+    耗时包含保活进程等待下一次检查的时间，期望值约为检查间隔的一半加上
+    一次登录耗时。
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        for var in ("XDG_CONFIG_HOME", "XDG_STATE_HOME", "XDG_CACHE_HOME"):
+            env[var] = str(Path(tmp) / var.lower())
+        env["PYTHONPATH"] = os.pathsep.join(
+            [str(SRC_DIR), env.get("PYTHONPATH", "")]
+        )
+        env["BUAA_GATEWAY_URL"] = GATEWAY_URL
+
+        gateway.logout()
+        proc = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "buaalogin_cli",
+                "run",
+                "-u",
+                USERNAME,
+                "-p",
+                PASSWORD,
+                "-i",
+                str(interval),
+                "-e",
+                engine,
+                "--no-control",
+            ],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            # 首次登录包含冷启动，不计入样本
+            _wait_logged_in(gateway, timeout=60)
+            samples: list[float] = []
+            errors = 0
+            rng = random.Random(0)
+            with PeakRssSampler(proc.pid) as rss:
+                for _ in range(runs):
+                    # 在检查周期内的随机相位掉线
+                    time.sleep(rng.uniform(0, interval))
+                    gateway.logout()
+                    start = time.perf_counter()
+                    if _wait_logged_in(gateway, timeout=interval * 5 + 60):
+                        samples.append(time.perf_counter() - start)
+                    else:
+                        errors += 1
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+    return {
+        **summarize(samples, errors),
+        "rss": rss.result(),
+        "engine": engine,
+        "interval_sec": interval,
+    }
+
+
+def bench_log(runs: int, rotation_bytes: int) -> dict[str, Any]:
+    """测量保活循环记录一条文件日志的耗时。
+
+    样本中包含触发轮转的那几条，压缩在后台完成，耗时不应出现长尾。保活循环
+    中的日志是零散产生的，每条之前短暂休眠，避免紧密循环与写入线程争抢 GIL
+    而放大尾延迟。
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = QueuedFileSink(Path(tmp) / "buaalogin.log", rotation_bytes=rotation_bytes)
+        handler_id = logger.add(sink, format=LOG_FORMAT_FILE, level="DEBUG")
+        log = logger.bind(trigger="run")
+        counter = iter(range(runs))
+        try:
+            result = _sample(
+                runs,
+                lambda: log.debug(f"状态: 已登录（第 {next(counter)} 次检测）"),
+                before=lambda: time.sleep(0.0001),
+            )
+        finally:
+            logger.remove(handler_id)
+            sink.close()
+        archives = len(sink.archives())
+
+    return {**result, "rotation_bytes": rotation_bytes, "archives": archives}
+
+
+def _wait_logged_in(gateway: MockGateway, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if gateway.logged_in:
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def print_table(results: dict[str, Any]) -> None:
+    sys.stdout.write(
+        f"{'benchmark':<20} {'n':>4} {'p50':>9} {'p95':>9} {'p99':>9} "
+        f"{'peak RSS':>10}\n"
+    )
+    for name, result in results.items():
+        if result.get("skipped"):
+            sys.stdout.write(f"{name:<20} 跳过: {result['skipped']}\n")
+            continue
+        if not result["n"]:
+            sys.stdout.write(f"{name:<20} 全部失败（{result['errors']} 次）\n")
+            continue
+        sys.stdout.write(
+            f"{name:<20} {result['n']:>4} "
+            f"{result['p50_ms']:>7.3f}ms {result['p95_ms']:>7.3f}ms "
+            f"{result['p99_ms']:>7.3f}ms "
+            f"{result['rss']['peak_total_mib']:>7.1f}MiB\n"
+        )
+
+
+def main() -> int:
+    args = parse_args()
+    # 控制台日志会打乱进度输出，也会计入耗时
+    logger.remove()
+
+    gateway = MockGateway(
+        USERNAME,
+        PASSWORD,
+        port=int(GATEWAY_URL.rsplit(":", 1)[1]),
+        latency=args.latency,
+    )
+    results: dict[str, Any] = {}
+    has_chromium = None
+
+    with gateway:
+        for name in BENCHMARKS:
+            if name not in args.only:
+                continue
+            sys.stdout.write(f"[{SCRIPT_NAME}] {name}...\n")
+
+            if name.startswith("login_browser") or (
+                name == "recover" and args.recover_engine == LoginEngine.BROWSER
+            ):
+                if has_chromium is None:
+                    has_chromium = chromium_available()
+                if not has_chromium:
+                    results[name] = {"skipped": "未安装 Playwright Chromium"}
+                    continue
+
+            if name == "probe":
+                results[name] = bench_probe(gateway, args.probe_runs)
+            elif name == "login_http":
+                results[name] = bench_login(gateway, args.login_runs, LoginEngine.HTTP)
+            elif name == "login_browser_cold":
+                results[name] = bench_login(
+                    gateway, args.login_runs, LoginEngine.BROWSER
+                )
+            elif name == "login_browser_warm":
+                browser = WarmBrowser(idle_timeout_sec=0)
+                try:
+                    # 预先启动浏览器，只测量复用时的登录耗时
+                    with browser.page():
+                        pass
+                    results[name] = bench_login(
+                        gateway, args.login_runs, LoginEngine.BROWSER, browser
+                    )
+                finally:
+                    browser.close()
+            elif name == "log":
+                results[name] = bench_log(args.log_records, args.log_rotation)
+            else:
+                results[name] = bench_recover(
+                    gateway,
+                    args.recover_runs,
+                    engine=args.recover_engine,
+                    interval=args.interval,
+                )
+
+    payload = {
+        "meta": run_metadata(args.label, {**vars(args), "output": str(args.output)}),
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        write_json(args.output, payload)
+        sys.stdout.write(f"[{SCRIPT_NAME}] 结果: {args.output}\n")
+    else:
+        run_dir = create_run_dir(SCRIPT_NAME, args.label)
+        write_json(run_dir / "results.json", payload)
+        print_run_summary(SCRIPT_NAME, run_dir)
+
+    print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
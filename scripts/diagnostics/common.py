@@ -18,7 +18,7 @@ SRC_DIR = PROJECT_ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from buaalogin_cli.config import config
+from buaalogin_cli.config import get_config
 from buaalogin_cli.constants import GATEWAY_URL, LOGIN_URL, RAD_USER_INFO_URL
 
 ARTIFACTS_ROOT = PROJECT_ROOT / "artifacts"
@@ -208,7 +208,7 @@ def resolve_credentials(
     cli_password: str | None,
 ) -> dict[str, Any]:
     """按 CLI > 环境变量 > 配置文件 解析凭据。"""
-    saved = config.to_dict()
+    saved = get_config().to_dict()
 
     username, username_source = _resolve_value(
         cli_username,
@@ -0,0 +1,196 @@
+"""登录熔断器：登录反复失败时暂停或推迟自动登录
+
+- 凭据错误（密码错误、账号不存在或被禁用）重试也不会成功，反复提交还可能
+  触发网关的账号锁定：熔断器打开，直到配置文件发生变化才恢复自动登录；
+- 其他失败（网关超时、页面加载失败等）视为暂时性错误：按指数退避推迟下一次
+  自动登录，登录成功或网络恢复后复位。
+
+熔断器只约束保活循环的自动登录，控制套接字转来的手动登录请求照常执行。
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Callable
+from enum import StrEnum
+from pathlib import Path
+
+from msgspec import Struct
+
+from .constants import CONFIG_FILE
+from .log import logger
+
+# 暂时性错误的首次退避时间与上限（秒）
+BACKOFF_BASE_SEC = 30.0
+BACKOFF_MAX_SEC = 1800.0
+
+# 深澜网关表示凭据无效的错误码与关键词（小写比较）
+_CREDENTIAL_MARKERS = (
+    "e2531",  # User not found
+    "e2553",  # Password is error
+    "e2606",  # User is disabled
+    "e2901",  # 第三方认证（LDAP）失败，通常为密码错误
+    "password is error",
+    "user not found",
+    "ldap_bind error",
+    "密码错误",
+    "用户不存在",
+    "账号不存在",
+    "用户已禁用",
+)
+
+
+class FailureKind(StrEnum):
+    """登录失败类型。"""
+
+    CREDENTIAL = "credential"  # 凭据错误，需修改配置
+    TRANSIENT = "transient"  # 暂时性错误，可退避重试
+
+
+class BreakerState(StrEnum):
+    """熔断器状态。"""
+
+    CLOSED = "closed"  # 正常自动登录
+    BACKOFF = "backoff"  # 暂时性错误，等待退避结束
+    OPEN = "open"  # 凭据错误，等待配置变化
+
+
+class BreakerStatus(Struct, frozen=True, gc=False, omit_defaults=True):
+    """熔断器状态快照，供 `status` 命令展示。
+
+    Attributes:
+        state: 熔断器状态。
+        failures: 连续失败次数。
+        retry_at: 退避结束时间（Unix 时间戳，秒），仅 ``backoff`` 状态有值。
+        error: 最近一次失败原因。
+    """
+
+    state: BreakerState = BreakerState.CLOSED
+    failures: int = 0
+    retry_at: float | None = None
+    error: str | None = None
+
+
+def classify(error: str) -> FailureKind:
+    """根据错误信息判断登录失败类型。"""
+    text = error.lower()
+    if any(marker in text for marker in _CREDENTIAL_MARKERS):
+        return FailureKind.CREDENTIAL
+    return FailureKind.TRANSIENT
+
+
+def _config_stamp(path: Path) -> tuple[int, int] | None:
+    """配置文件的 (mtime_ns, size)，文件不存在时返回 None。"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class CircuitBreaker:
+    """保活循环的登录熔断器。
+
+    Args:
+        base_sec: 暂时性错误的首次退避时间（秒），之后每次失败翻倍。
+        max_sec: 退避时间上限（秒）。
+        config_path: 熔断打开后监视的配置文件，默认 `CONFIG_FILE`。
+        clock: 单调时钟，测试时可替换。
+    """
+
+    def __init__(
+        self,
+        base_sec: float = BACKOFF_BASE_SEC,
+        max_sec: float = BACKOFF_MAX_SEC,
+        *,
+        config_path: Path | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.base_sec = base_sec
+        self.max_sec = max(max_sec, base_sec)
+        self.config_path = config_path if config_path is not None else CONFIG_FILE
+        self.clock = clock
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.error: str | None = None
+        self._retry_at = 0.0
+        self._retry_wall = 0.0
+        self._stamp: tuple[int, int] | None = None
+
+    @property
+    def config_stamp(self) -> tuple[int, int] | None:
+        """熔断打开时记录的配置文件 (mtime_ns, size)。"""
+        return self._stamp
+
+    def allow(self) -> bool:
+        """当前是否允许自动登录。"""
+        if self.state == BreakerState.OPEN:
+            return False
+        return self.state == BreakerState.CLOSED or self.clock() >= self._retry_at
+
+    def retry_in(self) -> float:
+        """距退避结束的秒数，非 ``backoff`` 状态时为 0。"""
+        if self.state != BreakerState.BACKOFF:
+            return 0.0
+        return max(0.0, self._retry_at - self.clock())
+
+    def config_changed(self) -> bool:
+        """熔断打开后配置文件是否变化，每次变化只报告一次。"""
+        stamp = _config_stamp(self.config_path)
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        return True
+
+    def record_success(self) -> None:
+        if self.state != BreakerState.CLOSED:
+            self.reset("登录成功，恢复正常自动登录")
+
+    def record_failure(self, error: str) -> FailureKind:
+        """记录一次登录失败，按失败类型打开熔断或进入退避。"""
+        log = logger.bind(trigger="run")
+        kind = classify(error)
+        self.failures += 1
+        self.error = error
+
+        if kind == FailureKind.CREDENTIAL:
+            if self.state != BreakerState.OPEN:
+                self._stamp = _config_stamp(self.config_path)
+                log.error(f"账号或密码错误，已暂停自动登录，修改配置后恢复（{error}）")
+            self.state = BreakerState.OPEN
+            return kind
+        if self.state == BreakerState.OPEN:
+            return kind  # 凭据仍未修改，保持熔断
+
+        delay = min(self.max_sec, self.base_sec * 2 ** (self.failures - 1))
+        self.state = BreakerState.BACKOFF
+        self._retry_at = self.clock() + delay
+        self._retry_wall = time.time() + delay
+        log.warning(f"已连续登录失败 {self.failures} 次，{delay:g} 秒后再自动登录")
+        return kind
+
+    def reset(self, reason: str) -> None:
+        """复位为正常状态。"""
+        if self.state != BreakerState.CLOSED:
+            logger.bind(trigger="run").info(reason)
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.error = None
+        self._stamp = None
+
+    def status(self) -> BreakerStatus:
+        retry_at = self._retry_wall if self.state == BreakerState.BACKOFF else None
+        return BreakerStatus(self.state, self.failures, retry_at, self.error)
+
+    def restore(
+        self, status: BreakerStatus, config_stamp: tuple[int, int] | None = None
+    ) -> None:
+        """从上次保存的状态恢复，退避结束时间按墙上时钟换算。"""
+        self.state = status.state
+        self.failures = status.failures
+        self.error = status.error
+        self._stamp = config_stamp if status.state == BreakerState.OPEN else None
+        if status.state == BreakerState.BACKOFF:
+            self._retry_wall = status.retry_at or time.time()
+            self._retry_at = self.clock() + max(0.0, self._retry_wall - time.time())
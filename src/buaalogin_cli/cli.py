@@ -1,11 +1,26 @@
-"""BUAA 校园网自动登录 CLI 工具"""
+"""BUAA 校园网自动登录 CLI 工具
+
+为缩短启动时间，Playwright、requests、日志等较重的依赖只在需要它们的
+子命令内部导入，`buaalogin -h`、`config show` 等命令不会加载。
+"""
+
+import time
+from typing import TYPE_CHECKING
 
 import typer
 
-from . import service, startup
-from .config import config
-from .constants import CONFIG_FILE, LOG_FILE
-from .log import setup_console
+from .config import Config, get_config
+from .constants import (
+    CONFIG_FILE,
+    LOG_FILE,
+    LOG_JSON_FILE,
+    LoginEngine,
+    PollPolicy,
+    ResourceProfile,
+)
+
+if TYPE_CHECKING:
+    from .breaker import BreakerStatus
 
 app = typer.Typer(
     help="BUAA 校园网自动登录工具",
@@ -13,6 +28,9 @@ app = typer.Typer(
     context_settings={"help_option_names": ["-h", "--help"]},
 )
 
+# 是否输出 DEBUG 日志，由全局 --verbose 选项设置
+_verbose = False
+
 
 @app.callback(invoke_without_command=True)
 def callback(
@@ -24,17 +42,21 @@ def callback(
     在任何子命令执行前调用，加载配置文件并设置默认参数值。
     如果未指定子命令则显示帮助信息。
     """
-    # 设置日志级别
-    setup_console(verbose=verbose)
+    global _verbose
 
-    # 这些值会覆盖子命令中的参数默认值
-    file_config = config.to_dict()
+    # 日志在需要的子命令中通过 `_setup_logging` 配置
+    _verbose = verbose
 
-    # 子命令会继承配置文件的值（如果命令行未显式指定参数）
-    ctx.default_map = {
-        "login": file_config,
-        "run": file_config,
-    }
+    # 只有 login / run 需要读取配置文件作为参数默认值
+    if ctx.invoked_subcommand in ("login", "run"):
+        # 这些值会覆盖子命令中的参数默认值
+        file_config = get_config().to_dict()
+
+        # 子命令会继承配置文件的值（如果命令行未显式指定参数）
+        ctx.default_map = {
+            "login": file_config,
+            "run": file_config,
+        }
 
     # 若未指定子命令，显示帮助信息后退出
     if ctx.invoked_subcommand is None:
@@ -44,6 +66,7 @@ def callback(
 
 @app.command("login")
 def login_cmd(
+    ctx: typer.Context,
     username: str | None = typer.Option(
         None,
         "--user",
@@ -67,13 +90,44 @@ def login_cmd(
         "--headless/--headed",
         help="是否使用无头模式运行浏览器",
     ),
+    engine: LoginEngine = typer.Option(
+        LoginEngine.BROWSER,
+        "--engine",
+        "-e",
+        envvar="BUAA_LOGIN_ENGINE",
+        help="登录引擎：browser 模拟浏览器，http 直接调用认证接口",
+    ),
+    resource_filter: ResourceProfile = typer.Option(
+        ResourceProfile.DEFAULT,
+        "--resource-filter",
+        envvar="BUAA_RESOURCE_FILTER",
+        help="登录页请求过滤：off 不过滤，default 拦截图片/字体/统计脚本，strict 另拦截样式",
+    ),
+    login_timeout: float = typer.Option(
+        15,
+        "--login-timeout",
+        envvar="BUAA_LOGIN_TIMEOUT",
+        metavar="秒",
+        min=1,
+        help="提交登录后等待结果的最长时间（秒）",
+    ),
+    direct: bool = typer.Option(
+        False, "--direct", help="不交给运行中的保活进程，直接在本进程登录"
+    ),
 ):
     """执行单次登录。"""
-    _do_login_cmd(username, password, headless)
+    # 保活进程用自己的账号与设置登录，命令行指定了这些参数时不交给它
+    explicit = _params_from(ctx, LOGIN_PARAMS, "COMMANDLINE")
+    if not direct and explicit:
+        typer.echo(f"命令行指定了 {', '.join(explicit)}，直接在本进程登录")
+    elif not direct and _login_via_daemon(login_timeout):
+        return
+    _do_login_cmd(username, password, headless, engine, resource_filter, login_timeout)
 
 
 @app.command("run")
 def run_cmd(
+    ctx: typer.Context,
     username: str | None = typer.Option(
         None,
         "--user",
@@ -106,6 +160,102 @@ def run_cmd(
         "--headless/--headed",
         help="是否使用无头模式运行浏览器",
     ),
+    engine: LoginEngine = typer.Option(
+        LoginEngine.BROWSER,
+        "--engine",
+        "-e",
+        envvar="BUAA_LOGIN_ENGINE",
+        help="登录引擎：browser 模拟浏览器，http 直接调用认证接口",
+    ),
+    warm_browser: bool = typer.Option(
+        False,
+        "--warm-browser/--no-warm-browser",
+        envvar="BUAA_WARM_BROWSER",
+        help="在多次登录之间复用常驻浏览器（仅 browser 引擎）",
+    ),
+    browser_idle: int = typer.Option(
+        10,
+        "--browser-idle",
+        envvar="BUAA_BROWSER_IDLE",
+        metavar="分钟",
+        min=0,
+        help="常驻浏览器空闲多久后释放（分钟），0 表示不释放",
+    ),
+    resource_filter: ResourceProfile = typer.Option(
+        ResourceProfile.DEFAULT,
+        "--resource-filter",
+        envvar="BUAA_RESOURCE_FILTER",
+        help="登录页请求过滤：off 不过滤，default 拦截图片/字体/统计脚本，strict 另拦截样式",
+    ),
+    login_timeout: float = typer.Option(
+        15,
+        "--login-timeout",
+        envvar="BUAA_LOGIN_TIMEOUT",
+        metavar="秒",
+        min=1,
+        help="提交登录后等待结果的最长时间（秒）",
+    ),
+    poll_policy: PollPolicy = typer.Option(
+        PollPolicy.FIXED,
+        "--poll-policy",
+        envvar="BUAA_POLL_POLICY",
+        help="轮询策略：fixed 固定间隔，adaptive 掉线后快速复查、离线时指数退避",
+    ),
+    max_interval: int = typer.Option(
+        600,
+        "--max-interval",
+        envvar="BUAA_MAX_INTERVAL",
+        metavar="秒",
+        min=1,
+        help="adaptive 策略下退避间隔的上限（秒）",
+    ),
+    watch_network: bool = typer.Option(
+        False,
+        "--watch-network/--no-watch-network",
+        envvar="BUAA_WATCH_NETWORK",
+        help="监听网卡、地址和路由变化，变化时立即检测（仅 Linux）",
+    ),
+    control_socket: bool = typer.Option(
+        True,
+        "--control/--no-control",
+        envvar="BUAA_CONTROL_SOCKET",
+        help="开放控制套接字，供 status / login 命令直接读取保活状态",
+    ),
+    isolate_login: bool = typer.Option(
+        False,
+        "--isolate-login/--no-isolate-login",
+        envvar="BUAA_ISOLATE_LOGIN",
+        help="每次浏览器登录在独立子进程中执行，避免保活进程内存增长或被卡死",
+    ),
+    login_deadline: float = typer.Option(
+        90,
+        "--login-deadline",
+        envvar="BUAA_LOGIN_DEADLINE",
+        metavar="秒",
+        min=1,
+        help="隔离登录子进程的最长运行时间（秒），超时连同浏览器强制结束",
+    ),
+    login_memory_limit: int = typer.Option(
+        0,
+        "--login-memory-limit",
+        envvar="BUAA_LOGIN_MEMORY_LIMIT",
+        metavar="MiB",
+        min=0,
+        help="隔离登录子进程的虚拟内存上限（MiB），0 表示不限制",
+    ),
+    metrics: str | None = typer.Option(
+        None,
+        "--metrics",
+        envvar="BUAA_METRICS",
+        metavar="[主机:]端口",
+        help="开放 OpenMetrics 指标端点 /metrics（如 9464 或 0.0.0.0:9464）",
+    ),
+    json_log: bool = typer.Option(
+        False,
+        "--json-log/--no-json-log",
+        envvar="BUAA_JSON_LOG",
+        help="同时写入 JSON Lines 日志（每行一条记录），供日志采集程序解析",
+    ),
 ):
     """持续保持在线，定期检测并自动重连。"""
 
@@ -119,7 +269,45 @@ def run_cmd(
         typer.echo("  3. 设置环境变量: BUAA_USERNAME, BUAA_PASSWORD")
         raise typer.Exit(1)
 
-    service.keep_alive(username, passwd, interval, headless=headless)
+    from . import locking, service
+
+    # 同一用户配置下只允许一个保活进程，锁随进程退出释放
+    daemon_lock = locking.FileLock(locking.DAEMON_LOCK)
+    try:
+        acquired = daemon_lock.acquire()
+    except OSError:
+        acquired = True  # 无法创建锁文件时不阻止运行
+    if not acquired:
+        typer.secho(
+            f"❌ 已有保活进程在运行（PID {daemon_lock.holder_pid()}）",
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(1)
+
+    _setup_logging(json_log)
+    service.keep_alive(
+        username,
+        passwd,
+        interval,
+        headless=headless,
+        engine=engine,
+        warm_browser=warm_browser,
+        browser_idle_sec=browser_idle * 60,
+        resource_filter=resource_filter,
+        login_timeout_sec=login_timeout,
+        poll_policy=poll_policy,
+        max_interval_sec=max_interval,
+        watch_network=watch_network,
+        control_socket=control_socket,
+        isolate_login=isolate_login,
+        login_deadline_sec=login_deadline,
+        login_memory_limit_mb=login_memory_limit,
+        metrics_listen=metrics,
+        # 命令行与环境变量优先于配置文件，热更新时不覆盖
+        overrides=frozenset(
+            _params_from(ctx, Config.__struct_fields__, "COMMANDLINE", "ENVIRONMENT")
+        ),
+    )
 
 
 # region config
@@ -132,7 +320,7 @@ app.add_typer(config_app, name="config")
 def config_show():
     """显示当前配置。"""
     typer.secho(f"配置文件: {CONFIG_FILE}", fg=typer.colors.CYAN)
-    saved = config.to_dict()
+    saved = get_config().to_dict()
     if saved:
         for key, value in saved.items():
             typer.echo(f"  {key} = {value}")
@@ -151,10 +339,85 @@ def config_set(
     interval: int | None = typer.Option(
         None, "--interval", "-i", metavar="秒", min=1, help="保活检测间隔（秒）"
     ),
+    engine: LoginEngine | None = typer.Option(
+        None, "--engine", "-e", help="登录引擎：browser 或 http"
+    ),
+    warm_browser: bool | None = typer.Option(
+        None,
+        "--warm-browser/--no-warm-browser",
+        help="保活时复用常驻浏览器",
+        show_default=False,
+    ),
+    browser_idle: int | None = typer.Option(
+        None, "--browser-idle", metavar="分钟", min=0, help="常驻浏览器空闲释放时间"
+    ),
+    resource_filter: ResourceProfile | None = typer.Option(
+        None, "--resource-filter", help="登录页请求过滤：off、default 或 strict"
+    ),
+    login_timeout: float | None = typer.Option(
+        None, "--login-timeout", metavar="秒", min=1, help="等待登录结果的最长时间"
+    ),
+    poll_policy: PollPolicy | None = typer.Option(
+        None, "--poll-policy", help="保活轮询策略：fixed 或 adaptive"
+    ),
+    max_interval: int | None = typer.Option(
+        None, "--max-interval", metavar="秒", min=1, help="adaptive 退避间隔上限"
+    ),
+    watch_network: bool | None = typer.Option(
+        None,
+        "--watch-network/--no-watch-network",
+        help="保活时监听网络变化并立即检测",
+        show_default=False,
+    ),
+    isolate_login: bool | None = typer.Option(
+        None,
+        "--isolate-login/--no-isolate-login",
+        help="保活时在独立子进程中执行浏览器登录",
+        show_default=False,
+    ),
+    login_deadline: float | None = typer.Option(
+        None, "--login-deadline", metavar="秒", min=1, help="隔离登录子进程最长运行时间"
+    ),
+    login_memory_limit: int | None = typer.Option(
+        None,
+        "--login-memory-limit",
+        metavar="MiB",
+        min=0,
+        help="隔离登录子进程内存上限",
+    ),
+    metrics: str | None = typer.Option(
+        None, "--metrics", metavar="[主机:]端口", help="保活时的指标端点监听地址"
+    ),
+    json_log: bool | None = typer.Option(
+        None,
+        "--json-log/--no-json-log",
+        help="同时写入 JSON Lines 日志",
+        show_default=False,
+    ),
 ):
     """设置配置项。不带参数时交互式输入。"""
     # 判断是否提供了任何参数
-    no_args_provided = username is None and password is None and interval is None
+    no_args_provided = all(
+        value is None
+        for value in (
+            username,
+            password,
+            interval,
+            engine,
+            warm_browser,
+            browser_idle,
+            resource_filter,
+            login_timeout,
+            poll_policy,
+            max_interval,
+            watch_network,
+            isolate_login,
+            login_deadline,
+            login_memory_limit,
+            metrics,
+            json_log,
+        )
+    )
 
     # 只有当没有提供任何参数时，才进入交互式输入模式
     if no_args_provided:
@@ -168,12 +431,39 @@ def config_set(
             password = typer.prompt("请输入密码")
 
     # 更新配置并保存（只更新提供的配置项）
+    config = get_config()
     if username is not None:
         config.username = username
     if password is not None:
         config.password = password
     if interval is not None:
         config.interval = interval
+    if engine is not None:
+        config.engine = engine
+    if warm_browser is not None:
+        config.warm_browser = warm_browser
+    if browser_idle is not None:
+        config.browser_idle = browser_idle
+    if resource_filter is not None:
+        config.resource_filter = resource_filter
+    if login_timeout is not None:
+        config.login_timeout = login_timeout
+    if poll_policy is not None:
+        config.poll_policy = poll_policy
+    if max_interval is not None:
+        config.max_interval = max_interval
+    if watch_network is not None:
+        config.watch_network = watch_network
+    if isolate_login is not None:
+        config.isolate_login = isolate_login
+    if login_deadline is not None:
+        config.login_deadline = login_deadline
+    if login_memory_limit is not None:
+        config.login_memory_limit = login_memory_limit
+    if metrics is not None:
+        config.metrics = metrics
+    if json_log is not None:
+        config.json_log = json_log
 
     config.save_to_json(CONFIG_FILE)
     typer.secho("✅ 配置已保存!", fg=typer.colors.GREEN)
@@ -184,14 +474,165 @@ def config_set(
 
 
 @app.command("status")
-def status_cmd():
-    """检查当前网络连接状态。"""
-    if service.get_status() == service.NetworkStatus.LOGGED_IN:
-        typer.secho("✅ 网络正常", fg=typer.colors.GREEN)
-        raise typer.Exit(0)
+def status_cmd(
+    as_json: bool = typer.Option(
+        False, "--json", help="以 JSON 输出探测结果（账号、在线时长、流量、IP）"
+    ),
+    direct: bool = typer.Option(
+        False, "--direct", help="不读取运行中保活进程的结果，直接探测"
+    ),
+):
+    """检查当前网络连接状态。
+
+    有保活进程在运行时，直接返回其最近一次探测结果，不再访问网关。
+    """
+    from msgspec import json as msgjson
+
+    from . import control
+    from .status import NetworkStatus
+
+    response = None if direct else control.request(control.Command.LAST_PROBE)
+    if response is not None and response.probe is not None:
+        info = response.probe.info
     else:
-        typer.secho("❌ 未登录或无法访问外网", fg=typer.colors.RED)
-        raise typer.Exit(1)
+        from .status import get_status
+
+        _setup_logging()
+        response = None
+        info = get_status()
+    logged_in = info.status == NetworkStatus.LOGGED_IN
+
+    if as_json:
+        typer.echo(msgjson.encode(info).decode())
+    else:
+        if logged_in:
+            typer.secho("✅ 网络正常", fg=typer.colors.GREEN)
+        else:
+            typer.secho("❌ 未登录或无法访问外网", fg=typer.colors.RED)
+        if response is not None and response.probe is not None:
+            age = max(0.0, time.time() - response.probe.at)
+            typer.echo(f"   来自保活进程 (PID {response.pid})，{age:.0f} 秒前检测")
+        if response is not None and response.breaker is not None:
+            _echo_breaker(response.breaker)
+    raise typer.Exit(0 if logged_in else 1)
+
+
+@app.command("stats")
+def stats_cmd(
+    days: float = typer.Option(
+        30, "--days", "-d", min=0, help="统计最近多少天，0 表示全部记录"
+    ),
+    as_json: bool = typer.Option(False, "--json", help="以 JSON 输出统计结果"),
+):
+    """统计保活期间的在线率、掉线次数与恢复时间。"""
+    from msgspec import json as msgjson
+
+    from . import ledger, locking
+
+    # 只读取保活进程锁中的 PID，不获取锁，以免与同时启动的 run 冲突
+    running = locking.FileLock(locking.DAEMON_LOCK).holder_alive()
+    report = ledger.summarize(days or None, running=running)
+    if as_json:
+        typer.echo(msgjson.encode(report).decode())
+        return
+
+    if report.start is None:
+        typer.echo("统计区间: 全部记录")
+    else:
+        since = time.strftime("%Y-%m-%d %H:%M", time.localtime(report.start))
+        typer.echo(f"统计区间: 最近 {days:g} 天（{since} 起）")
+    if report.uptime is None:
+        typer.secho("⚪ 暂无保活记录", fg=typer.colors.YELLOW)
+        return
+
+    color = typer.colors.GREEN if report.uptime >= 0.99 else typer.colors.YELLOW
+    typer.secho(
+        f"在线率: {report.uptime:.2%}（在线 {_format_duration(report.up_sec)}，"
+        f"掉线 {_format_duration(report.down_sec)}）",
+        fg=color,
+    )
+    line = f"掉线次数: {report.outages}"
+    if report.mttr_sec is not None:
+        line += f"，平均恢复时间 {_format_duration(report.mttr_sec)}"
+    typer.echo(line)
+    if report.relogins:
+        typer.echo(
+            f"重新登录耗时: p50 {report.relogin_p50:.1f} 秒，"
+            f"p95 {report.relogin_p95:.1f} 秒，p99 {report.relogin_p99:.1f} 秒"
+            f"（共 {report.relogins} 次）"
+        )
+    if report.failures:
+        names = {"credential": "凭据错误", "transient": "暂时性错误"}
+        detail = "，".join(
+            f"{names.get(kind, kind)} {count}"
+            for kind, count in sorted(report.failures.items())
+        )
+        typer.echo(f"登录失败: {sum(report.failures.values())} 次（{detail}）")
+
+
+@app.command("logs")
+def logs_cmd(
+    since: str | None = typer.Option(
+        None,
+        "--since",
+        "-s",
+        metavar="时间",
+        help="只显示该时间及之后的日志，如 2024-05-01、2024-05-01 08:00、08:00 或 2h（2 小时前）",
+    ),
+    until: str | None = typer.Option(
+        None, "--until", metavar="时间", help="只显示该时间之前的日志，格式同 --since"
+    ),
+    level: str | None = typer.Option(
+        None,
+        "--level",
+        "-l",
+        metavar="级别",
+        help="最低级别：DEBUG、INFO、SUCCESS、WARNING、ERROR",
+    ),
+    trigger: list[str] | None = typer.Option(
+        None,
+        "--trigger",
+        "-t",
+        metavar="来源",
+        help="只显示指定来源（如 run、login、status）的日志，可重复指定",
+    ),
+):
+    """查看日志，包括已轮转压缩的归档（无需解压）。"""
+    import sys
+
+    from . import logsearch
+
+    try:
+        query = logsearch.Query(
+            since=logsearch.parse_time(since) if since else None,
+            until=logsearch.parse_time(until) if until else None,
+            level=level.upper() if level else None,
+            triggers=frozenset(trigger or ()),
+        )
+    except ValueError as e:
+        raise typer.BadParameter(str(e)) from None
+    if query.level is not None and query.level not in logsearch.LEVELS:
+        raise typer.BadParameter(f"未知的日志级别: {level}", param_hint="--level")
+
+    if not logsearch.sources():
+        typer.secho("📝 尚无日志", fg=typer.colors.BLUE, err=True)
+        return
+    write = sys.stdout.write
+    try:
+        for text in logsearch.search(query):
+            write(text)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # 输出被 head 等提前关闭，不再报错
+        raise typer.Exit(0) from None
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f} 秒"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f} 分钟"
+    return f"{seconds / 3600:.1f} 小时"
 
 
 @app.command("info")
@@ -214,6 +655,10 @@ def info_cmd():
         typer.secho(f"  ✅ 文件大小: {size / 1024:.1f} KB", fg=typer.colors.GREEN)
     else:
         typer.secho("  📝 尚未生成", fg=typer.colors.BLUE)
+    if LOG_JSON_FILE.exists():
+        size = LOG_JSON_FILE.stat().st_size
+        typer.echo(f"  {LOG_JSON_FILE}")
+        typer.secho(f"  ✅ 文件大小: {size / 1024:.1f} KB", fg=typer.colors.GREEN)
 
 
 # region startup
@@ -225,6 +670,7 @@ app.add_typer(startup_app, name="startup")
 @startup_app.command("enable")
 def startup_enable():
     """启用开机自启。"""
+    from . import startup
 
     if not startup.is_admin():
         typer.secho(
@@ -243,6 +689,7 @@ def startup_enable():
 @startup_app.command("disable")
 def startup_disable():
     """禁用开机自启。"""
+    from . import startup
 
     startup.disable_startup()
     typer.secho("✅ 开机自启已禁用", fg=typer.colors.GREEN)
@@ -251,6 +698,7 @@ def startup_disable():
 @startup_app.command("status")
 def startup_status():
     """查看开机自启状态。"""
+    from . import startup
 
     if startup.is_startup_enabled():
         typer.secho("✅ 开机自启: 已启用", fg=typer.colors.GREEN)
@@ -261,10 +709,94 @@ def startup_status():
 # endregion
 
 
+def _setup_logging(json_log: bool | None = None) -> None:
+    """配置控制台日志级别并启用文件日志。
+
+    Args:
+        json_log: 是否同时写入 JSON Lines 日志，None 时取配置文件中的设置。
+    """
+    from .log import setup_console, setup_file
+
+    if json_log is None:
+        json_log = get_config().json_log is True
+    setup_console(verbose=_verbose)
+    setup_file(json_lines=json_log)
+
+
+def _echo_breaker(status: "BreakerStatus") -> None:
+    """显示保活进程的登录熔断器状态（正常时不显示）。"""
+    from .breaker import BreakerState
+
+    if status.state == BreakerState.OPEN:
+        typer.secho(
+            f"⚠️ 账号或密码错误，自动登录已暂停，修改配置后恢复: {status.error}",
+            fg=typer.colors.YELLOW,
+        )
+    elif status.state == BreakerState.BACKOFF:
+        wait = max(0.0, (status.retry_at or 0) - time.time())
+        typer.secho(
+            f"⚠️ 已连续登录失败 {status.failures} 次，"
+            f"{wait:.0f} 秒后再自动登录: {status.error}",
+            fg=typer.colors.YELLOW,
+        )
+
+
+# 影响登录方式的 login 参数
+LOGIN_PARAMS = (
+    "username",
+    "password",
+    "headless",
+    "engine",
+    "resource_filter",
+    "login_timeout",
+)
+
+
+def _params_from(
+    ctx: typer.Context, names: tuple[str, ...], *sources: str
+) -> list[str]:
+    """返回取值来自指定来源的参数名。
+
+    来源为 click ``ParameterSource`` 的成员名，如 ``COMMANDLINE``、
+    ``ENVIRONMENT``、``DEFAULT_MAP``（配置文件）。新版 typer 内置 click，
+    按名称比较以兼容两者。
+    """
+    return [
+        name
+        for name in names
+        if (source := ctx.get_parameter_source(name)) is not None
+        and source.name in sources
+    ]
+
+
+def _login_via_daemon(login_timeout: float) -> bool:
+    """请运行中的保活进程登录，没有保活进程时返回 False。"""
+    # 保活进程可能需要先启动浏览器，在登录超时之外额外留出时间
+    from . import control
+
+    response = control.request(control.Command.RELOGIN, timeout=login_timeout + 30)
+    if response is None:
+        return False
+
+    if response.error is not None:
+        typer.secho(f"❌ 登录失败: {response.error}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    if response.login is not None and not response.login.ok:
+        typer.secho(f"❌ 登录失败: {response.login.error}", fg=typer.colors.RED)
+        raise typer.Exit(1)
+    typer.secho(
+        f"✅ 登录成功（由保活进程 PID {response.pid} 完成）", fg=typer.colors.GREEN
+    )
+    return True
+
+
 def _do_login_cmd(
     cli_username: str | None,
     cli_pass: str | None,
     headless: bool = True,
+    engine: LoginEngine = LoginEngine.BROWSER,
+    resource_filter: ResourceProfile = ResourceProfile.DEFAULT,
+    login_timeout: float = 15,
 ):
     """执行单次登录的 CLI 逻辑（含错误提示）。"""
     if cli_username is None or cli_pass is None:
@@ -275,8 +807,18 @@ def _do_login_cmd(
         typer.echo("  3. 设置环境变量: BUAA_USERNAME, BUAA_PASSWORD")
         raise typer.Exit(1)
 
+    from . import service
+
+    _setup_logging()
     try:
-        service.login(cli_username, cli_pass, headless=headless)
+        service.login(
+            cli_username,
+            cli_pass,
+            headless=headless,
+            engine=engine,
+            resource_filter=resource_filter,
+            timeout_sec=login_timeout,
+        )
         typer.secho("✅ 登录成功", fg=typer.colors.GREEN)
     except service.LoginError as e:
         typer.secho(f"❌ 登录失败: {e}", fg=typer.colors.RED)
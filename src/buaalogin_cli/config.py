@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+import os
+from functools import cache
 from pathlib import Path
 from typing import Any
 
+import msgspec
 from msgspec import UNSET, Struct, UnsetType, structs
 from msgspec import json as msgjson
 
-from .constants import CONFIG_FILE
+from .constants import CONFIG_FILE, LoginEngine, PollPolicy, ResourceProfile
 
 
 class Config(Struct, omit_defaults=True):
@@ -18,11 +21,37 @@ class Config(Struct, omit_defaults=True):
         username: 校园网账号。
         password: 校园网密码。
         interval: 检测间隔（秒）。
+        engine: 登录引擎。
+        warm_browser: 保活时是否复用常驻浏览器。
+        browser_idle: 常驻浏览器空闲释放时间（分钟）。
+        resource_filter: 登录页请求过滤预设。
+        login_timeout: 提交登录后等待结果的最长时间（秒）。
+        poll_policy: 保活轮询策略。
+        max_interval: 自适应轮询的退避间隔上限（秒）。
+        watch_network: 保活时是否监听网络变化并立即检查。
+        isolate_login: 保活时是否在子进程中执行浏览器登录。
+        login_deadline: 隔离登录子进程的最长运行时间（秒）。
+        login_memory_limit: 隔离登录子进程的虚拟内存上限（MiB），0 表示不限制。
+        metrics: 保活时 OpenMetrics 指标端点的监听地址（``[主机:]端口``）。
+        json_log: 是否同时写入 JSON Lines 日志。
     """
 
     username: str | UnsetType = UNSET
     password: str | UnsetType = UNSET
     interval: int | UnsetType = UNSET
+    engine: LoginEngine | UnsetType = UNSET
+    warm_browser: bool | UnsetType = UNSET
+    browser_idle: int | UnsetType = UNSET
+    resource_filter: ResourceProfile | UnsetType = UNSET
+    login_timeout: float | UnsetType = UNSET
+    poll_policy: PollPolicy | UnsetType = UNSET
+    max_interval: int | UnsetType = UNSET
+    watch_network: bool | UnsetType = UNSET
+    isolate_login: bool | UnsetType = UNSET
+    login_deadline: float | UnsetType = UNSET
+    login_memory_limit: int | UnsetType = UNSET
+    metrics: str | UnsetType = UNSET
+    json_log: bool | UnsetType = UNSET
 
     @classmethod
     def load_from_json(cls, file_path: str | Path) -> Config:
@@ -35,13 +64,62 @@ class Config(Struct, omit_defaults=True):
 
     def save_to_json(self, file_path: Path | str) -> int:
         """保存当前配置到 JSON 文件。"""
+        path = Path(file_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
         bytes = msgjson.encode(self) + b"\n"
-        return Path(file_path).write_bytes(bytes)
+        return path.write_bytes(bytes)
 
     def to_dict(self) -> dict[str, Any]:
         """导出为字典（过滤 UNSET 值）。"""
         return {k: v for k, v in structs.asdict(self).items() if v is not UNSET}
 
 
-# 全局配置实例
-config = Config.load_from_json(CONFIG_FILE)
+@cache
+def get_config() -> Config:
+    """获取全局配置实例，首次调用时读取配置文件。"""
+    return Config.load_from_json(CONFIG_FILE)
+
+
+class ConfigWatcher:
+    """轮询配置文件的变化，供保活进程热更新配置。
+
+    每次 `poll` 只调用一次 ``os.stat``：文件的 (mtime_ns, size, inode) 未变化
+    时直接返回；变化时重新读取，整体替换 `config`。
+
+    Args:
+        path: 配置文件路径，默认 `CONFIG_FILE`。
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path if path is not None else CONFIG_FILE
+        self._stamp = self._stat()
+        try:
+            self.config = Config.load_from_json(self.path)
+        except (OSError, msgspec.DecodeError):
+            self.config = Config()
+
+    def _stat(self) -> tuple[int, int, int] | None:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def poll(self) -> dict[str, Any] | None:
+        """配置文件变化时重新读取，返回取值有变化的字段（字段名 → 新值）。
+
+        文件未变化时返回 None。删除某个字段不算变化。
+
+        Raises:
+            OSError, msgspec.DecodeError: 配置文件无法读取，文件再次变化后重试。
+        """
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        old, self.config = self.config, Config.load_from_json(self.path)
+        return {
+            name: value
+            for name, value in structs.asdict(self.config).items()
+            if value is not UNSET and value != getattr(old, name)
+        }
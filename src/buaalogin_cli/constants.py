@@ -1,17 +1,73 @@
-"""常量模块：路径、URL"""
+"""常量模块：路径、URL、枚举选项"""
 
+import os
+import warnings
+from enum import StrEnum
 from pathlib import Path
 
-from platformdirs import user_config_dir, user_log_dir
+from platformdirs import (
+    user_cache_dir,
+    user_config_dir,
+    user_log_dir,
+    user_runtime_dir,
+)
 
 APP_NAME = "buaalogin-cli"
 CLI_CMD = "buaalogin"
 
-# 文件路径
-CONFIG_FILE = Path(user_config_dir(APP_NAME, ensure_exists=True)) / "config.json"
-LOG_FILE = Path(user_log_dir(APP_NAME, ensure_exists=True)) / f"{APP_NAME}.log"
+# 文件路径（目录在首次写入时创建，导入本模块没有副作用）
+CONFIG_FILE = Path(user_config_dir(APP_NAME)) / "config.json"
+LOG_FILE = Path(user_log_dir(APP_NAME)) / f"{APP_NAME}.log"
+# 可选的 JSON Lines 日志，每行一条记录，供日志采集程序解析
+LOG_JSON_FILE = LOG_FILE.with_suffix(".jsonl")
+# 保活进程启动的浏览器进程记录，用于清理异常退出后残留的 Chromium
+BROWSER_PIDFILE = LOG_FILE.parent / "browsers.json"
+# 保活状态（最近状态、登录熔断、调度器等），重启后据此恢复
+STATE_FILE = LOG_FILE.parent / "keepalive.state"
+# 网络状态变化账本及其按日汇总的索引，供 `stats` 命令统计在线率
+LEDGER_FILE = LOG_FILE.parent / "uptime.ledger"
+LEDGER_INDEX = LOG_FILE.parent / "uptime.index"
 
-# URL
-GATEWAY_URL = "https://gw.buaa.edu.cn"
+
+def _runtime_dir() -> Path:
+    with warnings.catch_warnings():
+        # 未设置 XDG_RUNTIME_DIR 时 platformdirs 回退到 /tmp 下并发出警告，回退路径可用
+        warnings.simplefilter("ignore")
+        try:
+            return Path(user_runtime_dir(APP_NAME))
+        except OSError:
+            # /tmp 下的回退目录属于其他用户等情况，改用用户缓存目录
+            return Path(user_cache_dir(APP_NAME))
+
+
+RUNTIME_DIR = _runtime_dir()
+
+# 保活进程的控制套接字，目录在启动服务时创建
+CONTROL_SOCKET = RUNTIME_DIR / "control.sock"
+
+# URL（可通过 BUAA_GATEWAY_URL 指向本地网关替身，用于离线测试与基准测试）
+GATEWAY_URL = os.environ.get("BUAA_GATEWAY_URL", "https://gw.buaa.edu.cn").rstrip("/")
 LOGIN_URL = GATEWAY_URL
 RAD_USER_INFO_URL = f"{GATEWAY_URL}/cgi-bin/rad_user_info"
+
+
+class LoginEngine(StrEnum):
+    """登录引擎。"""
+
+    BROWSER = "browser"  # Playwright 模拟浏览器登录
+    HTTP = "http"  # 直接调用深澜认证接口，无需浏览器
+
+
+class ResourceProfile(StrEnum):
+    """登录页请求过滤预设。"""
+
+    OFF = "off"  # 不过滤，加载全部资源
+    DEFAULT = "default"  # 仅放行网关自身的页面、脚本、样式与接口请求
+    STRICT = "strict"  # 在 default 基础上再拦截样式表
+
+
+class PollPolicy(StrEnum):
+    """保活轮询策略。"""
+
+    FIXED = "fixed"  # 固定间隔
+    ADAPTIVE = "adaptive"  # 登录/掉线后快速复查，离线时指数退避，带随机抖动
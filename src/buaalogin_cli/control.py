@@ -0,0 +1,369 @@
+"""保活进程控制套接字：让 CLI 直接读取运行中保活进程的状态
+
+协议：客户端通过 Unix 域套接字发送一个 msgpack 编码的 `Request`，关闭写端，
+服务端回复一个 `Response` 后关闭连接。每个连接只处理一个请求。
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import socket
+import threading
+import time
+from enum import StrEnum
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import msgspec
+from msgspec import Struct
+
+from .breaker import BreakerStatus
+from .constants import CONTROL_SOCKET
+from .log import logger
+from .status import StatusInfo
+
+if TYPE_CHECKING:
+    from .netwatch import NetlinkWatcher
+
+# 客户端连接与读取普通请求的超时（秒）
+CONNECT_TIMEOUT_SEC = 1.0
+_RECV_BUFSIZE = 65536
+
+
+class Command(StrEnum):
+    """控制命令。"""
+
+    STATUS = "status"  # 保活进程概况：最近一次探测与登录
+    LAST_PROBE = "last_probe"  # 最近一次探测结果
+    CHECK = "check"  # 立即探测，返回新的探测结果
+    RELOGIN = "relogin"  # 立即登录，返回登录结果
+
+
+class Request(Struct, frozen=True):
+    """控制请求。
+
+    Attributes:
+        command: 命令。
+        timeout: ``check`` / ``relogin`` 等待保活循环完成的最长时间（秒）。
+    """
+
+    command: Command
+    timeout: float = 30.0
+
+
+class ProbeRecord(Struct, frozen=True, gc=False):
+    """一次状态探测的记录。
+
+    Attributes:
+        info: 探测结果。
+        at: 探测完成时间（Unix 时间戳，秒）。
+    """
+
+    info: StatusInfo
+    at: float
+
+
+class LoginRecord(Struct, frozen=True, gc=False):
+    """一次登录尝试的记录。
+
+    Attributes:
+        at: 登录结束时间（Unix 时间戳，秒）。
+        error: 失败原因，成功时为 None。
+    """
+
+    at: float
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Response(Struct, omit_defaults=True):
+    """控制响应。
+
+    Attributes:
+        pid: 保活进程 PID。
+        started_at: 保活进程启动时间（Unix 时间戳，秒）。
+        probe: 最近一次探测记录。
+        login: 最近一次登录记录。
+        breaker: 登录熔断器状态。
+        error: 请求处理失败（如等待超时）时的原因。
+    """
+
+    pid: int
+    started_at: float
+    probe: ProbeRecord | None = None
+    login: LoginRecord | None = None
+    breaker: BreakerStatus | None = None
+    error: str | None = None
+
+
+_encoder = msgspec.msgpack.Encoder()
+_request_decoder = msgspec.msgpack.Decoder(Request)
+_response_decoder = msgspec.msgpack.Decoder(Response)
+
+
+def is_supported() -> bool:
+    """当前平台是否支持 Unix 域套接字。"""
+    return hasattr(socket, "AF_UNIX")
+
+
+# region 保活进程侧
+
+
+class DaemonState:
+    """保活循环与控制服务共享的状态，线程安全。"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.started_at = time.time()
+        self.probe: ProbeRecord | None = None
+        self.login: LoginRecord | None = None
+        self.breaker: BreakerStatus | None = None
+        self.probe_count = 0
+        self.login_count = 0
+        self._relogin_requested = False
+        self._cond = threading.Condition()
+
+    def record_probe(self, info: StatusInfo) -> None:
+        with self._cond:
+            self.probe = ProbeRecord(info, time.time())
+            self.probe_count += 1
+            self._cond.notify_all()
+
+    def record_login(self, error: str | None) -> None:
+        with self._cond:
+            self.login = LoginRecord(time.time(), error)
+            self.login_count += 1
+            self._cond.notify_all()
+
+    def record_breaker(self, status: BreakerStatus) -> None:
+        with self._cond:
+            self.breaker = status
+
+    def request_relogin(self) -> None:
+        with self._cond:
+            self._relogin_requested = True
+
+    def take_relogin_request(self) -> bool:
+        """取出并清除待处理的登录请求。"""
+        with self._cond:
+            requested, self._relogin_requested = self._relogin_requested, False
+            return requested
+
+    def wait_for(self, counter: str, after: int, timeout: float) -> bool:
+        """等待 ``probe_count`` / ``login_count`` 超过 ``after``。"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: getattr(self, counter) > after, timeout=timeout
+            )
+
+    def snapshot(self, error: str | None = None) -> Response:
+        with self._cond:
+            return Response(
+                self.pid,
+                self.started_at,
+                self.probe,
+                self.login,
+                breaker=self.breaker,
+                error=error,
+            )
+
+
+class Wakeup:
+    """可由其他线程触发的唤醒信号，同时转发网络变化监听器的唤醒。
+
+    作为调度器的 ``watcher`` 使用：控制命令需要立即探测时调用 `set`，
+    保活循环的等待随即结束。
+
+    Args:
+        watcher: 同时等待的网络变化监听器。
+    """
+
+    def __init__(self, watcher: NetlinkWatcher | None = None):
+        self.watcher = watcher
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+
+    def set(self) -> None:
+        try:
+            self._writer.send(b"\0")
+        except BlockingIOError:
+            pass  # 缓冲区已满说明已有未处理的唤醒
+
+    def wait(self, timeout: float) -> bool:
+        watcher = self.watcher
+        fds: list = [self._reader] if watcher is None else [self._reader, watcher]
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select(fds, [], [], remaining)
+            if not ready:
+                return False
+            if self._reader in ready:
+                self._clear()
+                return True
+            if watcher is not None and watcher.consume():
+                watcher.settle()
+                return True
+
+    def close(self) -> None:
+        """关闭唤醒信号（不关闭 ``watcher``）。"""
+        self._reader.close()
+        self._writer.close()
+
+    def _clear(self) -> None:
+        try:
+            while self._reader.recv(_RECV_BUFSIZE):
+                pass
+        except BlockingIOError:
+            pass
+
+
+class ControlServer:
+    """控制套接字服务，在后台线程中应答 `Request`。
+
+    Args:
+        state: 保活循环共享的状态。
+        wakeup: 唤醒保活循环的信号。
+        path: 套接字路径。
+    """
+
+    def __init__(self, state: DaemonState, wakeup: Wakeup, path: Path = CONTROL_SOCKET):
+        self.state = state
+        self.wakeup = wakeup
+        self.path = path
+        self._sock: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """绑定套接字并启动后台线程。
+
+        Raises:
+            OSError: 套接字无法创建，或已有保活进程在监听同一路径。
+        """
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if self.path.exists():
+            if request(Command.STATUS, path=self.path) is not None:
+                raise OSError(f"已有保活进程在运行: {self.path}")
+            self.path.unlink()  # 上次异常退出遗留的套接字文件
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(str(self.path))
+            os.chmod(self.path, 0o600)
+            sock.listen()
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+
+        self._thread = threading.Thread(
+            target=self._serve, name="buaalogin-control", daemon=True
+        )
+        self._thread.start()
+        logger.bind(trigger="run").info(f"控制套接字: {self.path}")
+
+    def close(self) -> None:
+        sock, self._sock = self._sock, None
+        if sock is None:
+            return
+        # shutdown 唤醒阻塞在 accept 上的后台线程
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        self.path.unlink(missing_ok=True)
+
+    def _serve(self) -> None:
+        while (sock := self._sock) is not None:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return
+            # check / relogin 需要等待保活循环，每个连接单独处理
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn:
+            try:
+                conn.settimeout(CONNECT_TIMEOUT_SEC)
+                req = _request_decoder.decode(_recv_all(conn))
+                conn.settimeout(None)
+                conn.sendall(_encoder.encode(self.handle(req)))
+            except (OSError, msgspec.DecodeError) as e:
+                logger.bind(trigger="run").debug(f"控制请求处理失败: {e}")
+
+    def handle(self, req: Request) -> Response:
+        """处理一个控制请求。"""
+        state = self.state
+
+        if req.command == Command.CHECK:
+            logger.bind(trigger="run").info("收到控制命令：立即检查")
+            count = state.probe_count
+            self.wakeup.set()
+            if not state.wait_for("probe_count", count, req.timeout):
+                return state.snapshot(error="等待检查结果超时")
+        elif req.command == Command.RELOGIN:
+            logger.bind(trigger="run").info("收到控制命令：立即登录")
+            count = state.login_count
+            state.request_relogin()
+            self.wakeup.set()
+            if not state.wait_for("login_count", count, req.timeout):
+                return state.snapshot(error="等待登录结果超时")
+        return state.snapshot()
+
+
+# endregion
+
+# region 客户端侧
+
+
+def request(
+    command: Command,
+    *,
+    timeout: float = 30.0,
+    path: Path = CONTROL_SOCKET,
+) -> Response | None:
+    """向运行中的保活进程发送控制命令。
+
+    Args:
+        command: 命令。
+        timeout: 等待保活进程完成 ``check`` / ``relogin`` 的最长时间（秒）。
+        path: 套接字路径。
+
+    Returns:
+        保活进程的响应；没有运行中的保活进程（或平台不支持）时返回 None。
+    """
+    if not is_supported():
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT_SEC)
+            sock.connect(str(path))
+            sock.sendall(_encoder.encode(Request(command, timeout)))
+            sock.shutdown(socket.SHUT_WR)
+            # 服务端最多等待 timeout 秒，额外留出传输余量
+            sock.settimeout(timeout + CONNECT_TIMEOUT_SEC)
+            return _response_decoder.decode(_recv_all(sock))
+    except (OSError, msgspec.DecodeError):
+        return None
+
+
+def _recv_all(sock: socket.socket) -> bytes:
+    chunks = []
+    while chunk := sock.recv(_RECV_BUFSIZE):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+# endregion
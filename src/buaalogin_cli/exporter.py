@@ -0,0 +1,240 @@
+"""OpenMetrics 指标端点：供 Prometheus 抓取保活进程的探测与登录指标
+
+``buaalogin run --metrics [主机:]端口`` 时在后台线程中开放 HTTP 端点
+``/metrics``，仅使用标准库。指标包括：
+
+- ``buaalogin_probes_total{status}``：按结果分类的状态探测次数；
+- ``buaalogin_logins_total{result}``：登录成功 / 失败次数；
+- ``buaalogin_login_failures_total{reason}``：按失败类型分类的登录失败次数；
+- ``buaalogin_probe_duration_seconds``：状态探测（``get_status``）耗时分布；
+- ``buaalogin_login_duration_seconds``：登录耗时分布；
+- ``buaalogin_network_status{status}``：当前网络状态，对应状态为 1，其余为 0。
+
+更新指标只是加锁后的几次加法，每轮检测都可以调用；文本只在被抓取时生成。
+"""
+
+from __future__ import annotations
+
+import bisect
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .breaker import FailureKind
+from .log import logger
+from .status import NetworkStatus
+from .timing import DEFAULT_BUCKETS
+
+PREFIX = "buaalogin"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+DEFAULT_HOST = "127.0.0.1"
+
+
+def _format(value: float) -> str:
+    return repr(float(value))
+
+
+class Counter:
+    """带一个标签的计数器，标签取值预先列出，未发生的取值输出 0。
+
+    Args:
+        name: 指标名（不含前缀与 ``_total`` 后缀）。
+        help: 说明。
+        label: 标签名。
+        values: 标签取值。
+    """
+
+    def __init__(self, name: str, help: str, label: str, values: list[str]):
+        self.name = f"{PREFIX}_{name}"
+        self.help = help
+        self.label = label
+        self._counts = dict.fromkeys(values, 0)
+        self._lock = threading.Lock()
+
+    def inc(self, value: str) -> None:
+        with self._lock:
+            self._counts[value] = self._counts.get(value, 0) + 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            counts = list(self._counts.items())
+        lines = [f"# TYPE {self.name} counter", f"# HELP {self.name} {self.help}"]
+        lines += [f'{self.name}_total{{{self.label}="{v}"}} {n}' for v, n in counts]
+        return lines
+
+
+class Histogram:
+    """累计直方图（自进程启动起，不同于 `timing.RollingHistogram` 的滚动窗口）。
+
+    Args:
+        name: 指标名（不含前缀）。
+        help: 说明。
+        buckets: 桶上界（秒），升序。
+    """
+
+    def __init__(
+        self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = f"{PREFIX}_{name}"
+        self.help = help
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+
+    def render(self) -> list[str]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        lines = [f"# TYPE {self.name} histogram", f"# HELP {self.name} {self.help}"]
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+            cumulative += count
+            le = bound if isinstance(bound, str) else _format(bound)
+            lines.append(f'{self.name}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format(total)}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class Metrics:
+    """保活进程的全部指标。"""
+
+    def __init__(self):
+        statuses = [s.value for s in NetworkStatus]
+        self.probes = Counter("probes", "网络状态探测次数", "status", statuses)
+        self.logins = Counter(
+            "logins", "登录尝试次数", "result", ["success", "failure"]
+        )
+        self.login_failures = Counter(
+            "login_failures",
+            "登录失败次数（按失败类型）",
+            "reason",
+            [k.value for k in FailureKind],
+        )
+        self.probe_duration = Histogram("probe_duration_seconds", "状态探测耗时")
+        self.login_duration = Histogram("login_duration_seconds", "登录耗时")
+        self.status: NetworkStatus | None = None
+
+    def observe_probe(self, status: NetworkStatus, seconds: float) -> None:
+        self.probes.inc(status.value)
+        self.probe_duration.observe(seconds)
+        self.status = status
+
+    def observe_login(self, seconds: float, error: FailureKind | None = None) -> None:
+        self.login_duration.observe(seconds)
+        if error is None:
+            self.logins.inc("success")
+        else:
+            self.logins.inc("failure")
+            self.login_failures.inc(error.value)
+
+    def render(self) -> bytes:
+        """生成 OpenMetrics 文本。"""
+        name = f"{PREFIX}_network_status"
+        lines = [f"# TYPE {name} gauge", f"# HELP {name} 当前网络状态"]
+        current = self.status
+        lines += [
+            f'{name}{{status="{s.value}"}} {int(s == current)}' for s in NetworkStatus
+        ]
+        for metric in (
+            self.probes,
+            self.logins,
+            self.login_failures,
+            self.probe_duration,
+            self.login_duration,
+        ):
+            lines += metric.render()
+        lines.append("# EOF")
+        return ("\n".join(lines) + "\n").encode()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _Server6(_Server):
+    address_family = socket.AF_INET6
+
+
+def parse_listen(value: str) -> tuple[str, int]:
+    """解析 ``[主机:]端口``，只给出端口时监听本机。
+
+    Raises:
+        ValueError: 格式不正确。
+    """
+    host, sep, port = value.rpartition(":")
+    if not sep:
+        host = DEFAULT_HOST
+    host = host.strip("[]") or DEFAULT_HOST
+    number = int(port)
+    if not 0 <= number <= 65535:
+        raise ValueError(f"端口超出范围: {number}")
+    return host, number
+
+
+class MetricsServer:
+    """在后台线程中应答 ``GET /metrics``。
+
+    Args:
+        metrics: 要导出的指标。
+        host: 监听地址。
+        port: 监听端口，0 表示由系统分配。
+    """
+
+    def __init__(self, metrics: Metrics, host: str = DEFAULT_HOST, port: int = 0):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server: _Server | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """绑定端口并启动后台线程。
+
+        Raises:
+            OSError: 端口无法绑定。
+        """
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass  # 不把每次抓取写进日志
+
+        server_class = _Server6 if ":" in self.host else _Server
+        server = server_class((self.host, self.port), Handler)
+        self._server = server
+        self.port = server.server_address[1]
+        self._thread = threading.Thread(
+            target=server.serve_forever, name="buaalogin-metrics", daemon=True
+        )
+        self._thread.start()
+        logger.bind(trigger="run").info(
+            f"指标端点: http://{self.host}:{self.port}/metrics"
+        )
+
+    def close(self) -> None:
+        server, self._server = self._server, None
+        if server is None:
+            return
+        server.shutdown()
+        server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
@@ -0,0 +1,61 @@
+"""网关 HTTP 会话：复用连接、绕过环境代理"""
+
+from __future__ import annotations
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .log import logger
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# 只访问单一网关主机，串行探测，保留少量连接即可
+_POOL_CONNECTIONS = 1
+_POOL_MAXSIZE = 2
+
+_session: requests.Session | None = None
+
+
+def create_session() -> requests.Session:
+    """创建访问网关专用的会话。
+
+    - ``trust_env`` 关闭：网关位于校园网内，不走 ``HTTP(S)_PROXY``，
+      也不读取 ``.netrc``，省去每次请求的环境解析；
+    - 连接池保持 keep-alive，避免每次探测重新进行 TCP/TLS 握手；
+    - 不做自动重试，失败由调用方决定如何处理。
+    """
+    session = requests.Session()
+    session.trust_env = False
+    session.headers.update(DEFAULT_HEADERS)
+
+    adapter = HTTPAdapter(
+        pool_connections=_POOL_CONNECTIONS,
+        pool_maxsize=_POOL_MAXSIZE,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """获取模块级共享会话，首次调用时创建。"""
+    global _session
+
+    if _session is None:
+        _session = create_session()
+    return _session
+
+
+def reset_session() -> None:
+    """丢弃共享会话及其连接池。
+
+    网络切换（换 Wi-Fi、重新拨号、掉线重连）后池中的连接可能已失效，
+    请求出错时调用本函数，下一次请求会重新建立连接。
+    """
+    global _session
+
+    session, _session = _session, None
+    if session is not None:
+        session.close()
+        logger.bind(trigger="status").debug("已重置网关连接池")
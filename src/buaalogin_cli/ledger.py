@@ -0,0 +1,456 @@
+"""在线时长账本：记录保活期间的网络状态变化，统计在线率与掉线恢复时间
+
+保活进程在网络状态变化与每次登录尝试时向账本追加一行 JSON::
+
+    [时间戳, 原状态, 新状态, 登录耗时, 失败类型]
+
+原状态为 null 表示保活进程刚启动，新状态为 null 表示保活进程正常退出。
+两次运行之间（包括异常退出留下的空档）不计入统计。
+
+`summarize` 把已经结束的日期（UTC 自然日）汇总写入索引，每天只汇总一次；
+之后每次统计只读取索引、当天新增的记录以及统计窗口起点所在那一天的记录，
+不随账本增长而变慢。
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from pathlib import Path
+
+import msgspec
+from msgspec import Struct, field, structs
+
+from .breaker import FailureKind
+from .constants import LEDGER_FILE, LEDGER_INDEX
+from .log import logger
+from .status import NetworkStatus
+
+DAY_SEC = 86400.0
+# 索引格式版本，不一致时重建
+INDEX_VERSION = 1
+
+_IN = NetworkStatus.LOGGED_IN
+_OUT = NetworkStatus.LOGGED_OUT
+
+
+class Entry(Struct, frozen=True, gc=False, array_like=True):
+    """一条账本记录。
+
+    Attributes:
+        at: 记录时间（Unix 时间戳，秒）。
+        old: 原状态，None 表示保活进程刚启动。
+        new: 新状态，None 表示保活进程退出。
+        login_sec: 本次记录对应的登录耗时（秒），非登录记录为 None。
+        error: 登录失败类型，成功或非登录记录为 None。
+    """
+
+    at: float
+    old: NetworkStatus | None
+    new: NetworkStatus | None
+    login_sec: float | None = None
+    error: FailureKind | None = None
+
+
+class Cursor(Struct, frozen=True, gc=False, array_like=True):
+    """账本中的读取位置及该位置之前的状态。
+
+    Attributes:
+        offset: 下一条记录的字节偏移。
+        at: 已统计到的时间，0 表示尚未读取任何记录。
+        state: 当前状态。
+        outage_start: 进行中的掉线的开始时间。
+    """
+
+    offset: int = 0
+    at: float = 0.0
+    state: NetworkStatus | None = None
+    outage_start: float | None = None
+
+
+class Summary(Struct, omit_defaults=True):
+    """一段时间内的统计量，可逐日合并。
+
+    Attributes:
+        up_sec: 在线时长（秒）。
+        down_sec: 处于校园网但未登录的时长（秒）。
+        outages: 恢复的掉线次数（按恢复时间归属）。
+        repair_sec: 这些掉线的总时长（秒）。
+        relogins: 掉线后重新登录成功的耗时（秒）。
+        failures: 各类登录失败的次数。
+    """
+
+    up_sec: float = 0.0
+    down_sec: float = 0.0
+    outages: int = 0
+    repair_sec: float = 0.0
+    relogins: list[float] = []
+    failures: dict[FailureKind, int] = {}
+
+    def merge(self, other: Summary) -> None:
+        self.up_sec += other.up_sec
+        self.down_sec += other.down_sec
+        self.outages += other.outages
+        self.repair_sec += other.repair_sec
+        self.relogins.extend(other.relogins)
+        for kind, count in other.failures.items():
+            self.failures[kind] = self.failures.get(kind, 0) + count
+
+
+class DaySummary(Struct, frozen=True):
+    """索引中一天的汇总。
+
+    Attributes:
+        day: 日期（自 Unix 纪元起的 UTC 天数）。
+        start: 当天第一条记录处的游标。
+        summary: 当天的统计量。
+    """
+
+    day: int
+    start: Cursor
+    summary: Summary
+
+
+class Index(Struct):
+    """账本索引。
+
+    Attributes:
+        version: 格式版本。
+        next_day: 第一个尚未汇总的日期，None 表示账本为空。
+        cursor: ``next_day`` 当天第一条记录处的游标。
+        days: 已汇总的日期，按日期升序。
+    """
+
+    version: int = INDEX_VERSION
+    next_day: int | None = None
+    cursor: Cursor = field(default_factory=Cursor)
+    days: list[DaySummary] = []
+
+
+class Report(Struct, frozen=True, omit_defaults=True):
+    """`stats` 命令的统计结果。
+
+    Attributes:
+        start: 统计窗口起点（Unix 时间戳，秒），None 表示全部记录。
+        end: 统计窗口终点（Unix 时间戳，秒）。
+        up_sec: 在线时长（秒）。
+        down_sec: 处于校园网但未登录的时长（秒）。
+        uptime: 在线率（0~1），没有观测数据时为 None。
+        outages: 掉线次数。
+        mttr_sec: 平均恢复时间（秒）。
+        relogins: 重新登录成功次数。
+        relogin_p50: 重新登录耗时中位数（秒）。
+        relogin_p95: 重新登录耗时 p95（秒）。
+        relogin_p99: 重新登录耗时 p99（秒）。
+        failures: 各类登录失败的次数。
+    """
+
+    start: float | None
+    end: float
+    up_sec: float
+    down_sec: float
+    uptime: float | None = None
+    outages: int = 0
+    mttr_sec: float | None = None
+    relogins: int = 0
+    relogin_p50: float | None = None
+    relogin_p95: float | None = None
+    relogin_p99: float | None = None
+    failures: dict[FailureKind, int] = {}
+
+
+_entry_encoder = msgspec.json.Encoder()
+_entry_decoder = msgspec.json.Decoder(Entry)
+_index_encoder = msgspec.msgpack.Encoder()
+_index_decoder = msgspec.msgpack.Decoder(Index)
+
+
+def _day(at: float) -> int:
+    return math.floor(at / DAY_SEC)
+
+
+# region 写入
+
+
+class Ledger:
+    """保活进程一侧的账本写入器，只在状态变化或登录后追加记录。
+
+    Args:
+        path: 账本路径，默认 `LEDGER_FILE`。
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path if path is not None else LEDGER_FILE
+        self.status: NetworkStatus | None = None
+
+    def record(
+        self,
+        status: NetworkStatus,
+        *,
+        login_sec: float | None = None,
+        error: FailureKind | None = None,
+    ) -> None:
+        """记录本轮状态；状态未变且不是登录结果时不写入。"""
+        if status == self.status and login_sec is None:
+            return
+        self._append(Entry(time.time(), self.status, status, login_sec, error))
+        self.status = status
+
+    def stop(self) -> None:
+        """记录保活进程退出。"""
+        if self.status is not None:
+            self._append(Entry(time.time(), self.status, None))
+            self.status = None
+
+    def _append(self, entry: Entry) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # 追加模式下单次 write 的一整行不会与其他写入交错
+            with open(self.path, "ab") as f:
+                f.write(_entry_encoder.encode(entry) + b"\n")
+        except OSError as e:
+            logger.bind(trigger="run").debug(f"无法写入在线时长账本: {e}")
+
+
+# endregion
+
+# region 统计
+
+
+class _Scanner:
+    """从游标处顺序读取账本，按日累计 [start, end) 内的统计量。"""
+
+    def __init__(self, cursor: Cursor, start: float, end: float):
+        self.cursor = cursor
+        self.start = start
+        self.end = end
+        self.days: dict[int, Summary] = {}
+        self.boundaries: dict[int, Cursor] = {}
+
+    def _summary(self, at: float) -> Summary:
+        day = _day(at)
+        summary = self.days.get(day)
+        if summary is None:
+            summary = self.days[day] = Summary()
+        return summary
+
+    def _cross(self, until: float) -> None:
+        """记录当前游标到 ``until`` 之间经过的每个日期边界。"""
+        c = self.cursor
+        first = _day(c.at) + 1 if c.at > 0 else _day(until)
+        for day in range(first, _day(until) + 1):
+            self.boundaries[day] = c
+
+    def _account(self, until: float) -> None:
+        """把当前状态从游标时间持续到 ``until`` 的时长计入各天。"""
+        c = self.cursor
+        if c.state != _IN and c.state != _OUT:
+            return
+        s, e = max(c.at, self.start), min(until, self.end)
+        while s < e:
+            chunk_end = min(e, (_day(s) + 1) * DAY_SEC)
+            summary = self._summary(s)
+            if c.state == _IN:
+                summary.up_sec += chunk_end - s
+            else:
+                summary.down_sec += chunk_end - s
+            s = chunk_end
+
+    def feed(self, entry: Entry, offset: int) -> None:
+        """处理一条记录，``offset`` 为下一条记录的字节偏移。"""
+        self._cross(entry.at)
+        if entry.old is None:
+            # 启动记录：上次运行异常退出后的空档不计入
+            state, outage_start = None, None
+        else:
+            self._account(entry.at)
+            state, outage_start = self.cursor.state, self.cursor.outage_start
+
+        if self.start <= entry.at < self.end:
+            summary = self._summary(entry.at)
+            if entry.error is not None:
+                summary.failures[entry.error] = summary.failures.get(entry.error, 0) + 1
+            elif entry.login_sec is not None and state == _OUT and entry.new == _IN:
+                summary.relogins.append(entry.login_sec)
+            if outage_start is not None and entry.new == _IN:
+                summary.outages += 1
+                summary.repair_sec += entry.at - outage_start
+
+        if entry.new != _OUT:
+            outage_start = None
+        elif outage_start is None:
+            outage_start = entry.at
+        self.cursor = Cursor(offset, entry.at, entry.new, outage_start)
+
+    def skip(self, offset: int) -> None:
+        self.cursor = structs.replace(self.cursor, offset=offset)
+
+    def finish(self, until: float, *, running: bool) -> None:
+        """读到账本末尾：保活进程仍在运行时，最后的状态持续到 ``until``。"""
+        self._cross(until)
+        if running:
+            self._account(until)
+        if until > self.cursor.at:
+            self.cursor = structs.replace(self.cursor, at=until)
+
+
+def _scan(
+    path: Path, cursor: Cursor, start: float, end: float, *, running: bool
+) -> _Scanner:
+    """从 ``cursor`` 读取账本，直到遇到 ``end`` 之后的记录或读到末尾。"""
+    scanner = _Scanner(cursor, start, end)
+    offset = cursor.offset
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 正在写入的最后一行
+                offset += len(line)
+                try:
+                    entry = _entry_decoder.decode(line)
+                except msgspec.DecodeError:
+                    scanner.skip(offset)
+                    continue
+                scanner.feed(entry, offset)
+                if entry.at >= end:
+                    return scanner
+    except FileNotFoundError:
+        pass
+    if math.isfinite(end):
+        scanner.finish(end, running=running)
+    return scanner
+
+
+def _load_index(path: Path) -> Index:
+    try:
+        index = _index_decoder.decode(path.read_bytes())
+    except (OSError, msgspec.DecodeError):
+        return Index()
+    return index if index.version == INDEX_VERSION else Index()
+
+
+def _save_index(index: Index, path: Path) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(_index_encoder.encode(index))
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.bind(trigger="run").debug(f"无法保存账本索引: {e}")
+        tmp.unlink(missing_ok=True)
+
+
+def update_index(path: Path, index_path: Path, *, today: int, running: bool) -> Index:
+    """把 ``today`` 之前尚未汇总的日期汇总进索引。"""
+    index = _load_index(index_path)
+    try:
+        size = path.stat().st_size
+    except OSError:
+        size = 0
+    if index.cursor.offset > size:
+        index = Index()  # 账本被截断或替换，重建索引
+    if index.next_day is not None and index.next_day >= today:
+        return index
+
+    start = -math.inf if index.next_day is None else index.next_day * DAY_SEC
+    scanner = _scan(path, index.cursor, start, today * DAY_SEC, running=running)
+    if index.next_day is not None:
+        scanner.boundaries.setdefault(index.next_day, index.cursor)
+    if today not in scanner.boundaries:
+        return index  # 账本为空
+
+    first = index.next_day if index.next_day is not None else min(scanner.boundaries)
+    for day in range(first, today):
+        index.days.append(
+            DaySummary(day, scanner.boundaries[day], scanner.days.get(day, Summary()))
+        )
+    index.next_day = today
+    index.cursor = scanner.boundaries[today]
+    _save_index(index, index_path)
+    return index
+
+
+def summarize(
+    days: float | None,
+    *,
+    running: bool,
+    now: float | None = None,
+    path: Path | None = None,
+    index_path: Path | None = None,
+) -> Report:
+    """统计最近 ``days`` 天（None 表示全部记录）的在线情况。
+
+    Args:
+        days: 统计窗口长度（天）。
+        running: 保活进程是否正在运行；运行时最后的状态计入到当前时间。
+        now: 统计终点（Unix 时间戳，秒），默认当前时间。
+        path: 账本路径，默认 `LEDGER_FILE`。
+        index_path: 索引路径，默认 `LEDGER_INDEX`。
+    """
+    path = path if path is not None else LEDGER_FILE
+    index_path = index_path if index_path is not None else LEDGER_INDEX
+    now = time.time() if now is None else now
+    today = _day(now)
+    start = now - days * DAY_SEC if days else -math.inf
+
+    index = update_index(path, index_path, today=today, running=running)
+    total = Summary()
+
+    # 完整落在窗口内的日期直接使用索引
+    first_full = math.ceil(start / DAY_SEC) if math.isfinite(start) else -math.inf
+    for day in index.days:
+        if day.day >= first_full:
+            total.merge(day.summary)
+
+    # 窗口起点所在的那一天只统计起点之后的部分
+    if math.isfinite(start) and _day(start) < min(first_full, today):
+        partial = next((d for d in index.days if d.day == _day(start)), None)
+        if partial is not None:
+            scanner = _scan(
+                path, partial.start, start, first_full * DAY_SEC, running=running
+            )
+            for summary in scanner.days.values():
+                total.merge(summary)
+
+    # 当天尚未汇总
+    cursor = index.cursor if index.next_day is not None else Cursor()
+    scanner = _scan(
+        path, cursor, max(start, today * DAY_SEC), math.inf, running=running
+    )
+    scanner.finish(now, running=running)
+    for summary in scanner.days.values():
+        total.merge(summary)
+
+    return _report(total, start, now)
+
+
+def _report(total: Summary, start: float, end: float) -> Report:
+    observed = total.up_sec + total.down_sec
+    relogins = sorted(total.relogins)
+    return Report(
+        start if math.isfinite(start) else None,
+        end,
+        total.up_sec,
+        total.down_sec,
+        uptime=total.up_sec / observed if observed > 0 else None,
+        outages=total.outages,
+        mttr_sec=total.repair_sec / total.outages if total.outages else None,
+        relogins=len(relogins),
+        relogin_p50=_percentile(relogins, 0.5),
+        relogin_p95=_percentile(relogins, 0.95),
+        relogin_p99=_percentile(relogins, 0.99),
+        failures=total.failures,
+    )
+
+
+def _percentile(ordered: list[float], q: float) -> float | None:
+    """最近秩法分位数，没有样本时为 None。"""
+    if not ordered:
+        return None
+    index = math.ceil(q * len(ordered)) - 1
+    return ordered[min(len(ordered) - 1, max(0, index))]
+
+
+# endregion
@@ -0,0 +1,149 @@
+"""跨进程文件锁：单实例保活与单飞登录
+
+- `DAEMON_LOCK`：保活进程运行期间一直持有，同一用户配置下只允许一个保活进程；
+- `LOGIN_LOCK`：登录期间持有。其他进程同时需要登录时等待锁释放，
+  再读取 `LOGIN_RESULT` 中先行者写下的结果，而不是各自启动浏览器。
+
+使用 ``fcntl.flock`` 实现的建议锁，进程退出（包括被 SIGKILL）时由内核释放。
+没有 ``fcntl`` 的平台（Windows）上锁总是获取成功。
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import IO
+
+import msgspec
+from msgspec import Struct
+
+from .constants import RUNTIME_DIR
+
+DAEMON_LOCK = RUNTIME_DIR / "daemon.lock"
+LOGIN_LOCK = RUNTIME_DIR / "login.lock"
+LOGIN_RESULT = RUNTIME_DIR / "login.result"
+
+# 等待锁时的轮询间隔（秒）
+_POLL_SEC = 0.1
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def is_supported() -> bool:
+    """当前平台是否支持 ``fcntl.flock``。"""
+    return fcntl is not None
+
+
+class FileLock:
+    """基于 ``flock`` 的排他锁，获取后在锁文件中写入持有者 PID。
+
+    同一进程内的两个 `FileLock` 实例同样互斥。
+
+    Args:
+        path: 锁文件路径，父目录不存在时创建（权限 0700）。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file: IO[str] | None = None
+
+    @property
+    def locked(self) -> bool:
+        return self._file is not None
+
+    def acquire(self, *, timeout: float = 0.0) -> bool:
+        """获取锁，最多等待 ``timeout`` 秒，返回是否成功。"""
+        if self._file is not None:
+            return True
+        if fcntl is None:
+            return True
+
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        f = open(self.path, "a+", encoding="ascii")
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    f.close()
+                    return False
+                time.sleep(_POLL_SEC)
+            except OSError:
+                f.close()
+                raise
+
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._file = f
+        return True
+
+    def release(self) -> None:
+        f, self._file = self._file, None
+        if f is not None:
+            # 关闭文件即释放 flock
+            f.close()
+
+    def holder_pid(self) -> int | None:
+        """读取当前（或最近一次）持有者的 PID。"""
+        try:
+            return int(self.path.read_text(encoding="ascii").strip())
+        except (OSError, ValueError):
+            return None
+
+    def holder_alive(self) -> bool:
+        """最近一次持有者是否仍在运行。
+
+        只读取锁文件中的 PID 并检查进程是否存在，不获取锁，供只读的查询
+        使用；持有者退出后 PID 被复用时可能误报。
+        """
+        if fcntl is None:
+            return False
+        pid = self.holder_pid()
+        if pid is None:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True  # 进程存在，但属于其他用户
+        return True
+
+
+class LoginResult(Struct, frozen=True):
+    """一次登录的结果，供等待中的其他进程复用。
+
+    Attributes:
+        pid: 执行登录的进程 PID。
+        finished_at: 登录结束时间（Unix 时间戳，秒）。
+        error: 失败原因，成功时为 None。
+    """
+
+    pid: int
+    finished_at: float
+    error: str | None = None
+
+
+_result_decoder = msgspec.json.Decoder(LoginResult)
+
+
+def write_result(error: str | None, *, path: Path = LOGIN_RESULT) -> None:
+    """原子地写入本进程的登录结果。"""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(msgspec.json.encode(LoginResult(os.getpid(), time.time(), error)))
+    os.replace(tmp, path)
+
+
+def read_result(*, path: Path = LOGIN_RESULT) -> LoginResult | None:
+    try:
+        return _result_decoder.decode(path.read_bytes())
+    except (OSError, msgspec.DecodeError):
+        return None
@@ -1,10 +1,23 @@
 """日志配置模块：集中管理日志设置，供所有模块导入使用"""
 
+import atexit
+import os
+import queue
 import sys
+import threading
+import time
+import traceback
+import zipfile
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO
 
+import msgspec
 from loguru import logger
+from msgspec import Struct
 
-from .constants import LOG_FILE
+from .constants import LOG_FILE, LOG_JSON_FILE
 
 # 移除 loguru 默认的 stderr handler，稍后重新配置
 logger.remove()
@@ -22,22 +35,479 @@ LOG_FORMAT_FILE = (
     "{name}:{function}:{line} - {message}"
 )
 
-# 配置默认 trigger（防止 KeyError）
-logger.configure(extra={"trigger": "unknown"})
-
-# 文件输出：永远记录 DEBUG 级别（带轮转和压缩）
-logger.add(
-    LOG_FILE,
-    format=LOG_FORMAT_FILE,
-    level="DEBUG",  # 文件永远记录全量日志
-    encoding="utf-8",
-    rotation="10 MB",
-    retention="7 days",
-    compression="zip",
-)
+# 文件日志轮转大小与保留时间
+LOG_ROTATION_BYTES = 10 * 1024 * 1024
+LOG_RETENTION_SEC = 7 * 24 * 3600
+
+# 重复日志的汇总间隔（秒），以及每个 trigger 最多跟踪的不同消息数
+DEDUP_INTERVAL_SEC = 3600.0
+DEDUP_MAX_KEYS = 64
+_INFO_NO = logger.level("INFO").no
+
+# 被合并的重复日志在 extra 中的标记，输出到控制台和文件时过滤掉
+_REPEATED = "repeated"
+# 汇总日志在 extra 中的标记，不再参与合并
+_SUMMARY = "repeat_summary"
+
+
+def _format_span(seconds: float) -> str:
+    if seconds < 120:
+        return f"{seconds:.0f} 秒"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} 分钟"
+    return f"{seconds / 3600:.1f} 小时".replace(".0 ", " ")
+
+
+def _summary(message: str, count: int, seconds: float) -> str:
+    return f"{message}（{_format_span(seconds)}内重复 {count} 次）"
+
+
+class _Run:
+    """同一条日志的重复情况。"""
+
+    __slots__ = ("count", "emitted_at", "level", "origin", "seen_at")
+
+    def __init__(self, level: str, origin: tuple[str, str, int], now: float):
+        self.level = level
+        self.origin = origin  # 最近一次出现的 (模块, 函数, 行号)
+        self.count = 0  # 上次输出后被合并的次数
+        self.emitted_at = now
+        self.seen_at = now
+
+
+class Deduplicator:
+    """合并重复日志的 loguru patcher。
+
+    健康的保活进程每轮都会输出相同的日志（如“已登录，无需操作”）。同一
+    trigger 下 (级别, 消息) 相同的日志只输出第一条，之后的重复标记为
+    ``repeated`` 并由控制台和文件 handler 过滤，每隔 ``interval_sec`` 输出
+    一条带重复次数的汇总。
+
+    INFO 及以上级别出现新消息视为状态变化：立即输出，并先为该 trigger 下
+    被合并的日志补上汇总，之后的日志重新开始计数。带异常的日志不合并。
+
+    Args:
+        interval_sec: 汇总间隔（秒）。
+        max_keys: 每个 trigger 最多跟踪的不同消息数，超出时淘汰最早的。
+        clock: 单调时钟，测试时可替换。
+    """
+
+    def __init__(
+        self,
+        interval_sec: float = DEDUP_INTERVAL_SEC,
+        *,
+        max_keys: int = DEDUP_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.interval_sec = interval_sec
+        self.max_keys = max_keys
+        self.clock = clock
+        self._runs: dict[str, dict[tuple[int, str], _Run]] = {}
+        self._lock = threading.Lock()
+
+    def patch(self, record) -> None:
+        extra = record["extra"]
+        if extra.get(_SUMMARY) or record["exception"] is not None:
+            return
+        trigger = extra.get("trigger", "unknown")
+        level = record["level"]
+        key = (level.no, record["message"])
+        origin = (record["name"], record["function"], record["line"])
+        now = self.clock()
+        pending: list[tuple[tuple[int, str], _Run]] = []
+
+        with self._lock:
+            runs = self._runs.setdefault(trigger, {})
+            run = runs.get(key)
+            if run is None:
+                if level.no >= _INFO_NO:
+                    pending = [(k, r) for k, r in runs.items() if r.count]
+                    runs.clear()
+                elif len(runs) >= self.max_keys:
+                    oldest = next(iter(runs))
+                    evicted = runs.pop(oldest)
+                    if evicted.count:
+                        pending = [(oldest, evicted)]
+                runs[key] = _Run(level.name, origin, now)
+            else:
+                run.count += 1
+                run.seen_at = now
+                run.origin = origin
+                if now - run.emitted_at >= self.interval_sec:
+                    record["message"] = _summary(
+                        record["message"], run.count, now - run.emitted_at
+                    )
+                    run.count = 0
+                    run.emitted_at = now
+                else:
+                    extra[_REPEATED] = True
+
+        # 汇总在当前日志之前输出，顺序与实际发生的一致
+        for key, run in pending:
+            self._emit(trigger, key[1], run)
+
+    def flush(self) -> None:
+        """为所有被合并的日志输出汇总（如进程退出前）。"""
+        with self._lock:
+            pending = [
+                (trigger, key, run)
+                for trigger, runs in self._runs.items()
+                for key, run in runs.items()
+                if run.count
+            ]
+            self._runs.clear()
+        for trigger, key, run in pending:
+            self._emit(trigger, key[1], run)
+
+    @staticmethod
+    def _emit(trigger: str, message: str, run: _Run) -> None:
+        name, function, line = run.origin
+        logger.bind(trigger=trigger, **{_SUMMARY: True}).patch(
+            lambda r: r.update(name=name, function=function, line=line)
+        ).log(run.level, _summary(message, run.count, run.seen_at - run.emitted_at))
+
+
+_dedup = Deduplicator()
+
+
+def _patch(record) -> None:
+    _dedup.patch(record)
+
+
+def _not_repeated(record) -> bool:
+    return not record["extra"].get(_REPEATED)
+
+
+# 配置默认 trigger（防止 KeyError），并合并重复日志
+logger.configure(extra={"trigger": "unknown"}, patcher=_patch)
 
 # 控制台 handler ID，用于动态切换级别
 _console_handler_id: int | None = None
+# 文件 handler ID 与对应的 sink，为空表示尚未启用文件日志
+_file_sinks: "dict[int, QueuedFileSink]" = {}
+
+
+class JsonRecord(Struct, frozen=True, gc=False, omit_defaults=True):
+    """JSON Lines 日志中的一条记录。
+
+    Attributes:
+        time: 记录时间（带时区的 ISO 8601）。
+        level: 级别名称。
+        trigger: 触发来源（如 ``run``、``login``）。
+        module: 模块名。
+        function: 函数名。
+        line: 行号。
+        message: 日志内容。
+        extra: 通过 ``logger.bind`` 附加的其他字段（如 ``status``、``probe_sec``）。
+        exception: 异常回溯。
+    """
+
+    time: str
+    level: str
+    trigger: str
+    module: str
+    function: str
+    line: int
+    message: str
+    extra: dict[str, Any] = {}
+    exception: str | None = None
+
+
+# 不写入 JSON 日志 extra 的内部字段
+_INTERNAL_EXTRA = frozenset({"trigger", _REPEATED, _SUMMARY})
+# extra 中 msgspec 不支持的值按 repr 输出
+_json_encoder = msgspec.json.Encoder(enc_hook=repr)
+
+
+def encode_json(message) -> bytes:
+    """将 loguru 消息编码为一行 JSON。
+
+    在 `QueuedFileSink` 的写入线程中调用，编码不占用记录日志的线程。
+    """
+    record = message.record
+    extra = record["extra"]
+    exception = record["exception"]
+    return (
+        _json_encoder.encode(
+            JsonRecord(
+                time=record["time"].isoformat(),
+                level=record["level"].name,
+                trigger=extra.get("trigger", "unknown"),
+                module=record["name"] or "",
+                function=record["function"],
+                line=record["line"],
+                message=record["message"],
+                extra={k: v for k, v in extra.items() if k not in _INTERNAL_EXTRA},
+                exception=(
+                    "".join(traceback.format_exception(*exception))
+                    if exception is not None
+                    else None
+                ),
+            )
+        )
+        + b"\n"
+    )
+
+
+def _encode_text(message) -> bytes:
+    return str(message).encode("utf-8")
+
+
+_STOP = object()
+
+
+class QueuedFileSink:
+    """在后台线程中写入文件的 loguru sink。
+
+    调用方（如保活循环）只把格式化好的消息放入队列；写入、按大小轮转与清理
+    过期归档都在写入线程中完成，归档的 zip 压缩再交给单独的线程，压缩期间
+    写入照常进行。归档命名与 loguru 一致（``<名称>.<时间>.log.zip``）。
+
+    Args:
+        path: 日志文件路径。
+        rotation_bytes: 文件超过该大小时轮转。
+        retention_sec: 归档保留时间（秒）。
+        compress: 是否将归档压缩为 zip。
+        encode: 在写入线程中把消息编码为字节，默认按 UTF-8 写入格式化后的文本。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        rotation_bytes: int = LOG_ROTATION_BYTES,
+        retention_sec: float = LOG_RETENTION_SEC,
+        compress: bool = True,
+        encode: Callable[[Any], bytes] = _encode_text,
+    ):
+        self.path = path
+        self.rotation_bytes = rotation_bytes
+        self.retention_sec = retention_sec
+        self.compress = compress
+        self.encode = encode
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._compressors: list[threading.Thread] = []
+        self._file: BinaryIO | None = None
+        self._size = 0
+        self._thread = threading.Thread(
+            target=self._run, name="buaalogin-log", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, message: str) -> None:
+        self._queue.put(message)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """等待此前放入队列的消息全部写入文件，返回是否在超时前完成。"""
+        if not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = 10) -> None:
+        """写完队列中剩余的消息并停止写入线程，等待压缩完成。"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        for thread in list(self._compressors):
+            thread.join(timeout)
+
+    def archives(self) -> list[Path]:
+        """已轮转的归档（含压缩中的未压缩文件），按名称即时间排序。"""
+        suffixes = (self.path.suffix, f"{self.path.suffix}.zip")
+        return sorted(p for p in self._related() if p.name.endswith(suffixes))
+
+    def _related(self) -> list[Path]:
+        """归档及其附属文件（压缩中的临时文件、`logs` 命令的时间索引）。"""
+        pattern = f"{self.path.stem}.*{self.path.suffix}*"
+        return [p for p in self.path.parent.glob(pattern) if p != self.path]
+
+    # region 写入线程
+
+    def _run(self) -> None:
+        self._open()
+        self._start_compressor(self._pending())
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            events = []
+            stop = False
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    self._write(self._encode(item))
+            self._flush_file()
+            for event in events:
+                event.set()
+            if stop:
+                self._close_file()
+                return
+
+    def _encode(self, message) -> bytes:
+        try:
+            return self.encode(message)
+        except Exception as e:
+            sys.stderr.write(f"日志编码失败: {e!r}\n")
+            return b""
+
+    def _open(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+            self._size = self._file.tell()
+        except OSError as e:
+            self._report(e)
+            self._file = None
+
+    def _write(self, data: bytes) -> None:
+        if self._size and self._size + len(data) > self.rotation_bytes:
+            self._rotate()
+        if self._file is None:
+            return
+        try:
+            self._file.write(data)
+            self._size += len(data)
+        except OSError as e:
+            self._report(e)
+
+    def _flush_file(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.flush()
+            except OSError as e:
+                self._report(e)
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError as e:
+                self._report(e)
+            self._file = None
+
+    def _rotate(self) -> None:
+        self._close_file()
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        archive = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        try:
+            os.replace(self.path, archive)
+        except OSError as e:
+            self._report(e)
+        else:
+            self._start_compressor([archive])
+        self._open()
+
+    def _pending(self) -> list[Path]:
+        """上次退出时未及压缩的归档。"""
+        if not self.compress:
+            return []
+        return [p for p in self.archives() if p.suffix == self.path.suffix]
+
+    # endregion
+
+    # region 压缩线程
+
+    def _start_compressor(self, archives: list[Path]) -> None:
+        self._compressors = [t for t in self._compressors if t.is_alive()]
+        thread = threading.Thread(
+            target=self._maintain,
+            args=(archives,),
+            name="buaalogin-log-compress",
+            daemon=True,
+        )
+        self._compressors.append(thread)
+        thread.start()
+
+    def _maintain(self, archives: list[Path]) -> None:
+        """压缩归档并清理过期归档。"""
+        if self.compress:
+            for archive in archives:
+                self._compress(archive)
+
+        deadline = time.time() - self.retention_sec
+        for path in self._related():
+            try:
+                if path.stat().st_mtime < deadline:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def _compress(self, archive: Path) -> None:
+        target = archive.with_name(f"{archive.name}.zip")
+        tmp = archive.with_name(f"{archive.name}.zip.tmp")
+        try:
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+                zf.write(archive, archive.name)
+            os.replace(tmp, target)
+            archive.unlink()
+        except OSError as e:
+            self._report(e)
+            tmp.unlink(missing_ok=True)
+
+    # endregion
+
+    @staticmethod
+    def _report(error: OSError) -> None:
+        # 日志文件本身出错时无法再写日志，只提示到 stderr
+        sys.stderr.write(f"日志文件写入失败: {error}\n")
+
+
+def setup_file(json_lines: bool = False) -> None:
+    """启用文件日志：永远记录 DEBUG 级别（带轮转和压缩，重复日志定期汇总）。
+
+    写入、轮转与压缩都在后台线程中进行，不阻塞记录日志的线程；进程退出时
+    自动写完队列中剩余的日志。只在需要记录运行过程的命令中调用，重复调用
+    无副作用。
+
+    Args:
+        json_lines: 同时写入 JSON Lines 日志 `LOG_JSON_FILE`（轮转设置相同），
+            供日志采集程序直接解析。
+    """
+    if _file_sinks:
+        return
+
+    text_sink = QueuedFileSink(LOG_FILE)
+    handler_id = logger.add(
+        text_sink,
+        format=LOG_FORMAT_FILE,
+        level="DEBUG",  # 文件永远记录全量日志
+        filter=_not_repeated,
+    )
+    _file_sinks[handler_id] = text_sink
+
+    if json_lines:
+        json_sink = QueuedFileSink(LOG_JSON_FILE, encode=encode_json)
+        # 消息在写入线程中由 encode_json 编码，格式只取消息本身
+        handler_id = logger.add(
+            json_sink, format="{message}", level="DEBUG", filter=_not_repeated
+        )
+        _file_sinks[handler_id] = json_sink
+
+    atexit.register(shutdown_file)
+
+
+def flush_file(timeout: float | None = None) -> bool:
+    """等待已记录的日志全部写入文件，未启用文件日志时直接返回 True。"""
+    return all(sink.flush(timeout) for sink in list(_file_sinks.values()))
+
+
+def shutdown_file() -> None:
+    """停用文件日志：写完队列中剩余的日志并等待归档压缩完成。"""
+    if not _file_sinks:
+        return
+    _dedup.flush()
+    for handler_id, sink in list(_file_sinks.items()):
+        logger.remove(handler_id)
+        sink.close()
+    _file_sinks.clear()
 
 
 def setup_console(verbose: bool = False) -> None:
@@ -58,10 +528,21 @@ def setup_console(verbose: bool = False) -> None:
         format=LOG_FORMAT_CONSOLE,
         level=level,
         colorize=True,
+        filter=_not_repeated,
     )
 
 
 # 默认 INFO 级别控制台输出
 setup_console(verbose=False)
 
-__all__ = ["logger", "setup_console"]
+__all__ = [
+    "Deduplicator",
+    "JsonRecord",
+    "QueuedFileSink",
+    "encode_json",
+    "flush_file",
+    "logger",
+    "setup_console",
+    "setup_file",
+    "shutdown_file",
+]
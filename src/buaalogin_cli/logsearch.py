@@ -0,0 +1,259 @@
+"""日志检索：按时间、级别与来源筛选当前日志和已轮转的归档
+
+文本日志超过大小后轮转为 ``<名称>.<时间>.log.zip``。`search` 按时间顺序
+流式读取各个归档（直接从 zip 中解压读取，不落盘）与当前日志文件，逐条
+筛选。每个归档第一次被完整读取后，在旁边写入一个很小的时间索引
+（``<归档>.idx``，记录首末两条日志的时间），之后按时间筛选时不再打开
+时间范围不相交的归档。
+
+日志行首的时间是本地时间 ``YYYY-MM-DD HH:MM:SS``，定长且按字典序与
+时间先后一致，筛选直接比较字符串。
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import re
+import zipfile
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import msgspec
+from msgspec import Struct
+
+from .constants import LOG_FILE
+
+# 索引格式版本，不一致时重建
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+# loguru 内置级别
+LEVELS = {
+    "TRACE": 5,
+    "DEBUG": 10,
+    "INFO": 20,
+    "SUCCESS": 25,
+    "WARNING": 30,
+    "ERROR": 40,
+    "CRITICAL": 50,
+}
+
+# 与 log.LOG_FORMAT_FILE 对应：时间 | 级别 | [trigger] | 位置 - 消息
+_HEADER = re.compile(r"(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d) \| (\w+) *\| \[(.*?) *\] \| ")
+_RELATIVE = re.compile(r"(\d+(?:\.\d+)?)([smhd])")
+_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_DATE_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%d",
+)
+_CLOCK_FORMATS = ("%H:%M:%S", "%H:%M")
+
+
+class ArchiveIndex(Struct, frozen=True, gc=False, array_like=True):
+    """归档的时间索引。
+
+    Attributes:
+        version: 格式版本。
+        size: 建立索引时归档的大小（字节）。
+        mtime_ns: 建立索引时归档的修改时间，与大小一起判断索引是否过期。
+        first: 第一条日志的时间，归档为空时为 None。
+        last: 最后一条日志的时间。
+    """
+
+    version: int
+    size: int
+    mtime_ns: int
+    first: str | None
+    last: str | None
+
+
+_index_encoder = msgspec.msgpack.Encoder()
+_index_decoder = msgspec.msgpack.Decoder(ArchiveIndex)
+
+
+class Query(Struct, frozen=True):
+    """日志筛选条件，时间为 ``YYYY-MM-DD HH:MM:SS`` 格式的本地时间。
+
+    Attributes:
+        since: 只保留该时间及之后的日志。
+        until: 只保留该时间之前的日志。
+        level: 最低级别（大写名称）。
+        triggers: 只保留这些来源，为空表示不限。
+    """
+
+    since: str | None = None
+    until: str | None = None
+    level: str | None = None
+    triggers: frozenset[str] = frozenset()
+
+    def overlaps(self, first: str | None, last: str | None) -> bool:
+        """时间范围 [first, last] 内是否可能有符合条件的日志。"""
+        if first is None or last is None:
+            return False
+        if self.since is not None and last < self.since:
+            return False
+        return self.until is None or first < self.until
+
+    def match(self, at: str, level: str, trigger: str) -> bool:
+        if self.since is not None and at < self.since:
+            return False
+        if self.until is not None and at >= self.until:
+            return False
+        if self.level is not None and LEVELS.get(level, 0) < LEVELS[self.level]:
+            return False
+        return not self.triggers or trigger in self.triggers
+
+
+def parse_time(value: str, *, now: datetime | None = None) -> str:
+    """解析时间参数，返回 ``YYYY-MM-DD HH:MM:SS`` 格式的本地时间。
+
+    支持 ``2024-05-01``、``2024-05-01 08:00[:30]``、今天的 ``08:00[:30]``，
+    以及 ``30m``、``2h``、``1d`` 等相对时间（多久以前，单位 s/m/h/d）。
+
+    Raises:
+        ValueError: 无法识别的格式。
+    """
+    now = now or datetime.now()
+    value = value.strip()
+    if match := _RELATIVE.fullmatch(value):
+        amount, unit = match.groups()
+        delta = timedelta(**{_UNITS[unit]: float(amount)})
+        return (now - delta).strftime(_TIME_FORMAT)
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime(_TIME_FORMAT)
+        except ValueError:
+            pass
+    for fmt in _CLOCK_FORMATS:
+        try:
+            clock = datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+        return datetime.combine(now.date(), clock).strftime(_TIME_FORMAT)
+    raise ValueError(f"无法识别的时间: {value}")
+
+
+def sources(log_file: Path | None = None) -> list[Path]:
+    """按时间顺序排列的日志文件：各个归档，最后是当前日志文件。
+
+    Args:
+        log_file: 当前日志文件，默认 `LOG_FILE`。
+    """
+    log_file = log_file if log_file is not None else LOG_FILE
+    suffixes = (log_file.suffix, f"{log_file.suffix}.zip")
+    pattern = f"{log_file.stem}.*{log_file.suffix}*"
+    archives = sorted(
+        p
+        for p in log_file.parent.glob(pattern)
+        if p != log_file and p.name.endswith(suffixes)
+    )
+    if log_file.exists():
+        archives.append(log_file)
+    return archives
+
+
+def search(query: Query, *, log_file: Path | None = None) -> Iterator[str]:
+    """按时间顺序产出符合条件的日志记录（异常回溯等续行归入所属记录）。
+
+    Args:
+        query: 筛选条件。
+        log_file: 当前日志文件，默认 `LOG_FILE`。
+    """
+    log_file = log_file if log_file is not None else LOG_FILE
+    for path in sources(log_file):
+        is_archive = path != log_file
+        index = _load_index(path) if is_archive else None
+        if index is not None and not query.overlaps(index.first, index.last):
+            if query.until is not None and (index.first or "") >= query.until:
+                return  # 之后的归档只会更晚
+            continue
+
+        first = last = None
+        past_until = False
+        try:
+            for at, level, trigger, text in _records(_lines(path)):
+                if first is None:
+                    first = at
+                last = at
+                if query.until is not None and at >= query.until:
+                    past_until = True
+                    if index is not None or not is_archive:
+                        return
+                    continue  # 未建索引的归档继续读完，以建立索引
+                if query.match(at, level, trigger):
+                    yield text
+        except (OSError, zipfile.BadZipFile):
+            continue  # 归档在读取期间被清理，或已损坏
+        if is_archive and index is None:
+            _save_index(path, first, last)
+        if past_until:
+            return  # 之后的文件只会更晚
+
+
+def _lines(path: Path) -> Iterator[str]:
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as zf:
+            names = zf.namelist()
+            if not names:
+                return
+            with zf.open(names[0]) as raw:
+                yield from io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+    else:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            yield from f
+
+
+def _records(lines: Iterable[str]) -> Iterator[tuple[str, str, str, str]]:
+    """把日志行分组为记录，产出 (时间, 级别, trigger, 文本)。"""
+    header: tuple[str, ...] | None = None
+    buffer: list[str] = []
+    for line in lines:
+        match = _HEADER.match(line)
+        if match is None:
+            if header is not None:
+                buffer.append(line)
+            continue
+        if header is not None:
+            yield header[0], header[1], header[2], "".join(buffer)
+        header = match.groups()
+        buffer = [line]
+    if header is not None:
+        yield header[0], header[1], header[2], "".join(buffer)
+
+
+def _index_path(archive: Path) -> Path:
+    return archive.with_name(f"{archive.name}{INDEX_SUFFIX}")
+
+
+def _load_index(archive: Path) -> ArchiveIndex | None:
+    """读取归档的时间索引，不存在或已过期时返回 None。"""
+    try:
+        index = _index_decoder.decode(_index_path(archive).read_bytes())
+        st = archive.stat()
+    except (OSError, msgspec.DecodeError):
+        return None
+    if (index.version, index.size, index.mtime_ns) != (
+        INDEX_VERSION,
+        st.st_size,
+        st.st_mtime_ns,
+    ):
+        return None
+    return index
+
+
+def _save_index(archive: Path, first: str | None, last: str | None) -> None:
+    path = _index_path(archive)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        st = archive.stat()
+        index = ArchiveIndex(INDEX_VERSION, st.st_size, st.st_mtime_ns, first, last)
+        tmp.write_bytes(_index_encoder.encode(index))
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)  # 日志目录只读等情况下不建索引
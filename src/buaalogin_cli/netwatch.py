@@ -0,0 +1,187 @@
+"""网络变化监听：订阅 rtnetlink 的链路、地址、路由变化，唤醒保活循环
+
+仅支持 Linux，其余平台（或无法创建 netlink 套接字时）`create_watcher`
+返回 None，保活循环退回纯轮询。
+"""
+
+from __future__ import annotations
+
+import select
+import socket
+import struct
+import time
+from typing import Protocol
+
+from .log import logger
+
+# linux/rtnetlink.h 多播组
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+RTNL_GROUPS = (
+    RTMGRP_LINK
+    | RTMGRP_IPV4_IFADDR
+    | RTMGRP_IPV4_ROUTE
+    | RTMGRP_IPV6_IFADDR
+    | RTMGRP_IPV6_ROUTE
+)
+
+# 消息类型
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+
+_ADDR_ROUTE_TYPES = frozenset({RTM_NEWADDR, RTM_DELADDR, RTM_NEWROUTE, RTM_DELROUTE})
+
+# 链路消息中值得关注的标志位：IFF_UP | IFF_RUNNING | IFF_LOWER_UP
+_LINK_FLAGS = 0x1 | 0x40 | 0x10000
+
+# struct nlmsghdr: len, type, flags, seq, pid
+_NLMSGHDR = struct.Struct("=IHHII")
+# struct ifinfomsg: family, pad, type, index, flags, change
+_IFINFOMSG = struct.Struct("=BxHiII")
+
+_RECV_BUFSIZE = 65536
+
+
+class Watcher(Protocol):
+    """网络变化监听器。"""
+
+    def wait(self, timeout: float) -> bool:
+        """最多等待 ``timeout`` 秒，期间发生网络变化时提前返回 True。"""
+        ...
+
+    def close(self) -> None: ...
+
+
+def is_relevant(data: bytes) -> bool:
+    """判断一批 rtnetlink 消息中是否有影响连通性的变化。
+
+    地址与路由的增删一律视为相关；链路消息只在 UP/RUNNING/LOWER_UP
+    状态变化或网卡增删时相关，忽略无线网卡周期性上报的统计类消息。
+    """
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            break
+
+        if msg_type in _ADDR_ROUTE_TYPES or msg_type == RTM_DELLINK:
+            return True
+        if msg_type == RTM_NEWLINK:
+            body = offset + _NLMSGHDR.size
+            if body + _IFINFOMSG.size > len(data):
+                return True
+            *_, change = _IFINFOMSG.unpack_from(data, body)
+            if change & _LINK_FLAGS:
+                return True
+
+        # 消息按 4 字节对齐
+        offset += (length + 3) & ~3
+    return False
+
+
+class NetlinkWatcher:
+    """基于 rtnetlink 多播的网络变化监听器。
+
+    网络切换时内核通常在数百毫秒内连续发出多条消息（链路、地址、路由），
+    收到第一条相关消息后继续读取，直到安静 ``settle_sec`` 秒（最多
+    ``max_settle_sec`` 秒）才返回，使唤醒后的检测发生在地址和路由就绪之后。
+
+    Args:
+        sock: 已绑定多播组的 netlink 套接字，默认新建。
+        settle_sec: 判定变化结束所需的安静时长（秒）。
+        max_settle_sec: 单次等待变化结束的最长时间（秒）。
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket | None = None,
+        *,
+        settle_sec: float = 1.0,
+        max_settle_sec: float = 5.0,
+    ):
+        self.sock = sock or _open_rtnetlink()
+        self.settle_sec = settle_sec
+        self.max_settle_sec = max_settle_sec
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def wait(self, timeout: float) -> bool:
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._readable(remaining):
+                return False
+            if self.consume():
+                break
+
+        self.settle()
+        return True
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def _readable(self, timeout: float) -> bool:
+        ready, _, _ = select.select([self.sock], [], [], timeout)
+        return bool(ready)
+
+    def consume(self) -> bool:
+        """读取所有已到达的消息，返回其中是否有相关变化。"""
+        relevant = False
+        while True:
+            try:
+                data = self.sock.recv(_RECV_BUFSIZE, socket.MSG_DONTWAIT)
+            except BlockingIOError:
+                return relevant
+            except OSError as e:
+                # ENOBUFS：消息过多导致接收缓冲区溢出，说明确实发生了变化
+                logger.bind(trigger="run").debug(f"读取 netlink 消息出错: {e}")
+                return True
+            if not data:
+                return relevant
+            relevant = relevant or is_relevant(data)
+
+    def settle(self) -> None:
+        """等待本次变化结束（安静 ``settle_sec`` 秒）。"""
+        limit = time.monotonic() + self.max_settle_sec
+        while True:
+            remaining = min(self.settle_sec, limit - time.monotonic())
+            if remaining <= 0 or not self._readable(remaining):
+                break
+            self.consume()
+        logger.bind(trigger="run").info("检测到网络变化，立即检查")
+
+
+def _open_rtnetlink() -> socket.socket:
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    try:
+        sock.bind((0, RTNL_GROUPS))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def create_watcher() -> NetlinkWatcher | None:
+    """创建网络变化监听器，当前平台不支持时返回 None。"""
+    log = logger.bind(trigger="run")
+
+    if not hasattr(socket, "AF_NETLINK"):
+        log.info("当前平台不支持 netlink，使用定时轮询")
+        return None
+    try:
+        watcher = NetlinkWatcher()
+    except OSError as e:
+        log.warning(f"无法监听网络变化，使用定时轮询: {e}")
+        return None
+
+    log.info("已启用网络变化监听（rtnetlink）")
+    return watcher
@@ -0,0 +1,122 @@
+"""保活状态持久化：重启（重启电脑、进程崩溃）后从上次的状态继续
+
+保存最近一次检测状态、最近一次登录成功的时间、登录熔断器与自适应调度器的
+状态，以及最近几次登录耗时。状态文件为 msgpack 编码，只在内容变化时写入，
+写入先落到临时文件再 ``os.replace``，中途崩溃不会留下半个文件。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import msgspec
+from msgspec import Struct, structs
+
+from .breaker import BreakerStatus
+from .constants import STATE_FILE
+from .log import logger
+from .scheduler import SchedulerState
+from .status import NetworkStatus
+
+# 状态文件格式版本，不一致时丢弃旧文件
+STATE_VERSION = 1
+# 保存的最近登录耗时样本数
+MAX_LOGIN_SAMPLES = 32
+
+
+class KeepAliveState(Struct, frozen=True, omit_defaults=True):
+    """跨重启保留的保活状态。
+
+    Attributes:
+        version: 格式版本。
+        saved_at: 保存时间（Unix 时间戳，秒）。
+        credentials: 账号密码的指纹（不保存密码本身），用于判断凭据是否已更换。
+        status: 最近一次检测到的网络状态。
+        last_login_at: 最近一次登录成功的时间（Unix 时间戳，秒）。
+        breaker: 登录熔断器状态。
+        config_stamp: 熔断打开时配置文件的 (mtime_ns, size)。
+        scheduler: 调度器状态。
+        login_durations: 最近几次登录的耗时（秒）。
+    """
+
+    version: int = STATE_VERSION
+    saved_at: float = 0.0
+    credentials: str | None = None
+    status: NetworkStatus | None = None
+    last_login_at: float | None = None
+    breaker: BreakerStatus | None = None
+    config_stamp: tuple[int, int] | None = None
+    scheduler: SchedulerState | None = None
+    login_durations: list[float] = []
+
+
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder(KeepAliveState)
+
+
+def fingerprint(username: str, password: str) -> str:
+    """账号密码的指纹。"""
+    digest = hashlib.sha256(f"{username}\0{password}".encode()).hexdigest()
+    return digest[:16]
+
+
+class StateStore:
+    """保活状态文件的读写。
+
+    Args:
+        path: 状态文件路径，默认 `STATE_FILE`。
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path if path is not None else STATE_FILE
+        self.state: KeepAliveState | None = None
+
+    def load(self) -> KeepAliveState | None:
+        """读取状态文件，不存在、损坏或版本不符时返回 None。"""
+        try:
+            state = _decoder.decode(self.path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, msgspec.DecodeError) as e:
+            logger.bind(trigger="run").debug(f"忽略无法读取的保活状态: {e}")
+            return None
+        if state.version != STATE_VERSION:
+            return None
+        self.state = state
+        return state
+
+    def save(self, state: KeepAliveState) -> bool:
+        """内容（不计保存时间）与上次不同时原子地写入，返回是否写入。"""
+        last = self.state
+        if last is not None and structs.replace(state, saved_at=last.saved_at) == last:
+            return False
+
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(_encoder.encode(state))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.bind(trigger="run").debug(f"无法保存保活状态: {e}")
+            tmp.unlink(missing_ok=True)
+            return False
+        self.state = state
+        return True
+
+
+def describe(state: KeepAliveState) -> str:
+    """生成恢复状态时的日志描述。"""
+    parts = [f"{time.time() - state.saved_at:.0f} 秒前保存"]
+    if state.status is not None:
+        parts.append(f"状态 {state.status}")
+    if state.last_login_at is not None:
+        login_time = time.strftime(
+            "%m-%d %H:%M:%S", time.localtime(state.last_login_at)
+        )
+        parts.append(f"上次登录成功于 {login_time}")
+    if state.breaker is not None and state.breaker.failures:
+        parts.append(f"连续登录失败 {state.breaker.failures} 次")
+    return "，".join(parts)
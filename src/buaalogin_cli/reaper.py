@@ -0,0 +1,285 @@
+"""残留浏览器清理：记录启动的 Chromium 进程，回收异常中断后遗留的进程
+
+登录被中途打断（保活进程被 SIGKILL、``page.goto`` 超时与退出竞争、Playwright
+驱动崩溃等）时，``headless_shell`` / chromium 进程可能脱离本进程继续运行并占用
+内存。每次启动浏览器后，`track` 把本进程下的浏览器进程记入 pidfile；`reap`
+结束其中已不属于任何存活记录者的进程：
+
+- 记录者（保活进程或隔离登录子进程）已退出；
+- 或进程已脱离记录者的进程树（如驱动崩溃后被 init 收养）。
+
+记录同时保存进程启动时间，PID 被复用时不会误杀无关进程。仅支持 Linux（/proc）。
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import msgspec
+from msgspec import Struct
+
+from .constants import BROWSER_PIDFILE
+from .log import logger
+
+# 保活循环中定期清理的间隔（秒）
+REAP_INTERVAL_SEC = 600.0
+# 发送 SIGTERM 后等待进程退出的时间（秒），超时改发 SIGKILL
+TERM_GRACE_SEC = 2.0
+
+_PROC = Path("/proc")
+_BROWSER_NAMES = ("chrome", "chromium", "headless_shell")
+
+
+class BrowserProcess(Struct, frozen=True, gc=False, array_like=True):
+    """一条浏览器进程记录。
+
+    Attributes:
+        pid: 浏览器进程 PID。
+        started: 进程启动时间（/proc/<pid>/stat 的 starttime，时钟节拍）。
+        owner: 启动该浏览器的本工具进程 PID。
+    """
+
+    pid: int
+    started: int
+    owner: int
+
+
+_encoder = msgspec.json.Encoder()
+_decoder = msgspec.json.Decoder(list[BrowserProcess])
+
+
+def is_supported() -> bool:
+    """当前平台是否可以读取 /proc。"""
+    return (_PROC / "self" / "stat").exists()
+
+
+# region /proc
+
+
+def _stat(pid: int) -> tuple[int, int] | None:
+    """返回进程的 (ppid, starttime)，进程不存在或已成为僵尸时返回 None。"""
+    try:
+        raw = (_PROC / str(pid) / "stat").read_text(encoding="ascii", errors="replace")
+    except OSError:
+        return None
+    # comm 字段可能包含空格与括号，从最后一个右括号之后解析
+    fields = raw[raw.rfind(")") + 2 :].split()
+    if fields[0] in ("Z", "X"):
+        return None
+    return int(fields[1]), int(fields[19])
+
+
+def _children_map() -> dict[int, list[int]]:
+    children: dict[int, list[int]] = {}
+    for entry in _PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        stat = _stat(int(entry.name))
+        if stat is not None:
+            children.setdefault(stat[0], []).append(int(entry.name))
+    return children
+
+
+def _descendants(root: int, children: dict[int, list[int]]) -> set[int]:
+    found: set[int] = set()
+    stack = [root]
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            if child not in found:
+                found.add(child)
+                stack.append(child)
+    return found
+
+
+def _is_browser(pid: int) -> bool:
+    try:
+        argv0 = (_PROC / str(pid) / "cmdline").read_bytes().split(b"\0", 1)[0]
+    except OSError:
+        return False
+    name = os.path.basename(argv0.decode(errors="replace")).lower()
+    return any(part in name for part in _BROWSER_NAMES)
+
+
+def _rss_kb(pid: int) -> int:
+    try:
+        with open(_PROC / str(pid) / "status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+# endregion
+
+# region pidfile
+
+
+@contextmanager
+def _locked_records(path: Path) -> Iterator[list[BrowserProcess]]:
+    """在文件锁内读取记录，退出时写回（供调用方原地修改）。"""
+    import fcntl
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        raw = f.read()
+        try:
+            records = _decoder.decode(raw) if raw.strip() else []
+        except msgspec.DecodeError:
+            records = []  # 文件损坏时放弃旧记录
+        before = list(records)
+        yield records
+        if records != before:
+            f.seek(0)
+            f.truncate()
+            f.write(_encoder.encode(records))
+            f.flush()
+
+
+def track(owner: int | None = None, *, path: Path | None = None) -> int:
+    """把 ``owner``（默认本进程）下的浏览器进程记入 pidfile。
+
+    Args:
+        owner: 父进程 PID，默认本进程。
+        path: pidfile 路径，默认 `BROWSER_PIDFILE`。
+
+    Returns:
+        新记录的进程数。
+    """
+    if not is_supported():
+        return 0
+    owner = os.getpid() if owner is None else owner
+
+    found = []
+    for pid in _descendants(owner, _children_map()):
+        stat = _stat(pid)
+        if stat is not None and _is_browser(pid):
+            found.append(BrowserProcess(pid, stat[1], owner))
+    if not found:
+        return 0
+
+    path = path if path is not None else BROWSER_PIDFILE
+    try:
+        with _locked_records(path) as records:
+            known = {(r.pid, r.started) for r in records}
+            added = [r for r in found if (r.pid, r.started) not in known]
+            records.extend(added)
+    except OSError as e:
+        logger.bind(trigger="browser").debug(f"无法记录浏览器进程: {e}")
+        return 0
+    return len(added)
+
+
+def reap(*, path: Path | None = None) -> tuple[int, int]:
+    """结束记录中已无人管理的浏览器进程，并清理失效记录。
+
+    Args:
+        path: pidfile 路径，默认 `BROWSER_PIDFILE`。
+
+    Returns:
+        (结束的进程数, 结束前这些进程的 RSS 之和（KiB）)。
+    """
+    path = path if path is not None else BROWSER_PIDFILE
+    if not is_supported() or not path.exists():
+        return 0, 0
+
+    log = logger.bind(trigger="browser")
+    try:
+        with _locked_records(path) as records:
+            children = _children_map()
+            owned: dict[int, set[int]] = {}
+            stale: list[BrowserProcess] = []
+            keep: list[BrowserProcess] = []
+
+            for record in records:
+                stat = _stat(record.pid)
+                if stat is None or stat[1] != record.started:
+                    continue  # 已退出，或 PID 已被其他进程复用
+                if _stat(record.owner) is not None:
+                    if record.owner not in owned:
+                        owned[record.owner] = _descendants(record.owner, children)
+                    if record.pid in owned[record.owner]:
+                        keep.append(record)  # 仍由存活的记录者管理
+                        continue
+                stale.append(record)
+
+            rss_kb = sum(_rss_kb(r.pid) for r in stale)
+            killed = _terminate(stale)
+            records[:] = keep
+    except OSError as e:
+        log.debug(f"无法读取浏览器进程记录: {e}")
+        return 0, 0
+
+    if killed:
+        log.warning(
+            f"已清理 {killed} 个残留浏览器进程，回收内存约 {rss_kb / 1024:.1f} MiB"
+        )
+    return killed, rss_kb
+
+
+def _terminate(stale: list[BrowserProcess]) -> int:
+    """先 SIGTERM，宽限期后仍存活的改发 SIGKILL，返回结束的进程数。"""
+    log = logger.bind(trigger="browser")
+    signalled: list[BrowserProcess] = []
+    for record in stale:
+        try:
+            os.kill(record.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            continue
+        except PermissionError as e:
+            log.debug(f"无法结束浏览器进程 {record.pid}: {e}")
+            continue
+        log.debug(f"结束残留浏览器进程 {record.pid}（记录者 {record.owner}）")
+        signalled.append(record)
+
+    deadline = time.monotonic() + TERM_GRACE_SEC
+    alive = signalled
+    while alive and time.monotonic() < deadline:
+        time.sleep(0.05)
+        alive = [r for r in alive if _same_process(r)]
+    for record in alive:
+        try:
+            os.kill(record.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    return len(signalled)
+
+
+def _same_process(record: BrowserProcess) -> bool:
+    stat = _stat(record.pid)
+    return stat is not None and stat[1] == record.started
+
+
+class Reaper:
+    """在保活循环中按间隔执行 `reap`。
+
+    Args:
+        interval_sec: 清理间隔（秒）。
+        path: pidfile 路径，默认 `BROWSER_PIDFILE`。
+    """
+
+    def __init__(
+        self, interval_sec: float = REAP_INTERVAL_SEC, *, path: Path | None = None
+    ):
+        self.interval_sec = interval_sec
+        self.path = path
+        self._last = float("-inf")
+
+    def run(self) -> tuple[int, int]:
+        """立即清理。"""
+        self._last = time.monotonic()
+        return reap(path=self.path)
+
+    def tick(self) -> tuple[int, int]:
+        """距上次清理超过间隔时清理，否则什么也不做。"""
+        if time.monotonic() - self._last < self.interval_sec:
+            return 0, 0
+        return self.run()
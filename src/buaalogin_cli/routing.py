@@ -0,0 +1,126 @@
+"""登录页请求过滤：只放行登录所需的页面、脚本和接口请求"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from urllib.parse import urlparse
+
+from msgspec import Struct, field
+
+from .constants import GATEWAY_URL, ResourceProfile
+
+
+class FilterProfile(Struct, frozen=True):
+    """请求过滤规则。
+
+    请求须同时满足以下条件才会放行，其余一律 abort：
+
+    - 资源类型在 ``resource_types`` 中；
+    - 主机在 ``hosts`` 中，或 URL 匹配 ``allow_patterns`` 中任一正则；
+    - URL 不匹配 ``deny_patterns`` 中任一正则。
+
+    Attributes:
+        resource_types: 放行的 Playwright 资源类型。
+        hosts: 放行的主机名，默认仅网关自身。
+        allow_patterns: 额外放行的 URL 正则（不受 hosts 限制）。
+        deny_patterns: 始终拦截的 URL 正则（如统计脚本）。
+    """
+
+    resource_types: frozenset[str]
+    hosts: frozenset[str] = field(
+        default_factory=lambda: frozenset({urlparse(GATEWAY_URL).hostname or ""})
+    )
+    allow_patterns: tuple[str, ...] = ()
+    deny_patterns: tuple[str, ...] = ()
+
+
+_ANALYTICS_PATTERNS = (
+    r"hm\.baidu\.com",
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"cnzz\.com",
+    r"/analytics",
+)
+
+PROFILES: dict[ResourceProfile, FilterProfile | None] = {
+    ResourceProfile.OFF: None,
+    # 登录选择器依赖 :visible，需要样式表参与布局，因此保留 stylesheet
+    ResourceProfile.DEFAULT: FilterProfile(
+        resource_types=frozenset({"document", "script", "xhr", "fetch", "stylesheet"}),
+        deny_patterns=_ANALYTICS_PATTERNS,
+    ),
+    # 仅放行 HTML、脚本与接口请求，适合已确认不依赖样式的网关页面
+    ResourceProfile.STRICT: FilterProfile(
+        resource_types=frozenset({"document", "script", "xhr", "fetch"}),
+        deny_patterns=_ANALYTICS_PATTERNS,
+    ),
+}
+
+
+class RequestFilter:
+    """基于 ``page.route`` 的请求过滤器，并统计放行与拦截情况。
+
+    被拦截的请求不会发出，其响应体积无从得知，因此只统计拦截数量；
+    放行请求按响应头中的 Content-Length 累计字节数。
+
+    Args:
+        profile: 过滤规则。
+    """
+
+    def __init__(self, profile: FilterProfile):
+        self.profile = profile
+        self._allow = [re.compile(p) for p in profile.allow_patterns]
+        self._deny = [re.compile(p) for p in profile.deny_patterns]
+        self.allowed = 0
+        self.allowed_bytes = 0
+        self.blocked: Counter[str] = Counter()
+
+    @property
+    def blocked_total(self) -> int:
+        """被拦截的请求总数。"""
+        return sum(self.blocked.values())
+
+    def allows(self, url: str, resource_type: str) -> bool:
+        """判断请求是否放行。"""
+        if any(p.search(url) for p in self._deny):
+            return False
+        if any(p.search(url) for p in self._allow):
+            return True
+        return (
+            resource_type in self.profile.resource_types
+            and urlparse(url).hostname in self.profile.hosts
+        )
+
+    def install(self, page) -> None:
+        """在页面上注册路由与响应统计。"""
+        page.route("**/*", self._handle)
+        page.on("response", self._on_response)
+
+    def summary(self) -> str:
+        """生成一行统计摘要。"""
+        detail = ", ".join(f"{t}×{n}" for t, n in self.blocked.most_common())
+        return (
+            f"放行 {self.allowed} 个请求（{self.allowed_bytes / 1024:.1f} KB），"
+            f"拦截 {self.blocked_total} 个" + (f"（{detail}）" if detail else "")
+        )
+
+    def _handle(self, route) -> None:
+        request = route.request
+        if self.allows(request.url, request.resource_type):
+            self.allowed += 1
+            route.continue_()
+        else:
+            self.blocked[request.resource_type] += 1
+            route.abort()
+
+    def _on_response(self, response) -> None:
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.allowed_bytes += int(length)
+
+
+def create_filter(profile: ResourceProfile) -> RequestFilter | None:
+    """按预设名称创建过滤器，``off`` 时返回 None。"""
+    rules = PROFILES[profile]
+    return RequestFilter(rules) if rules is not None else None
@@ -0,0 +1,254 @@
+"""保活轮询调度：计算下一次检测的时间，按单调时钟等待"""
+
+from __future__ import annotations
+
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Protocol
+
+from msgspec import Struct
+
+from .constants import PollPolicy
+from .status import NetworkStatus
+
+if TYPE_CHECKING:
+    from .netwatch import Watcher
+
+# 出错（异常而非网络状态）后的重试间隔上限
+ERROR_RETRY_SEC = 10.0
+# 实际唤醒时间与截止时间相差超过该值时（如系统休眠），以当前时间重新对齐
+_RESYNC_LAG_SEC = 1.0
+
+
+class Clock(Protocol):
+    """调度器使用的时钟，测试时可替换为虚拟时钟。"""
+
+    def monotonic(self) -> float: ...
+
+    def sleep(self, seconds: float) -> None: ...
+
+
+class SchedulerState(Struct, frozen=True, gc=False, omit_defaults=True):
+    """调度器需要跨重启保留的状态。
+
+    Attributes:
+        last_status: 上一轮检测到的状态。
+        last_relogin: 上一轮是否执行了登录。
+        failures: 连续处于非校园网环境（或出错）的轮数。
+    """
+
+    last_status: NetworkStatus | None = None
+    last_relogin: bool = False
+    failures: int = 0
+
+
+class SystemClock:
+    """基于 `time.monotonic` / `time.sleep` 的真实时钟。"""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+
+class Scheduler(ABC):
+    """轮询调度器基类。
+
+    每轮检测开始时调用 `start_tick`，结束时调用 `wait`（或依次调用 `plan`
+    和 `sleep`）。下一次检测的截止时间以本轮的计划开始时间为基准，而不是
+    以检测结束或实际唤醒的时间为基准，因此检测耗时和 sleep 的误差不会
+    逐轮累积。
+
+    提供 ``watcher`` 时，等待期间一旦发生网络变化即提前结束等待，下一轮
+    以唤醒时间重新对齐。
+
+    Args:
+        interval: 基础检测间隔（秒）。
+        clock: 时钟，默认使用系统单调时钟。
+        watcher: 网络变化监听器。
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        *,
+        clock: Clock | None = None,
+        watcher: Watcher | None = None,
+    ):
+        self.interval = interval
+        self.clock = clock or SystemClock()
+        self.watcher = watcher
+        self._anchor: float | None = None
+        self._deadline: float | None = None
+
+    def start_tick(self) -> None:
+        """标记本轮检测开始。"""
+        now = self.clock.monotonic()
+        deadline = self._deadline
+        if deadline is not None and 0 <= now - deadline < _RESYNC_LAG_SEC:
+            self._anchor = deadline
+        else:
+            self._anchor = now
+
+    @abstractmethod
+    def next_delay(self, status: NetworkStatus | None, *, relogin: bool) -> float:
+        """计算距下一次检测的间隔（秒）。
+
+        Args:
+            status: 本轮检测到的状态，检测过程抛出异常时为 None。
+            relogin: 本轮是否执行了登录。
+        """
+
+    def plan(self, status: NetworkStatus | None, *, relogin: bool = False) -> float:
+        """根据本轮结果确定下一次检测的截止时间，返回计划间隔。"""
+        delay = self.next_delay(status, relogin=relogin)
+        if self._anchor is None:
+            self._anchor = self.clock.monotonic()
+        self._deadline = self._anchor + delay
+        return delay
+
+    def sleep(self) -> bool:
+        """等待到已计划的截止时间，因网络变化提前唤醒时返回 True。"""
+        if self._deadline is None:
+            return False
+        remaining = max(0.0, self._deadline - self.clock.monotonic())
+        if self.watcher is not None:
+            return self.watcher.wait(remaining)
+        self.clock.sleep(remaining)
+        return False
+
+    def wait(self, status: NetworkStatus | None, *, relogin: bool = False) -> float:
+        """`plan` 后 `sleep`，返回计划间隔。"""
+        delay = self.plan(status, relogin=relogin)
+        self.sleep()
+        return delay
+
+    def reconfigure(
+        self, interval: float, *, max_interval: float | None = None
+    ) -> None:
+        """修改检测间隔（配置热更新），从下一次计划起生效。
+
+        Args:
+            interval: 新的基础检测间隔（秒）。
+            max_interval: 新的退避间隔上限（秒），None 表示不变，仅自适应策略使用。
+        """
+        self.interval = interval
+
+    def export_state(self) -> SchedulerState:
+        """导出需要跨重启保留的状态。"""
+        return SchedulerState()
+
+    def restore(self, state: SchedulerState) -> None:
+        """从 `export_state` 的结果恢复，默认没有需要恢复的状态。"""
+        return
+
+
+class FixedScheduler(Scheduler):
+    """固定间隔：每轮都等待 ``interval``，出错后较快重试。"""
+
+    def next_delay(self, status: NetworkStatus | None, *, relogin: bool) -> float:
+        if status is None:
+            return min(ERROR_RETRY_SEC, self.interval)
+        return self.interval
+
+
+class AdaptiveScheduler(Scheduler):
+    """自适应间隔。
+
+    - 刚登录或刚掉线后，以 ``fast_interval`` 快速复查（连续登录时只在第一次
+      快速复查，避免登录持续失败时频繁重试）；
+    - 持续处于非校园网环境（或持续出错）时按指数退避，直至 ``max_interval``；
+    - 其余情况使用 ``interval``；
+    - 所有间隔叠加 ±``jitter`` 比例的随机抖动，避免多台机器同时请求网关。
+
+    Args:
+        interval: 基础检测间隔（秒）。
+        fast_interval: 登录或掉线后的复查间隔（秒）。
+        max_interval: 退避间隔上限（秒）。
+        jitter: 抖动比例，0.1 表示 ±10%。
+        clock: 时钟。
+        watcher: 网络变化监听器。
+        rng: 随机数生成器，测试时可传入固定种子。
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        *,
+        fast_interval: float = 5.0,
+        max_interval: float = 600.0,
+        jitter: float = 0.1,
+        clock: Clock | None = None,
+        watcher: Watcher | None = None,
+        rng: random.Random | None = None,
+    ):
+        super().__init__(interval, clock=clock, watcher=watcher)
+        self._fast_setting = fast_interval
+        self._max_setting = max_interval
+        self.fast_interval = min(fast_interval, interval)
+        self.max_interval = max(max_interval, interval)
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self._last_status: NetworkStatus | None = None
+        self._last_relogin = False
+        self._failures = 0
+
+    def next_delay(self, status: NetworkStatus | None, *, relogin: bool) -> float:
+        dropped = (
+            self._last_status == NetworkStatus.LOGGED_IN
+            and status != NetworkStatus.LOGGED_IN
+        )
+        fresh_relogin = relogin and not self._last_relogin
+        self._last_status = status
+        self._last_relogin = relogin
+
+        if status is None or status == NetworkStatus.UNKNOWN_NETWORK:
+            self._failures += 1
+        else:
+            self._failures = 0
+
+        if fresh_relogin or dropped:
+            base = self.fast_interval
+        elif self._failures > 0:
+            base = min(self.max_interval, self.interval * 2 ** (self._failures - 1))
+        else:
+            base = self.interval
+
+        if self.jitter <= 0:
+            return base
+        return base * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def reconfigure(
+        self, interval: float, *, max_interval: float | None = None
+    ) -> None:
+        super().reconfigure(interval)
+        if max_interval is not None:
+            self._max_setting = max_interval
+        self.fast_interval = min(self._fast_setting, interval)
+        self.max_interval = max(self._max_setting, interval)
+
+    def export_state(self) -> SchedulerState:
+        return SchedulerState(self._last_status, self._last_relogin, self._failures)
+
+    def restore(self, state: SchedulerState) -> None:
+        self._last_status = state.last_status
+        self._last_relogin = state.last_relogin
+        self._failures = state.failures
+
+
+def create_scheduler(
+    policy: PollPolicy,
+    interval: float,
+    *,
+    max_interval: float = 600.0,
+    clock: Clock | None = None,
+    watcher: Watcher | None = None,
+) -> Scheduler:
+    """按策略名称创建调度器。"""
+    if policy == PollPolicy.ADAPTIVE:
+        return AdaptiveScheduler(
+            interval, max_interval=max_interval, clock=clock, watcher=watcher
+        )
+    return FixedScheduler(interval, clock=clock, watcher=watcher)
@@ -1,17 +1,48 @@
-"""网络状态检测、登录、持续保活"""
+"""登录、持续保活"""
 
+from __future__ import annotations
+
+import signal
 import subprocess
 import sys
+import threading
 import time
-from enum import Enum, auto
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any
 
-import requests
+import msgspec
+from playwright.sync_api import Browser, Page, Playwright, Response, sync_playwright
 from playwright.sync_api import TimeoutError as PlaywrightTimeout
-from playwright.sync_api import sync_playwright
 
-from .constants import LOG_FILE, LOGIN_URL, RAD_USER_INFO_URL
+from . import (
+    breaker,
+    control,
+    exporter,
+    gateway,
+    ledger,
+    locking,
+    persist,
+    reaper,
+    srun,
+    timing,
+    worker,
+)
+from .config import ConfigWatcher
+from .constants import (
+    GATEWAY_URL,
+    LOG_FILE,
+    LOGIN_URL,
+    LoginEngine,
+    PollPolicy,
+    ResourceProfile,
+)
 from .log import logger
+from .netwatch import NetlinkWatcher, create_watcher
+from .routing import create_filter
+from .scheduler import Scheduler, create_scheduler
+from .status import NetworkStatus, get_status
 
 USERNAME_SELECTOR = (
     "#username:visible, input[name='username']:visible, input[type='text']:visible"
@@ -23,6 +54,11 @@ LOGIN_BUTTON_SELECTOR = (
     '#login-account:visible, #login:visible, button:has-text("登录"):visible, '
     'button:has-text("Login"):visible'
 )
+LOGIN_API_PATH = "/cgi-bin/srun_portal"
+
+DEFAULT_LOGIN_TIMEOUT_SEC = 15.0
+# 等待其他进程完成登录的最长时间（秒），需覆盖浏览器登录与隔离登录的截止时间
+LOGIN_LOCK_WAIT_SEC = 180.0
 
 
 class LoginError(Exception):
@@ -31,56 +67,6 @@ class LoginError(Exception):
     pass
 
 
-class NetworkStatus(Enum):
-    """网络状态枚举。"""
-
-    UNKNOWN_NETWORK = auto()  # 非校园网环境（DNS 解析失败或超时）
-    LOGGED_OUT = auto()  # 校园网环境，未登录
-    LOGGED_IN = auto()  # 校园网环境，已登录
-
-
-# region 网络状态检测
-
-
-def get_status() -> NetworkStatus:
-    """获取当前网络状态。
-
-    通过访问深澜 rad_user_info API 检测：
-    - 请求失败（DNS/超时）→ UNKNOWN_NETWORK（非校园网环境）
-    - API 返回用户信息 → LOGGED_IN
-    - API 返回空或错误 → LOGGED_OUT
-
-    Returns:
-        NetworkStatus 枚举值。
-    """
-    log = logger.bind(trigger="status")
-    log.debug(f"正在检测网络状态：{RAD_USER_INFO_URL}")
-
-    try:
-        response = requests.get(
-            RAD_USER_INFO_URL,
-            headers={"User-Agent": "Mozilla/5.0"},
-            timeout=5,
-        )
-        text = response.text.strip()
-
-        # API 响应格式：
-        # - 已登录: 逗号分隔的用户信息，如 "93830,1770015058,..."
-        # - 未登录: "not_online_error"
-        if text == "not_online_error":
-            log.debug("网络状态: 未登录 (API 响应: not_online_error)")
-            return NetworkStatus.LOGGED_OUT
-        log.debug(f"网络状态: 已登录 (API 响应: {text[:50]}...)")
-        return NetworkStatus.LOGGED_IN
-
-    except requests.RequestException as e:
-        log.debug(f"网络状态: 非校园网环境，请检查网络连接或代理设置 ({e})")
-        return NetworkStatus.UNKNOWN_NETWORK
-
-
-# endregion
-
-
 # region 登录
 
 
@@ -106,13 +92,34 @@ def _install_browser() -> None:
     log.info("Chromium 浏览器安装完成")
 
 
-def login(username: str, password: str, *, headless: bool = True) -> None:
-    """使用 Playwright 模拟浏览器登录校园网。
+def login(
+    username: str,
+    password: str,
+    *,
+    headless: bool = True,
+    engine: LoginEngine = LoginEngine.BROWSER,
+    browser: WarmBrowser | None = None,
+    resource_filter: ResourceProfile = ResourceProfile.DEFAULT,
+    timeout_sec: float = DEFAULT_LOGIN_TIMEOUT_SEC,
+    isolation: worker.Isolation | None = None,
+    exclusive: bool = True,
+) -> None:
+    """登录校园网。
+
+    同一时间只有一个进程执行登录：其他进程正在登录时，等待并复用它的结果。
 
     Args:
         username: 用户名。
         password: 密码。
-        headless: 是否使用无头模式。
+        headless: 是否使用无头模式（仅浏览器引擎）。
+        engine: 登录引擎，浏览器模拟或纯 HTTP 协议。
+        browser: 复用的常驻浏览器（仅浏览器引擎），为空时临时启动。
+        resource_filter: 登录页请求过滤预设（仅浏览器引擎）。
+        timeout_sec: 提交登录后等待结果的最长时间（秒）。
+        isolation: 不为空时在受限的子进程中执行浏览器登录（仅浏览器引擎），
+            此时忽略 ``browser``。
+        exclusive: 是否持有跨进程登录锁。隔离登录子进程由保活进程代为持有，
+            不应再次获取。
 
     Raises:
         LoginError: 登录失败时抛出，包含错误信息。
@@ -120,77 +127,363 @@ def login(username: str, password: str, *, headless: bool = True) -> None:
     log = logger.bind(trigger="login")
 
     # 先快速检查状态，避免不必要地启动浏览器
-    status = get_status()
+    status = get_status().status
     if status == NetworkStatus.LOGGED_IN:
         log.info("已经处于登录状态")
         return
     if status == NetworkStatus.UNKNOWN_NETWORK:
         raise LoginError("未检测到校园网环境")
 
-    # 只有 LOGGED_OUT 时才启动浏览器
-    with sync_playwright() as p:
-        browser_path = p.chromium.executable_path
-        browser = None
-
-        try:
-            if not Path(browser_path).exists():
-                _install_browser()
+    # 只有 LOGGED_OUT 时才执行登录
+    def run() -> None:
+        if engine == LoginEngine.BROWSER and isolation is not None:
+            # 子进程自行计时，结果随登录结果一并传回
+            worker.login_isolated(
+                username,
+                password,
+                isolation=isolation,
+                headless=headless,
+                resource_filter=resource_filter,
+                timeout_sec=timeout_sec,
+            )
+            return
+
+        with timing.trace("login"):
+            if engine == LoginEngine.HTTP:
+                _login_http(username, password, timeout_sec)
+            else:
+                _login_browser(
+                    username,
+                    password,
+                    headless=headless,
+                    browser=browser,
+                    resource_filter=resource_filter,
+                    timeout_sec=timeout_sec,
+                )
+
+    if exclusive:
+        _single_flight(run)
+    else:
+        run()
+
+
+def _single_flight(run: Callable[[], None]) -> None:
+    """持有跨进程登录锁执行 ``run``；其他进程正在登录时等待并复用其结果。"""
+    log = logger.bind(trigger="login")
+    lock = locking.FileLock(locking.LOGIN_LOCK)
+    # 在第一次尝试加锁前取时间：先行者可能在两次加锁之间就已完成登录
+    waited_from = time.time()
 
-            log.debug(f"使用浏览器: {browser_path}")
+    try:
+        acquired = lock.acquire()
+    except OSError as e:
+        log.debug(f"无法获取登录锁，直接登录: {e}")
+        run()
+        return
 
-            browser = p.chromium.launch(headless=headless, executable_path=browser_path)
-            context = browser.new_context()
-            page = context.new_page()
+    if not acquired:
+        log.info(f"进程 {lock.holder_pid()} 正在登录，等待其结果...")
+        if not lock.acquire(timeout=LOGIN_LOCK_WAIT_SEC):
+            raise LoginError(f"等待其他进程登录超时（{LOGIN_LOCK_WAIT_SEC:g} 秒）")
+        result = locking.read_result(path=locking.LOGIN_RESULT)
+        if result is not None and result.finished_at >= waited_from:
+            lock.release()
+            if result.error is not None:
+                raise LoginError(result.error)
+            log.success(f"进程 {result.pid} 已完成登录")
+            return
+        # 先行者没有留下结果（如异常退出），登录前再确认一次是否已在线
+        if get_status().status == NetworkStatus.LOGGED_IN:
+            lock.release()
+            log.info("等待期间网络已登录，无需再次登录")
+            return
+
+    error = None
+    try:
+        run()
+    except BaseException as e:
+        error = str(e) or f"登录中断（{type(e).__name__}）"
+        raise
+    finally:
+        try:
+            locking.write_result(error, path=locking.LOGIN_RESULT)
+        except OSError as e:
+            log.debug(f"无法写入登录结果: {e}")
+        lock.release()
 
-            log.info("正在打开登录页面...")
-            page.goto(LOGIN_URL, timeout=30000)
-            page.wait_for_load_state("networkidle", timeout=10000)
 
-            # 填写用户名和密码
-            log.debug("正在填写登录信息...")
-            page.locator(USERNAME_SELECTOR).first.fill(username)
-            page.locator(PASSWORD_SELECTOR).first.fill(password)
+def _login_http(username: str, password: str, timeout_sec: float) -> None:
+    """直接调用深澜认证接口登录，将协议异常转换为 LoginError。"""
+    log = logger.bind(trigger="login")
 
-            # 点击登录按钮
-            log.info("正在提交登录...")
-            page.locator(LOGIN_BUTTON_SELECTOR).first.click()
+    log.info("正在通过认证接口提交登录...")
+    try:
+        with timing.span("submit"):
+            srun.login(
+                username,
+                password,
+                base_url=GATEWAY_URL,
+                timeout=timeout_sec,
+                session=gateway.get_session(),
+            )
+    except srun.SrunAuthError as e:
+        log.warning(f"登录失败：{e}")
+        raise LoginError(str(e)) from e
+    except srun.SrunError as e:
+        log.error(f"登录过程出错：{e}")
+        if isinstance(e, srun.SrunNetworkError):
+            gateway.reset_session()
+        raise LoginError(str(e)) from e
+    log.success("登录成功！")
+
+
+def _launch_browser(p: Playwright, *, headless: bool) -> Browser:
+    """启动 Chromium，浏览器不存在时先自动安装。"""
+    log = logger.bind(trigger="login")
 
-            page.wait_for_timeout(3000)
+    browser_path = p.chromium.executable_path
+    if not Path(browser_path).exists():
+        _install_browser()
+
+    log.debug(f"使用浏览器: {browser_path}")
+    browser = p.chromium.launch(headless=headless, executable_path=browser_path)
+    # 记录浏览器进程，本进程异常退出后由下一次启动的保活进程清理
+    reaper.track()
+    return browser
+
+
+def _login_browser(
+    username: str,
+    password: str,
+    *,
+    headless: bool,
+    browser: WarmBrowser | None = None,
+    resource_filter: ResourceProfile = ResourceProfile.DEFAULT,
+    timeout_sec: float = DEFAULT_LOGIN_TIMEOUT_SEC,
+) -> None:
+    """使用 Playwright 模拟浏览器登录。
+
+    传入 ``browser`` 时复用常驻浏览器，只新建本次登录的 context/page；
+    否则临时启动一个浏览器并在结束后关闭。
+    """
+    log = logger.bind(trigger="login")
 
-            # 检查登录结果
-            if "success" in page.url.lower():
-                log.success("登录成功！")
-                return
-            else:
-                error_msg = _get_error_message(page)
-                log.warning(f"登录失败：{error_msg}")
-                raise LoginError(error_msg)
-
-        except PlaywrightTimeout as e:
-            log.error(f"页面加载超时：{e}")
-            raise LoginError(f"页面加载超时：{e}") from e
-        except LoginError:
-            raise
-        except Exception as e:
-            log.error(f"登录过程出错：{e}")
-            raise LoginError(f"{e}") from e
-        finally:
-            if browser is not None:
+    try:
+        if browser is not None:
+            with browser.page() as page:
+                _submit_login_form(
+                    page, username, password, resource_filter, timeout_sec
+                )
+            return
+
+        with sync_playwright() as p:
+            with timing.span("launch"):
+                temp_browser = _launch_browser(p, headless=headless)
+            try:
+                with timing.span("context"):
+                    page = temp_browser.new_context().new_page()
+                _submit_login_form(
+                    page, username, password, resource_filter, timeout_sec
+                )
+            finally:
                 log.debug("正在关闭浏览器...")
-                browser.close()
+                with timing.span("close"):
+                    temp_browser.close()
                 log.debug("浏览器已关闭")
 
+    except PlaywrightTimeout as e:
+        log.error(f"页面加载超时：{e}")
+        raise LoginError(f"页面加载超时：{e}") from e
+    except LoginError:
+        raise
+    except Exception as e:
+        log.error(f"登录过程出错：{e}")
+        raise LoginError(f"{e}") from e
+
+
+def _submit_login_form(
+    page: Page,
+    username: str,
+    password: str,
+    resource_filter: ResourceProfile = ResourceProfile.DEFAULT,
+    timeout_sec: float = DEFAULT_LOGIN_TIMEOUT_SEC,
+) -> None:
+    """在登录页填写并提交表单，检查登录结果。"""
+    log = logger.bind(trigger="login")
 
-def _get_error_message(page) -> str:
-    """获取登录错误信息。"""
+    request_filter = create_filter(resource_filter)
+    if request_filter is not None:
+        request_filter.install(page)
+
+    log.info("正在打开登录页面...")
+    try:
+        with timing.span("page"):
+            with timing.span("goto"):
+                page.goto(LOGIN_URL, timeout=30000)
+            with timing.span("load-state"):
+                page.wait_for_load_state("networkidle", timeout=10000)
+    finally:
+        if request_filter is not None:
+            log.debug(f"请求过滤（{resource_filter}）：{request_filter.summary()}")
+
+    # 填写用户名和密码
+    log.debug("正在填写登录信息...")
+    with timing.span("fill"):
+        page.locator(USERNAME_SELECTOR).first.fill(username)
+        page.locator(PASSWORD_SELECTOR).first.fill(password)
+
+    # 点击登录按钮，等待登录接口响应或跳转到成功页（先到先得）
+    log.info("正在提交登录...")
+    response = None
     try:
-        # layer.js 弹窗错误信息
-        elem = page.locator(".layui-layer-content").first
-        if elem.is_visible(timeout=1000):
-            return elem.text_content() or "未知错误"
-        return "未知错误"
+        with timing.span("submit"):
+            with page.expect_response(
+                _is_login_result, timeout=timeout_sec * 1000
+            ) as response_info:
+                with timing.span("click"):
+                    page.locator(LOGIN_BUTTON_SELECTOR).first.click()
+            with timing.span("result"):
+                response = response_info.value
+    except PlaywrightTimeout:
+        log.debug(f"{timeout_sec:g} 秒内未收到登录响应")
+
+    # 检查登录结果
+    if "success" in page.url.lower() or (
+        response is not None and "success" in response.url.lower()
+    ):
+        log.success("登录成功！")
+        return
+    if response is None:
+        error_msg = f"等待登录结果超时（{timeout_sec:g} 秒）"
+    else:
+        error_msg = _read_login_error(response)
+        if error_msg is None:
+            log.success("登录成功！")
+            return
+    log.warning(f"登录失败：{error_msg}")
+    raise LoginError(error_msg)
+
+
+def _is_login_result(response: Response) -> bool:
+    """判断响应是否为登录接口的返回，或跳转到成功页的导航。"""
+    url = response.url.lower()
+    if LOGIN_API_PATH in url:
+        return True
+    return "success" in url and response.request.resource_type == "document"
+
+
+def _read_login_error(response: Response) -> str | None:
+    """从登录接口的 JSON 响应体读取错误信息，登录成功时返回 None。"""
+    try:
+        data = srun.parse_jsonp(response.text())
     except Exception:
         return "无法获取错误信息"
+    if data.get("error") == "ok":
+        return None
+    return str(
+        data.get("error_msg") or data.get("ploy_msg") or data.get("error") or "未知错误"
+    )
+
+
+# endregion
+
+
+# region 常驻浏览器
+
+
+class WarmBrowser:
+    """在多次登录之间复用的常驻 Playwright 实例与 Chromium 进程。
+
+    每次登录只新建独立的 context/page，用完即关闭。浏览器崩溃或驱动断开时
+    在下一次登录前自动重启；空闲超过 ``idle_timeout_sec`` 后释放浏览器。
+
+    Args:
+        headless: 是否使用无头模式。
+        idle_timeout_sec: 空闲多久后释放浏览器（秒），0 表示不释放。
+    """
+
+    def __init__(self, *, headless: bool = True, idle_timeout_sec: float = 600):
+        self.headless = headless
+        self.idle_timeout_sec = idle_timeout_sec
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._last_used = time.monotonic()
+
+    @property
+    def is_running(self) -> bool:
+        """浏览器是否已启动且连接正常。"""
+        return self._browser is not None and self._browser.is_connected()
+
+    def _ensure_browser(self) -> Browser:
+        """健康检查：浏览器可用则直接返回，否则（重新）启动。"""
+        log = logger.bind(trigger="browser")
+
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        if self._browser is not None:
+            log.warning("常驻浏览器已断开，正在重新启动...")
+            self.close()
+
+        log.info("正在启动常驻浏览器...")
+        self._playwright = sync_playwright().start()
+        try:
+            self._browser = _launch_browser(self._playwright, headless=self.headless)
+        except Exception:
+            self.close()
+            raise
+        return self._browser
+
+    @contextmanager
+    def page(self) -> Iterator[Page]:
+        """打开一个全新的 context/page，退出时关闭。"""
+        with timing.span("launch"):
+            browser = self._ensure_browser()
+        with timing.span("context"):
+            try:
+                context = browser.new_context()
+            except Exception as e:
+                # 驱动进程已退出但尚未触发 disconnected，强制重启一次
+                logger.bind(trigger="browser").warning(f"常驻浏览器不可用：{e}")
+                self.close()
+                context = self._ensure_browser().new_context()
+
+        try:
+            yield context.new_page()
+        finally:
+            self._last_used = time.monotonic()
+            try:
+                context.close()
+            except Exception as e:
+                logger.bind(trigger="browser").debug(f"关闭浏览器上下文失败：{e}")
+
+    def release_if_idle(self) -> bool:
+        """空闲超时后释放浏览器，返回是否执行了释放。"""
+        if self._playwright is None or self.idle_timeout_sec <= 0:
+            return False
+        if time.monotonic() - self._last_used < self.idle_timeout_sec:
+            return False
+        logger.bind(trigger="browser").info("常驻浏览器空闲超时，正在释放...")
+        self.close()
+        return True
+
+    def close(self) -> None:
+        """关闭浏览器和 Playwright 实例，可重复调用。"""
+        log = logger.bind(trigger="browser")
+        browser, self._browser = self._browser, None
+        playwright, self._playwright = self._playwright, None
+
+        if browser is not None:
+            try:
+                browser.close()
+            except Exception as e:
+                log.debug(f"关闭常驻浏览器失败：{e}")
+        if playwright is not None:
+            try:
+                playwright.stop()
+            except Exception as e:
+                log.debug(f"停止 Playwright 失败：{e}")
+        if browser is not None:
+            log.debug("常驻浏览器已关闭")
 
 
 # endregion
@@ -200,7 +493,26 @@ def _get_error_message(page) -> str:
 
 
 def keep_alive(
-    username: str, password: str, check_interval_sec: int, *, headless: bool = True
+    username: str,
+    password: str,
+    check_interval_sec: int,
+    *,
+    headless: bool = True,
+    engine: LoginEngine = LoginEngine.BROWSER,
+    warm_browser: bool = False,
+    browser_idle_sec: float = 600,
+    resource_filter: ResourceProfile = ResourceProfile.DEFAULT,
+    login_timeout_sec: float = DEFAULT_LOGIN_TIMEOUT_SEC,
+    poll_policy: PollPolicy = PollPolicy.FIXED,
+    max_interval_sec: float = 600,
+    watch_network: bool = False,
+    control_socket: bool = False,
+    isolate_login: bool = False,
+    login_deadline_sec: float = worker.DEFAULT_DEADLINE_SEC,
+    login_memory_limit_mb: int = 0,
+    metrics_listen: str | None = None,
+    overrides: frozenset[str] = frozenset(),
+    config_path: Path | None = None,
 ):
     """持续保持在线，检查登录状态并自动重连。
 
@@ -209,36 +521,443 @@ def keep_alive(
         password: 校园网密码。
         check_interval_sec: 检查间隔（秒）。
         headless: 是否使用无头模式运行浏览器。
+        engine: 登录引擎。
+        warm_browser: 是否在多次登录之间复用常驻浏览器（仅浏览器引擎）。
+        browser_idle_sec: 常驻浏览器空闲多久后释放（秒）。
+        resource_filter: 登录页请求过滤预设。
+        login_timeout_sec: 提交登录后等待结果的最长时间（秒）。
+        poll_policy: 轮询策略。
+        max_interval_sec: 自适应策略下退避间隔的上限（秒）。
+        watch_network: 是否监听网络变化（仅 Linux），变化时立即检查。
+        control_socket: 是否开放控制套接字，供 `status` / `login` 命令读取
+            保活状态或触发检查、登录。
+        isolate_login: 是否在短生命周期的子进程中执行浏览器登录（仅浏览器引擎）。
+        login_deadline_sec: 隔离登录子进程的最长运行时间（秒）。
+        login_memory_limit_mb: 隔离登录子进程的虚拟内存上限（MiB），0 表示不限制。
+        metrics_listen: OpenMetrics 指标端点的监听地址（``[主机:]端口``），
+            为空时不开放。
+        overrides: 由命令行参数或环境变量指定的配置项（`Config` 字段名），
+            配置文件热更新时不覆盖这些值。
+        config_path: 热更新监视的配置文件，默认 `CONFIG_FILE`。
     """
     log = logger.bind(trigger="run")
 
-    log.info(f"保活服务已启动，检查间隔: {check_interval_sec} 秒")
+    log.info(f"保活服务已启动，检查间隔: {check_interval_sec} 秒（{poll_policy}）")
     log.info(f"使用账户: {username}")
+    log.info(f"登录引擎: {engine}")
     log.info(f"日志文件: {LOG_FILE}")
 
+    browser = None
+    isolation = None
+    if isolate_login and engine == LoginEngine.BROWSER:
+        isolation = worker.Isolation(login_deadline_sec, login_memory_limit_mb)
+        log.info(f"已启用隔离登录，子进程最长运行 {login_deadline_sec:g} 秒")
+        if warm_browser:
+            log.warning("隔离登录与常驻浏览器不能同时使用，已忽略常驻浏览器")
+    elif warm_browser and engine == LoginEngine.BROWSER:
+        browser = WarmBrowser(headless=headless, idle_timeout_sec=browser_idle_sec)
+        log.info(f"已启用常驻浏览器，空闲 {browser_idle_sec:g} 秒后释放")
+
+    config_watcher = ConfigWatcher(config_path)
+    login_breaker = breaker.CircuitBreaker(config_path=config_watcher.path)
+
+    browser_reaper = None
+    if engine == LoginEngine.BROWSER and reaper.is_supported():
+        browser_reaper = reaper.Reaper()
+        browser_reaper.run()
+
+    watcher = create_watcher() if watch_network else None
+    server = _start_control_server(watcher) if control_socket else None
+    metrics_server = _start_metrics_server(metrics_listen) if metrics_listen else None
+    scheduler = create_scheduler(
+        poll_policy,
+        check_interval_sec,
+        max_interval=max_interval_sec,
+        watcher=server.wakeup if server is not None else watcher,
+    )
+
+    store = persist.StateStore()
+    previous = store.load()
+    if previous is not None:
+        _resume(
+            previous, persist.fingerprint(username, password), scheduler, login_breaker
+        )
+    uptime = ledger.Ledger()
+    previous_sigterm = _exit_on_sigterm()
+
+    try:
+        _keep_alive_loop(
+            username,
+            password,
+            scheduler,
+            headless=headless,
+            engine=engine,
+            browser=browser,
+            resource_filter=resource_filter,
+            login_timeout_sec=login_timeout_sec,
+            state=server.state if server is not None else None,
+            isolation=isolation,
+            browser_reaper=browser_reaper,
+            login_breaker=login_breaker,
+            store=store,
+            uptime=uptime,
+            metrics=metrics_server.metrics if metrics_server is not None else None,
+            config_watcher=config_watcher,
+            config_overrides=overrides,
+        )
+    finally:
+        uptime.stop()
+        if previous_sigterm is not None:
+            signal.signal(signal.SIGTERM, previous_sigterm)
+        if browser is not None:
+            browser.close()
+        if server is not None:
+            server.close()
+            server.wakeup.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        if watcher is not None:
+            watcher.close()
+
+
+def _exit_on_sigterm() -> signal.Handlers | Callable | None:
+    """收到 SIGTERM（如 systemd 停止服务）时与 Ctrl+C 一样正常退出。
+
+    Returns:
+        原来的处理函数；不在主线程中时不设置，返回 None。
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return None
+
+    def handle(signum, frame):
+        raise KeyboardInterrupt
+
+    return signal.signal(signal.SIGTERM, handle)
+
+
+def _start_control_server(
+    watcher: NetlinkWatcher | None,
+) -> control.ControlServer | None:
+    """启动控制套接字服务，失败时返回 None 并继续以普通方式保活。"""
+    log = logger.bind(trigger="run")
+
+    if not control.is_supported():
+        log.info("当前平台不支持 Unix 域套接字，未开放控制套接字")
+        return None
+
+    wakeup = control.Wakeup(watcher)
+    server = control.ControlServer(control.DaemonState(), wakeup)
+    try:
+        server.start()
+    except OSError as e:
+        log.warning(f"无法开放控制套接字: {e}")
+        wakeup.close()
+        return None
+    return server
+
+
+def _start_metrics_server(listen: str) -> exporter.MetricsServer | None:
+    """开放指标端点，失败时返回 None 并继续保活。"""
+    try:
+        host, port = exporter.parse_listen(listen)
+        server = exporter.MetricsServer(exporter.Metrics(), host, port)
+        server.start()
+    except (ValueError, OSError) as e:
+        logger.bind(trigger="run").warning(f"无法开放指标端点 {listen}: {e}")
+        return None
+    return server
+
+
+def _keep_alive_loop(
+    username: str,
+    password: str,
+    scheduler: Scheduler,
+    *,
+    headless: bool,
+    engine: LoginEngine,
+    browser: WarmBrowser | None,
+    resource_filter: ResourceProfile,
+    login_timeout_sec: float,
+    state: control.DaemonState | None = None,
+    isolation: worker.Isolation | None = None,
+    browser_reaper: reaper.Reaper | None = None,
+    login_breaker: breaker.CircuitBreaker | None = None,
+    store: persist.StateStore | None = None,
+    uptime: ledger.Ledger | None = None,
+    metrics: exporter.Metrics | None = None,
+    config_watcher: ConfigWatcher | None = None,
+    config_overrides: frozenset[str] = frozenset(),
+):
+    """保活主循环，见 `keep_alive`。
+
+    ``state`` 不为空时，记录每次探测与登录的结果，并执行控制套接字转来的
+    登录请求。``browser_reaper`` 不为空时定期清理残留浏览器，登录失败后
+    立即清理一次。``login_breaker`` 不为空时按其状态暂停或推迟自动登录。
+    ``store`` 不为空时，每轮结束后保存发生变化的保活状态。``uptime`` 不为空时
+    把状态变化与登录结果记入在线时长账本。``metrics`` 不为空时更新探测与
+    登录指标。``config_watcher`` 不为空时，每轮开始时检查配置文件，热更新
+    账号密码、检测间隔、登录超时与请求过滤预设，账号密码变化时复位登录熔断；
+    ``config_overrides`` 中的配置项由命令行参数或环境变量指定，不随配置文件更新。
+    """
+    log = logger.bind(trigger="run")
+    last_login_at = store.state.last_login_at if store and store.state else None
+
     while True:
         try:
-            status = get_status()
-
-            if status == NetworkStatus.UNKNOWN_NETWORK:
-                log.warning("未检测到校园网环境，等待下次检查...")
+            scheduler.start_tick()
+            if config_watcher is not None and (
+                changes := _poll_config(config_watcher, config_overrides)
+            ):
+                credentials = _changed_credentials(changes, username, password)
+                if credentials is not None:
+                    username, password = credentials
+                resource_filter = changes.get("resource_filter", resource_filter)
+                login_timeout_sec = changes.get("login_timeout", login_timeout_sec)
+                _apply_config_changes(
+                    changes,
+                    scheduler,
+                    login_breaker,
+                    credentials_changed=credentials is not None,
+                )
+            probe_started = time.perf_counter()
+            info = get_status()
+            status = info.status
+            probe_sec = time.perf_counter() - probe_started
+            if metrics is not None:
+                metrics.observe_probe(status, probe_sec)
+            # 本轮状态相关的日志附带探测结果，供 JSON 日志采集
+            tick_log = log.bind(status=status.value, probe_sec=round(probe_sec, 4))
+            relogin = False
+            forced = False
+            if uptime is not None:
+                uptime.record(status)
+            if state is not None:
+                state.record_probe(info)
+                forced = state.take_relogin_request()
+
+            if forced:
+                tick_log.info("收到登录请求，正在登录...")
+            elif status == NetworkStatus.UNKNOWN_NETWORK:
+                tick_log.warning("未检测到校园网环境，等待下次检查...")
             elif status == NetworkStatus.LOGGED_IN:
-                log.info("已登录，无需操作")
+                tick_log.info("已登录，无需操作")
+                if (
+                    login_breaker is not None
+                    and login_breaker.state == breaker.BreakerState.BACKOFF
+                ):
+                    login_breaker.reset("网络已恢复，结束登录退避")
             else:  # LOGGED_OUT
-                log.warning("未登录，正在启动浏览器登录...")
+                if login_breaker is None or login_breaker.allow():
+                    tick_log.warning("未登录，正在重新登录...")
+                    relogin = True
+                elif login_breaker.state == breaker.BreakerState.OPEN:
+                    tick_log.warning("未登录，账号或密码错误，自动登录已暂停")
+                else:
+                    tick_log.warning(
+                        f"未登录，登录失败退避中，"
+                        f"{login_breaker.retry_in():.0f} 秒后再自动登录"
+                    )
+
+            if forced or relogin:
+                relogin = True
+                error = None
+                login_started = time.monotonic()
                 try:
-                    login(username, password, headless=headless)
+                    login(
+                        username,
+                        password,
+                        headless=headless,
+                        engine=engine,
+                        browser=browser,
+                        resource_filter=resource_filter,
+                        timeout_sec=login_timeout_sec,
+                        isolation=isolation,
+                    )
                     log.success("登录成功")
+                    last_login_at = time.time()
+                    if login_breaker is not None:
+                        login_breaker.record_success()
                 except LoginError as e:
+                    error = str(e)
                     log.warning(f"登录未成功: {e}")
-
-            time.sleep(check_interval_sec)
+                    if login_breaker is not None:
+                        login_breaker.record_failure(error)
+                    if browser_reaper is not None:
+                        browser_reaper.run()
+                if state is not None:
+                    state.record_login(error)
+                login_sec = time.monotonic() - login_started
+                kind = breaker.classify(error) if error is not None else None
+                if uptime is not None:
+                    if kind is None:
+                        uptime.record(NetworkStatus.LOGGED_IN, login_sec=login_sec)
+                    else:
+                        uptime.record(status, login_sec=login_sec, error=kind)
+                if metrics is not None:
+                    metrics.observe_login(login_sec, kind)
+                summary = timing.format_summaries(timing.login_stats.summaries())
+                if summary:
+                    log.debug(
+                        f"登录各阶段耗时（最近 {timing.DEFAULT_WINDOW} 次内）：{summary}"
+                    )
+
+            if state is not None and login_breaker is not None:
+                state.record_breaker(login_breaker.status())
+            if browser is not None:
+                browser.release_if_idle()
+            if browser_reaper is not None:
+                browser_reaper.tick()
+            delay = scheduler.plan(status, relogin=relogin)
+            log.debug(f"下次检查: {delay:.1f} 秒后")
+            if store is not None:
+                _save_state(
+                    store,
+                    persist.fingerprint(username, password),
+                    status,
+                    last_login_at,
+                    scheduler,
+                    login_breaker,
+                )
+            scheduler.sleep()
         except KeyboardInterrupt:
             log.info("User Exit.")
             sys.exit(0)
         except Exception as e:
             log.error(f"发生错误: {e}")
-            time.sleep(10)
+            scheduler.wait(None)
+
+
+def _resume(
+    previous: persist.KeepAliveState,
+    credentials: str,
+    scheduler: Scheduler,
+    login_breaker: breaker.CircuitBreaker,
+) -> None:
+    """从上次保存的保活状态恢复调度器、登录熔断器与登录耗时统计。"""
+    log = logger.bind(trigger="run")
+    log.info(f"已恢复上次的保活状态：{persist.describe(previous)}")
+
+    if previous.scheduler is not None:
+        scheduler.restore(previous.scheduler)
+    for duration in previous.login_durations:
+        timing.login_stats.observe("login", duration)
+    if previous.breaker is not None:
+        if (
+            previous.breaker.state == breaker.BreakerState.OPEN
+            and previous.credentials != credentials
+        ):
+            log.info("账号或密码已更换，不再沿用上次的登录熔断")
+        else:
+            login_breaker.restore(previous.breaker, previous.config_stamp)
+            if (
+                login_breaker.state == breaker.BreakerState.OPEN
+                and login_breaker.config_changed()
+            ):
+                login_breaker.reset("配置文件已在停止期间修改，恢复自动登录")
+
+
+def _save_state(
+    store: persist.StateStore,
+    credentials: str,
+    status: NetworkStatus,
+    last_login_at: float | None,
+    scheduler: Scheduler,
+    login_breaker: breaker.CircuitBreaker | None,
+) -> None:
+    """保存本轮结束时的保活状态（内容未变化时不写入）。"""
+    histogram = timing.login_stats.histogram("login")
+    durations = histogram.samples() if histogram is not None else []
+    store.save(
+        persist.KeepAliveState(
+            saved_at=time.time(),
+            credentials=credentials,
+            status=status,
+            last_login_at=last_login_at,
+            breaker=login_breaker.status() if login_breaker is not None else None,
+            config_stamp=(
+                login_breaker.config_stamp if login_breaker is not None else None
+            ),
+            scheduler=scheduler.export_state(),
+            login_durations=durations[-persist.MAX_LOGIN_SAMPLES :],
+        )
+    )
+
+
+# 修改后需要重启保活服务才能生效的配置项
+RESTART_FIELDS = (
+    "engine",
+    "warm_browser",
+    "browser_idle",
+    "poll_policy",
+    "watch_network",
+    "isolate_login",
+    "login_deadline",
+    "login_memory_limit",
+    "metrics",
+    "json_log",
+)
+
+
+def _poll_config(
+    watcher: ConfigWatcher, overrides: frozenset[str] = frozenset()
+) -> dict[str, Any] | None:
+    """检查配置文件是否变化，返回有变化的配置项，读取失败时返回 None。
+
+    ``overrides`` 中的配置项由命令行参数或环境变量指定，优先于配置文件，
+    其变化被忽略并记录警告。
+    """
+    log = logger.bind(trigger="run")
+    try:
+        changes = watcher.poll()
+    except (OSError, msgspec.DecodeError) as e:
+        log.warning(f"无法读取配置文件: {e}")
+        return None
+    if not changes:
+        return changes
+    ignored = sorted(changes.keys() & overrides)
+    if ignored:
+        log.warning(
+            f"配置文件中的 {', '.join(ignored)} 已由命令行参数或环境变量指定，"
+            "忽略其修改"
+        )
+    return {k: v for k, v in changes.items() if k not in overrides}
+
+
+def _changed_credentials(
+    changes: dict[str, Any], username: str, password: str
+) -> tuple[str, str] | None:
+    """账号或密码有变化时返回新的 (账号, 密码)，未变化的一项保持原值。"""
+    if "username" not in changes and "password" not in changes:
+        return None
+    return changes.get("username", username), changes.get("password", password)
+
+
+def _apply_config_changes(
+    changes: dict[str, Any],
+    scheduler: Scheduler,
+    login_breaker: breaker.CircuitBreaker | None,
+    *,
+    credentials_changed: bool,
+) -> None:
+    """应用配置热更新中调度器与登录熔断相关的部分，并记录日志。"""
+    log = logger.bind(trigger="run")
+    shown = {k: "***" if k == "password" else v for k, v in changes.items()}
+    log.info("配置文件已更新: " + ", ".join(f"{k}={v}" for k, v in shown.items()))
+
+    if "interval" in changes or "max_interval" in changes:
+        scheduler.reconfigure(
+            changes.get("interval", scheduler.interval),
+            max_interval=changes.get("max_interval"),
+        )
+    if login_breaker is not None:
+        if credentials_changed:
+            login_breaker.reset("账号或密码已更换，重置登录退避")
+        elif login_breaker.state == breaker.BreakerState.OPEN:
+            login_breaker.reset("检测到配置文件变化，恢复自动登录")
+
+    restart = [k for k in RESTART_FIELDS if k in changes]
+    if restart:
+        log.warning(f"以下配置需重启保活服务后生效: {', '.join(restart)}")
 
 
 # endregion
@@ -0,0 +1,290 @@
+"""深澜（srun）认证协议：不依赖浏览器的纯 HTTP 登录引擎"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import math
+import re
+import time
+from base64 import b64encode
+from dataclasses import dataclass
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from .constants import GATEWAY_URL
+from .gateway import DEFAULT_HEADERS
+
+DEFAULT_AC_ID = "1"
+DEFAULT_TIMEOUT = 5.0
+
+_N = "200"
+_TYPE = "1"
+_ENC_VER = "srun_bx1"
+_CALLBACK = "jQuery112406372386254297716_1700000000000"
+
+_STD_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+_SRUN_ALPHABET = "LVoJPiCN2R8G90yg+hmFHuacZ1OWMnrsSTXkYpUq/3dlbfKwv6xztjI7DeBE45QA"
+_BASE64_TABLE = str.maketrans(_STD_ALPHABET, _SRUN_ALPHABET)
+
+_JSONP_PATTERN = re.compile(r"^[^(]*\((.*)\)\s*;?\s*$", re.DOTALL)
+
+
+class SrunError(Exception):
+    """深澜协议登录失败的基类。"""
+
+
+class SrunNetworkError(SrunError):
+    """无法访问网关（连接失败、超时等）。"""
+
+
+class SrunProtocolError(SrunError):
+    """网关响应不符合深澜协议预期。"""
+
+
+class SrunAuthError(SrunError):
+    """网关明确拒绝了登录请求。
+
+    Attributes:
+        code: 网关返回的 error 字段，如 ``login_error``。
+        message: 网关返回的可读错误信息。
+    """
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message or code)
+        self.code = code
+        self.message = message
+
+
+@dataclass(frozen=True, slots=True)
+class Challenge:
+    """get_challenge 接口返回的一次性令牌。"""
+
+    token: str
+    client_ip: str
+
+
+# region 加密参数
+
+
+def _words(msg: str, include_length: bool) -> list[int]:
+    """将字符串按小端序每 4 字节打包为 32 位整数。"""
+    codes = [ord(ch) for ch in msg]
+    words = [
+        sum(code << (8 * j) for j, code in enumerate(codes[i : i + 4]))
+        for i in range(0, len(codes), 4)
+    ]
+    if include_length:
+        words.append(len(codes))
+    return words
+
+
+def _unwords(words: list[int]) -> str:
+    """`_words` 的逆过程（不截断长度）。"""
+    return "".join(
+        chr((word >> shift) & 0xFF) for word in words for shift in (0, 8, 16, 24)
+    )
+
+
+def xencode(msg: str, key: str) -> str:
+    """深澜前端 ``xEncode``：基于 XXTEA 的自定义加密。"""
+    if not msg:
+        return ""
+
+    v = _words(msg, include_length=True)
+    k = _words(key, include_length=False)
+    k += [0] * (4 - len(k))
+
+    n = len(v) - 1
+    z = v[n]
+    delta = 0x9E3779B9
+    total = 0
+    for _ in range(math.floor(6 + 52 / (n + 1))):
+        total = (total + delta) & 0xFFFFFFFF
+        e = (total >> 2) & 3
+        for p in range(n + 1):
+            y = v[(p + 1) % (n + 1)]
+            mx = ((z >> 5) ^ (y << 2)) + (((y >> 3) ^ (z << 4)) ^ (total ^ y))
+            mx += k[(p & 3) ^ e] ^ z
+            v[p] = (v[p] + mx) & 0xFFFFFFFF
+            z = v[p]
+
+    return _unwords(v)
+
+
+def srun_base64(msg: str) -> str:
+    """使用深澜自定义字母表的 Base64 编码。"""
+    return b64encode(msg.encode("latin-1")).decode("ascii").translate(_BASE64_TABLE)
+
+
+def encode_info(username: str, password: str, ip: str, ac_id: str, token: str) -> str:
+    """生成登录请求中的 ``info`` 参数。"""
+    payload = json.dumps(
+        {
+            "username": username,
+            "password": password,
+            "ip": ip,
+            "acid": ac_id,
+            "enc_ver": _ENC_VER,
+        },
+        separators=(",", ":"),
+    )
+    return "{SRBX1}" + srun_base64(xencode(payload, token))
+
+
+def hmac_md5(token: str, password: str) -> str:
+    """以 challenge 为密钥计算密码的 HMAC-MD5。"""
+    return hmac.new(token.encode(), password.encode(), hashlib.md5).hexdigest()
+
+
+def checksum(
+    token: str, username: str, hmd5: str, ac_id: str, ip: str, info: str
+) -> str:
+    """计算登录请求中的 ``chksum`` 参数（SHA1）。"""
+    parts = ["", username, hmd5, ac_id, ip, _N, _TYPE, info]
+    return hashlib.sha1(token.join(parts).encode()).hexdigest()
+
+
+# endregion
+
+
+# region 协议交互
+
+
+def parse_jsonp(text: str) -> dict:
+    """解析 ``callback({...})`` 形式的 JSONP 响应。"""
+    match = _JSONP_PATTERN.match(text.strip())
+    body = match.group(1) if match else text
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise SrunProtocolError(f"无法解析网关响应：{text[:80]}") from e
+    if not isinstance(data, dict):
+        raise SrunProtocolError(f"网关响应格式异常：{text[:80]}")
+    return data
+
+
+class SrunClient:
+    """深澜认证接口客户端。
+
+    Args:
+        base_url: 网关根地址。
+        session: 复用的 requests 会话，默认新建。
+        timeout: 单次请求超时（秒）。
+    """
+
+    def __init__(
+        self,
+        base_url: str = GATEWAY_URL,
+        *,
+        session: requests.Session | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def _get(
+        self, path: str, params: dict[str, str] | None = None
+    ) -> requests.Response:
+        try:
+            response = self.session.get(
+                f"{self.base_url}{path}",
+                params=params,
+                headers=DEFAULT_HEADERS,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            return response
+        except requests.RequestException as e:
+            raise SrunNetworkError(f"网关请求失败：{e}") from e
+
+    def _call(self, path: str, params: dict[str, str]) -> dict:
+        params = {
+            "callback": _CALLBACK,
+            **params,
+            "_": str(int(time.time() * 1000)),
+        }
+        return parse_jsonp(self._get(path, params).text)
+
+    def get_ac_id(self) -> str:
+        """访问网关首页，从重定向后的地址中读取 ac_id。"""
+        response = self._get("/")
+        query = parse_qs(urlparse(response.url).query)
+        return query.get("ac_id", [DEFAULT_AC_ID])[0]
+
+    def get_challenge(self, username: str, ip: str = "") -> Challenge:
+        """获取本次登录使用的 challenge 令牌。"""
+        data = self._call("/cgi-bin/get_challenge", {"username": username, "ip": ip})
+        token = data.get("challenge")
+        if not token:
+            raise SrunProtocolError(f"未获取到 challenge：{data.get('error', data)}")
+        return Challenge(token=token, client_ip=data.get("client_ip") or ip)
+
+    def login(self, username: str, password: str, *, ac_id: str | None = None) -> dict:
+        """执行完整的深澜登录流程。
+
+        Returns:
+            网关返回的登录结果。
+
+        Raises:
+            SrunNetworkError: 无法访问网关。
+            SrunProtocolError: 响应格式异常。
+            SrunAuthError: 网关拒绝登录（如密码错误）。
+        """
+        ac_id = ac_id or self.get_ac_id()
+        challenge = self.get_challenge(username)
+        token, ip = challenge.token, challenge.client_ip
+
+        hmd5 = hmac_md5(token, password)
+        info = encode_info(username, password, ip, ac_id, token)
+        data = self._call(
+            "/cgi-bin/srun_portal",
+            {
+                "action": "login",
+                "username": username,
+                "password": "{MD5}" + hmd5,
+                "os": "Windows 10",
+                "name": "Windows",
+                "double_stack": "0",
+                "chksum": checksum(token, username, hmd5, ac_id, ip, info),
+                "info": info,
+                "ac_id": ac_id,
+                "ip": ip,
+                "n": _N,
+                "type": _TYPE,
+            },
+        )
+
+        if data.get("error") != "ok":
+            raise SrunAuthError(
+                str(data.get("error", "")),
+                str(data.get("error_msg") or data.get("ploy_msg") or ""),
+            )
+        return data
+
+
+# endregion
+
+
+def login(
+    username: str,
+    password: str,
+    *,
+    base_url: str = GATEWAY_URL,
+    timeout: float = DEFAULT_TIMEOUT,
+    session: requests.Session | None = None,
+) -> dict:
+    """使用纯 HTTP 方式登录校园网，参见 `SrunClient.login`。
+
+    传入 ``session`` 时复用其连接池，否则使用临时会话。
+    """
+    if session is not None:
+        return SrunClient(base_url, session=session, timeout=timeout).login(
+            username, password
+        )
+    with requests.Session() as temp_session:
+        client = SrunClient(base_url, session=temp_session, timeout=timeout)
+        return client.login(username, password)
@@ -0,0 +1,120 @@
+"""网络状态检测：探测 rad_user_info 并解析在线信息"""
+
+from __future__ import annotations
+
+import re
+from enum import StrEnum, auto
+
+from msgspec import Struct
+
+from .constants import RAD_USER_INFO_URL
+from .log import logger
+
+NOT_ONLINE = "not_online_error"
+
+_IPV4_PATTERN = re.compile(r"\d{1,3}(?:\.\d{1,3}){3}")
+
+
+class NetworkStatus(StrEnum):
+    """网络状态枚举。"""
+
+    UNKNOWN_NETWORK = auto()  # 非校园网环境（DNS 解析失败或超时）
+    LOGGED_OUT = auto()  # 校园网环境，未登录
+    LOGGED_IN = auto()  # 校园网环境，已登录
+
+
+class StatusInfo(Struct, frozen=True, gc=False):
+    """一次状态探测的结果，已登录时附带 rad_user_info 中的会话信息。
+
+    Attributes:
+        status: 网络状态。
+        user: 在线账号。
+        login_time: 本次会话的登录时间（Unix 时间戳，秒）。
+        online_seconds: 已在线时长（秒），按网关当前时间计算。
+        bytes_used: 已用流量（字节）。
+        client_ip: 网关记录的本机 IP。
+    """
+
+    status: NetworkStatus
+    user: str | None = None
+    login_time: int | None = None
+    online_seconds: int | None = None
+    bytes_used: int | None = None
+    client_ip: str | None = None
+
+
+def _int_field(fields: list[str], index: int) -> int | None:
+    try:
+        return int(fields[index])
+    except (IndexError, ValueError):
+        return None
+
+
+def parse_rad_user_info(text: str) -> StatusInfo:
+    """解析 rad_user_info 的纯文本响应。
+
+    响应格式：
+    - 未登录: ``not_online_error``
+    - 已登录: 逗号分隔的字段，依次为账号、登录时间、网关当前时间、已用流量
+      （字节）……，本机 IP 出现在其后的某个字段中（不同网关版本位置不同）
+    """
+    text = text.strip()
+    if text == NOT_ONLINE:
+        return StatusInfo(NetworkStatus.LOGGED_OUT)
+
+    fields = text.split(",")
+    login_time = _int_field(fields, 1)
+    now = _int_field(fields, 2)
+    online_seconds = (
+        now - login_time if login_time is not None and now is not None else None
+    )
+    client_ip = next((f for f in fields[3:] if _IPV4_PATTERN.fullmatch(f)), None)
+
+    return StatusInfo(
+        NetworkStatus.LOGGED_IN,
+        user=fields[0] or None,
+        login_time=login_time,
+        online_seconds=online_seconds,
+        bytes_used=_int_field(fields, 3),
+        client_ip=client_ip,
+    )
+
+
+def get_status() -> StatusInfo:
+    """获取当前网络状态。
+
+    通过访问深澜 rad_user_info API 检测：
+    - 请求失败（DNS/超时）→ UNKNOWN_NETWORK（非校园网环境）
+    - API 返回用户信息 → LOGGED_IN，并解析会话信息
+    - API 返回 not_online_error → LOGGED_OUT
+
+    Returns:
+        StatusInfo 探测结果。
+    """
+    # requests 导入较慢，只在实际探测时加载（读取保活进程状态时用不到）
+    import requests
+
+    from . import gateway
+
+    log = logger.bind(trigger="status")
+    log.debug(f"正在检测网络状态：{RAD_USER_INFO_URL}")
+
+    try:
+        response = gateway.get_session().get(RAD_USER_INFO_URL, timeout=5)
+        text = response.text
+    except requests.RequestException as e:
+        # 只记录异常类型：异常文本含连接对象地址等每次都不同的内容，无法合并重复日志
+        log.debug(f"网络状态: 非校园网环境，请检查网络连接 ({type(e).__name__})")
+        # 连接池中的连接可能在网络切换后失效，下次探测重新建立
+        gateway.reset_session()
+        return StatusInfo(NetworkStatus.UNKNOWN_NETWORK)
+
+    info = parse_rad_user_info(text)
+    if info.status == NetworkStatus.LOGGED_OUT:
+        log.debug(f"网络状态: 未登录 (API 响应: {NOT_ONLINE})")
+    else:
+        # 原始响应含网关时间与流量，每次都不同；只记录不变的账号与 IP
+        log.debug(
+            f"网络状态: 已登录 (账号: {info.user}, IP: {info.client_ip or '未知'})"
+        )
+    return info
@@ -0,0 +1,291 @@
+"""登录流程分阶段计时：嵌套的计时区间与滚动直方图
+
+用法::
+
+    with trace("login") as t:
+        with span("launch"):
+            ...
+        with span("page"):
+            with span("goto"):
+                ...
+
+`trace` 结束时输出一条结构化日志（``extra["spans"]`` 为嵌套的区间树），
+并把各区间耗时计入 `login_stats`。没有进行中的 `trace` 时，`span` 不做任何事。
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from msgspec import Struct
+
+from .log import logger
+
+# 直方图桶上界（秒），覆盖从接口往返到浏览器冷启动的耗时
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# 滚动窗口保留的最近样本数
+DEFAULT_WINDOW = 256
+
+
+class Span:
+    """一个计时区间，``children`` 为其中嵌套的子区间。"""
+
+    __slots__ = ("children", "duration", "name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.children: list[Span] = []
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self.start
+
+    def to_dict(self) -> dict:
+        """转换为可序列化的嵌套字典，耗时单位为毫秒。"""
+        data: dict = {"name": self.name, "ms": round(self.duration * 1000, 1)}
+        if self.children:
+            data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+    def walk(self, prefix: str = "") -> Iterator[tuple[str, float]]:
+        """按先序遍历子区间，返回以 ``.`` 连接的路径与耗时（秒）。"""
+        for child in self.children:
+            path = f"{prefix}{child.name}"
+            yield path, child.duration
+            yield from child.walk(f"{path}.")
+
+
+class HistogramSummary(Struct, frozen=True, gc=False):
+    """滚动窗口内的耗时概况（秒）。
+
+    Attributes:
+        count: 窗口内的样本数。
+        p50: 中位数。
+        p95: 95 分位数。
+        max: 最大值。
+    """
+
+    count: int
+    p50: float
+    p95: float
+    max: float
+
+
+class RollingHistogram:
+    """保留最近 ``window`` 个样本的耗时直方图，线程安全。
+
+    Args:
+        window: 保留的样本数。
+        buckets: 桶上界（秒），升序。
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_WINDOW,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = buckets
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._samples.append(value)
+
+    def samples(self) -> list[float]:
+        """窗口内的样本，按记录顺序。"""
+        with self._lock:
+            return list(self._samples)
+
+    def counts(self) -> list[int]:
+        """各桶的样本数，最后一项为超出最大上界的样本数。"""
+        result = [0] * (len(self.buckets) + 1)
+        with self._lock:
+            for value in self._samples:
+                result[bisect.bisect_left(self.buckets, value)] += 1
+        return result
+
+    def quantile(self, q: float) -> float:
+        """窗口内样本的 ``q`` 分位数（最近秩法），没有样本时为 0。"""
+        with self._lock:
+            ordered = sorted(self._samples)
+        return _nearest_rank(ordered, q) if ordered else 0.0
+
+    def summary(self) -> HistogramSummary:
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return HistogramSummary(0, 0.0, 0.0, 0.0)
+        return HistogramSummary(
+            len(ordered),
+            _nearest_rank(ordered, 0.5),
+            _nearest_rank(ordered, 0.95),
+            ordered[-1],
+        )
+
+
+def _nearest_rank(ordered: list[float], q: float) -> float:
+    index = math.ceil(q * len(ordered)) - 1
+    return ordered[min(len(ordered) - 1, max(0, index))]
+
+
+class SpanStats:
+    """按区间路径聚合的滚动直方图。
+
+    Args:
+        window: 每个区间保留的样本数。
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self._histograms: dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float) -> None:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    name, RollingHistogram(self.window)
+                )
+        histogram.observe(value)
+
+    def histogram(self, name: str) -> RollingHistogram | None:
+        return self._histograms.get(name)
+
+    def summaries(self) -> dict[str, HistogramSummary]:
+        with self._lock:
+            items = list(self._histograms.items())
+        return {name: histogram.summary() for name, histogram in items}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+# 登录流程各阶段的耗时统计，区间路径以 "login" 作为整体耗时
+login_stats = SpanStats()
+
+_local = threading.local()
+
+
+def _stack() -> list[Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """在当前 `trace` 中记录一个（可嵌套的）计时区间。"""
+    stack = _stack()
+    if not stack:
+        yield
+        return
+
+    current = Span(name)
+    stack[-1].children.append(current)
+    stack.append(current)
+    try:
+        yield
+    finally:
+        current.finish()
+        stack.pop()
+
+
+@contextmanager
+def trace(
+    name: str,
+    *,
+    stats: SpanStats | None = None,
+    trigger: str = "login",
+) -> Iterator[Span]:
+    """开始一次计时，结束时输出结构化日志并计入 ``stats``。
+
+    嵌套调用时退化为普通的 `span`，只由最外层输出日志。
+
+    Args:
+        name: 根区间名称，同时作为整体耗时在 ``stats`` 中的键。
+        stats: 耗时统计，默认为 `login_stats`。
+        trigger: 日志的 trigger 字段。
+    """
+    stack = _stack()
+    if stack:
+        with span(name):
+            yield stack[-1]
+        return
+
+    root = Span(name)
+    stack.append(root)
+    ok = False
+    try:
+        yield root
+        ok = True
+    finally:
+        root.finish()
+        stack.clear()
+        _report(root, ok, login_stats if stats is None else stats, trigger)
+
+
+def _report(root: Span, ok: bool, stats: SpanStats, trigger: str) -> None:
+    stats.observe(root.name, root.duration)
+    parts = []
+    for path, duration in root.walk():
+        stats.observe(path, duration)
+        parts.append(f"{path} {_format_sec(duration)}")
+
+    outcome = "" if ok else "（失败）"
+    detail = f"：{', '.join(parts)}" if parts else ""
+    logger.bind(trigger=trigger, spans=root.to_dict(), ok=ok).debug(
+        f"{root.name} 耗时 {_format_sec(root.duration)}{outcome}{detail}"
+    )
+
+
+def observe_tree(tree: dict, stats: SpanStats | None = None) -> None:
+    """将其他进程记录的区间树（`Span.to_dict` 的结果）计入 ``stats``。"""
+    stats = login_stats if stats is None else stats
+    stats.observe(tree["name"], tree["ms"] / 1000)
+
+    def visit(node: dict, prefix: str) -> None:
+        for child in node.get("children", ()):
+            path = f"{prefix}{child['name']}"
+            stats.observe(path, child["ms"] / 1000)
+            visit(child, f"{path}.")
+
+    visit(tree, "")
+
+
+def format_summaries(summaries: dict[str, HistogramSummary]) -> str:
+    """将各区间的滚动统计格式化为一行文本。"""
+    return ", ".join(
+        f"{name} p50 {_format_sec(s.p50)}/p95 {_format_sec(s.p95)}"
+        for name, s in summaries.items()
+        if s.count
+    )
+
+
+def _format_sec(value: float) -> str:
+    if value < 1:
+        return f"{value * 1000:.0f}ms"
+    return f"{value:.2f}s"
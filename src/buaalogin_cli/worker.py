@@ -0,0 +1,248 @@
+"""隔离登录：在短生命周期的子进程中执行浏览器登录
+
+长期运行的保活进程每次浏览器登录都会留下 Playwright 驱动状态与内存碎片，
+常驻内存随之缓慢增长；Chromium 卡死时还会拖住保活循环。隔离模式下：
+
+- 每次登录启动一个 ``python -m buaalogin_cli.worker`` 子进程，`LoginJob`
+  经 stdin 管道以 msgpack 传入，`LoginOutcome` 经 stdout 管道传回；
+- 子进程的日志逐行编码后写入 stderr，由保活进程转发到自己的日志；
+- 子进程在独立的进程组中运行，超过截止时间后连同 Chromium 一起被强制结束；
+- 可选地为子进程设置内存上限（Chromium 子进程同样继承）。
+
+保活进程自身只保留状态探测循环，不再启动 Playwright 驱动与浏览器。
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import sys
+from typing import Any
+
+import msgspec
+from msgspec import Struct
+
+from .constants import ResourceProfile
+from .log import logger
+
+# 截止时间的默认值（秒）：浏览器启动、打开登录页与等待结果都需计入
+DEFAULT_DEADLINE_SEC = 90.0
+
+_POSIX = os.name == "posix"
+
+
+class Isolation(Struct, frozen=True):
+    """隔离登录的限制。
+
+    Attributes:
+        deadline_sec: 子进程的最长运行时间（秒），超时连同浏览器强制结束。
+        memory_limit_mb: 子进程及其 Chromium 子进程各自的虚拟内存上限（MiB），
+            0 表示不限制。Chromium 会预留大量虚拟地址空间，过小会导致无法启动。
+    """
+
+    deadline_sec: float = DEFAULT_DEADLINE_SEC
+    memory_limit_mb: int = 0
+
+
+class LoginJob(Struct, frozen=True):
+    """传给子进程的登录参数。"""
+
+    username: str
+    password: str
+    headless: bool = True
+    resource_filter: ResourceProfile = ResourceProfile.DEFAULT
+    timeout_sec: float = 15.0
+    memory_limit_mb: int = 0
+
+
+class LoginOutcome(Struct, frozen=True, omit_defaults=True):
+    """子进程返回的登录结果。
+
+    Attributes:
+        error: 失败原因，成功时为 None。
+        spans: 子进程中登录各阶段的计时区间树（见 `timing.Span.to_dict`）。
+    """
+
+    error: str | None = None
+    spans: dict[str, Any] | None = None
+
+
+class LogLine(Struct, frozen=True, array_like=True):
+    """子进程转发给保活进程的一条日志。"""
+
+    level: str
+    trigger: str
+    message: str
+
+
+_encoder = msgspec.msgpack.Encoder()
+_job_decoder = msgspec.msgpack.Decoder(LoginJob)
+_outcome_decoder = msgspec.msgpack.Decoder(LoginOutcome)
+_log_encoder = msgspec.json.Encoder()
+_log_decoder = msgspec.json.Decoder(LogLine)
+
+
+# region 保活进程侧
+
+
+def login_isolated(
+    username: str,
+    password: str,
+    *,
+    isolation: Isolation,
+    headless: bool = True,
+    resource_filter: ResourceProfile = ResourceProfile.DEFAULT,
+    timeout_sec: float = 15.0,
+) -> None:
+    """在子进程中执行浏览器登录。
+
+    Raises:
+        LoginError: 登录失败、子进程超时或异常退出。
+    """
+    from . import timing
+    from .service import LoginError
+
+    log = logger.bind(trigger="login")
+    job = LoginJob(
+        username,
+        password,
+        headless=headless,
+        resource_filter=resource_filter,
+        timeout_sec=timeout_sec,
+        memory_limit_mb=isolation.memory_limit_mb,
+    )
+
+    log.debug("正在启动登录子进程...")
+    proc = subprocess.Popen(
+        _worker_command(),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=_POSIX,
+    )
+    try:
+        stdout, stderr = proc.communicate(
+            _encoder.encode(job), timeout=isolation.deadline_sec
+        )
+    except subprocess.TimeoutExpired:
+        _kill(proc)
+        _, stderr = proc.communicate()
+        _forward_logs(stderr)
+        msg = f"登录子进程超过 {isolation.deadline_sec:g} 秒未结束，已强制终止"
+        log.error(msg)
+        raise LoginError(msg) from None
+    finally:
+        # 子进程已退出时清理可能残留的浏览器进程；超时路径下已结束
+        _kill(proc)
+
+    _forward_logs(stderr)
+    try:
+        outcome = _outcome_decoder.decode(stdout)
+    except msgspec.DecodeError:
+        msg = f"登录子进程异常退出（退出码 {proc.returncode}）"
+        log.error(msg)
+        raise LoginError(msg) from None
+
+    if outcome.spans is not None:
+        timing.observe_tree(outcome.spans)
+    if outcome.error is not None:
+        raise LoginError(outcome.error)
+
+
+def _worker_command() -> list[str]:
+    return [sys.executable, "-m", "buaalogin_cli.worker"]
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    """结束子进程所在的进程组（含 Chromium），进程组已不存在时忽略。"""
+    if _POSIX:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    elif proc.poll() is None:
+        proc.kill()
+
+
+def _forward_logs(stderr: bytes) -> None:
+    """将子进程的日志转发到本进程；无法解析的行（如浏览器输出）按 DEBUG 记录。"""
+    for raw in stderr.splitlines():
+        if not raw.strip():
+            continue
+        try:
+            line = _log_decoder.decode(raw)
+        except msgspec.DecodeError:
+            text = raw.decode(errors="replace").rstrip()
+            logger.bind(trigger="worker").debug(text)
+            continue
+        logger.bind(trigger=line.trigger).log(line.level, line.message)
+
+
+# endregion
+
+# region 子进程侧
+
+
+def _apply_limits(job: LoginJob) -> None:
+    if job.memory_limit_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:  # Windows 没有 resource 模块
+        logger.bind(trigger="worker").debug("当前平台不支持资源限制，已忽略")
+        return
+
+    limit = job.memory_limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def main() -> int:
+    """子进程入口：读取 `LoginJob`，登录后写回 `LoginOutcome`。"""
+    from .constants import LoginEngine
+    from .service import LoginError, login
+
+    job = _job_decoder.decode(sys.stdin.buffer.read())
+    spans: list[dict[str, Any]] = []
+
+    def sink(message) -> None:
+        record = message.record
+        if "spans" in record["extra"]:
+            spans.append(record["extra"]["spans"])
+        line = LogLine(
+            record["level"].name, record["extra"]["trigger"], record["message"]
+        )
+        sys.stderr.buffer.write(_log_encoder.encode(line) + b"\n")
+        sys.stderr.buffer.flush()
+
+    logger.remove()
+    logger.add(sink, level="DEBUG")
+
+    error = None
+    try:
+        _apply_limits(job)
+        login(
+            job.username,
+            job.password,
+            headless=job.headless,
+            engine=LoginEngine.BROWSER,
+            resource_filter=job.resource_filter,
+            timeout_sec=job.timeout_sec,
+            exclusive=False,
+        )
+    except LoginError as e:
+        error = str(e)
+    except Exception as e:
+        error = f"登录子进程出错：{e}"
+
+    outcome = LoginOutcome(error, spans[-1] if spans else None)
+    sys.stdout.buffer.write(_encoder.encode(outcome))
+    sys.stdout.buffer.flush()
+    return 0
+
+
+# endregion
+
+
+if __name__ == "__main__":
+    sys.exit(main())
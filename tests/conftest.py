@@ -5,6 +5,48 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from buaalogin_cli import breaker, config, gateway, ledger, locking, persist, reaper
+from mock_gateway import MockGateway
+
+
+@pytest.fixture(autouse=True)
+def isolated_locks(tmp_path: Path, monkeypatch):
+    """将跨进程锁与登录结果文件指向临时目录，避免测试之间及与真实进程互相干扰"""
+    run_dir = tmp_path / "run"
+    monkeypatch.setattr(locking, "DAEMON_LOCK", run_dir / "daemon.lock")
+    monkeypatch.setattr(locking, "LOGIN_LOCK", run_dir / "login.lock")
+    monkeypatch.setattr(locking, "LOGIN_RESULT", run_dir / "login.result")
+    return run_dir
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path: Path, monkeypatch):
+    """将保活状态文件与在线时长账本指向临时目录，避免读写真实文件"""
+    path = tmp_path / "keepalive.state"
+    monkeypatch.setattr(persist, "STATE_FILE", path)
+    monkeypatch.setattr(ledger, "LEDGER_FILE", tmp_path / "uptime.ledger")
+    monkeypatch.setattr(ledger, "LEDGER_INDEX", tmp_path / "uptime.index")
+    return path
+
+
+@pytest.fixture(autouse=True)
+def isolated_browsers(tmp_path: Path, monkeypatch):
+    """将浏览器进程记录指向临时目录，避免清理到真实保活进程的浏览器"""
+    path = tmp_path / "browsers.json"
+    monkeypatch.setattr(reaper, "BROWSER_PIDFILE", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(tmp_path: Path, monkeypatch):
+    """将保活进程监视的配置文件指向临时目录（默认不存在），不读取真实配置"""
+    path = tmp_path / "config.json"
+    monkeypatch.setattr(config, "CONFIG_FILE", path)
+    monkeypatch.setattr(breaker, "CONFIG_FILE", path)
+    config.get_config.cache_clear()
+    yield path
+    config.get_config.cache_clear()
+
 
 @pytest.fixture
 def temp_config_file(tmp_path: Path):
@@ -24,31 +66,6 @@ def empty_config_file(tmp_path: Path):
     return config_file
 
 
-@pytest.fixture
-def mock_urlopen():
-    """Mock urllib.request.urlopen。"""
-    with patch("buaalogin_cli.service.urllib.request.urlopen") as mock:
-        yield mock
-
-
-@pytest.fixture
-def mock_response_logged_in(mock_urlopen):
-    """模拟已登录状态的响应（URL 包含 success）。"""
-    mock_response = MagicMock()
-    mock_response.url = "https://gw.buaa.edu.cn/srun_portal_success"
-    mock_urlopen.return_value = mock_response
-    return mock_urlopen
-
-
-@pytest.fixture
-def mock_response_logged_out(mock_urlopen):
-    """模拟未登录状态的响应（跳转到登录页）。"""
-    mock_response = MagicMock()
-    mock_response.url = "https://gw.buaa.edu.cn/srun_portal_pc"
-    mock_urlopen.return_value = mock_response
-    return mock_urlopen
-
-
 @pytest.fixture
 def mock_playwright(tmp_path: Path):
     """Mock Playwright 浏览器。"""
@@ -86,3 +103,32 @@ def sample_credentials():
         "username": "test_user",
         "password": "test_password",
     }
+
+
+@pytest.fixture
+def srun_gateway(sample_credentials):
+    """在本地端口启动的深澜网关替身，仅接受 sample_credentials。"""
+    with MockGateway(
+        sample_credentials["username"], sample_credentials["password"]
+    ) as gateway:
+        yield gateway
+
+
+@pytest.fixture
+def offline_gateway(srun_gateway, monkeypatch):
+    """将状态探测与登录指向本地网关替身。
+
+    浏览器登录的请求过滤规则按导入时的网关地址生成，使用替身时应传入
+    ``resource_filter=ResourceProfile.OFF``。
+    """
+    from buaalogin_cli import service, status
+
+    monkeypatch.setattr(
+        status, "RAD_USER_INFO_URL", f"{srun_gateway.url}/cgi-bin/rad_user_info"
+    )
+    monkeypatch.setattr(service, "GATEWAY_URL", srun_gateway.url)
+    monkeypatch.setattr(service, "LOGIN_URL", srun_gateway.url)
+    # 连接池可能保留着指向其他地址的连接
+    gateway.reset_session()
+    yield srun_gateway
+    gateway.reset_session()
@@ -6,8 +6,12 @@
 
 from unittest.mock import patch
 
+import msgspec
 import pytest
 
+from buaalogin_cli.constants import LoginEngine, ResourceProfile
+from buaalogin_cli.status import StatusInfo
+
 
 class TestKeepAliveLogic:
     """测试保活逻辑"""
@@ -23,7 +27,7 @@ class TestKeepAliveLogic:
         from buaalogin_cli.service import NetworkStatus, keep_alive
 
         # 模拟已登录状态
-        mock_get_status.return_value = NetworkStatus.LOGGED_IN
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_IN)
 
         # 在第一次 sleep 后抛出异常退出循环
         mock_sleep.side_effect = [None, KeyboardInterrupt()]
@@ -52,7 +56,7 @@ class TestKeepAliveLogic:
         from buaalogin_cli.service import NetworkStatus, keep_alive
 
         # 模拟未登录状态
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
 
         # 在 sleep 后退出
         mock_sleep.side_effect = KeyboardInterrupt()
@@ -65,11 +69,13 @@ class TestKeepAliveLogic:
             )
 
         # 验证 login 被调用
-        mock_login.assert_called_once_with(
+        mock_login.assert_called_once()
+        assert mock_login.call_args.args == (
             sample_credentials["username"],
             sample_credentials["password"],
-            headless=True,
         )
+        assert mock_login.call_args.kwargs["headless"] is True
+        assert mock_login.call_args.kwargs["engine"] == LoginEngine.BROWSER
         mock_exit.assert_called_once_with(0)
 
     @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
@@ -83,7 +89,7 @@ class TestKeepAliveLogic:
         from buaalogin_cli.service import NetworkStatus, keep_alive
 
         # 模拟非校园网环境
-        mock_get_status.return_value = NetworkStatus.UNKNOWN_NETWORK
+        mock_get_status.return_value = StatusInfo(NetworkStatus.UNKNOWN_NETWORK)
 
         # 在 sleep 后退出
         mock_sleep.side_effect = KeyboardInterrupt()
@@ -109,7 +115,7 @@ class TestKeepAliveLogic:
         """测试登录失败时继续运行"""
         from buaalogin_cli.service import LoginError, NetworkStatus, keep_alive
 
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
         mock_login.side_effect = LoginError("Auth failed")
 
         # 第一次循环登录失败，第二次退出
@@ -136,7 +142,7 @@ class TestKeepAliveLogic:
         """测试检查间隔直接按秒使用"""
         from buaalogin_cli.service import NetworkStatus, keep_alive
 
-        mock_get_status.return_value = NetworkStatus.LOGGED_IN
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_IN)
         mock_sleep.side_effect = KeyboardInterrupt()
 
         with pytest.raises(SystemExit):
@@ -146,7 +152,8 @@ class TestKeepAliveLogic:
                 check_interval_sec=60,
             )
 
-        mock_sleep.assert_called_with(60)
+        # 等待到下一次检测的截止时间，已扣除本轮检测耗时
+        assert mock_sleep.call_args.args[0] == pytest.approx(60, abs=0.5)
         mock_exit.assert_called_once_with(0)
 
     @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
@@ -159,7 +166,7 @@ class TestKeepAliveLogic:
         """测试无头模式参数传递"""
         from buaalogin_cli.service import NetworkStatus, keep_alive
 
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
         mock_sleep.side_effect = KeyboardInterrupt()
 
         with pytest.raises(SystemExit):
@@ -170,11 +177,11 @@ class TestKeepAliveLogic:
                 headless=False,
             )
 
-        mock_login.assert_called_with(
+        assert mock_login.call_args.args == (
             sample_credentials["username"],
             sample_credentials["password"],
-            headless=False,
         )
+        assert mock_login.call_args.kwargs["headless"] is False
         mock_exit.assert_called_once_with(0)
 
     @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
@@ -190,7 +197,7 @@ class TestKeepAliveLogic:
         # 第一次检查抛出异常，然后正常
         mock_get_status.side_effect = [
             Exception("Network error"),
-            NetworkStatus.LOGGED_IN,
+            StatusInfo(NetworkStatus.LOGGED_IN),
         ]
         # 异常后短暂 sleep，然后正常 sleep，然后退出
         mock_sleep.side_effect = [None, KeyboardInterrupt()]
@@ -230,3 +237,451 @@ class TestKeepAliveUserInterrupt:
 
         assert exc_info.value.code == 0
         mock_exit.assert_called_once_with(0)
+
+
+class TestKeepAliveWarmBrowser:
+    """测试常驻浏览器模式"""
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    @patch("buaalogin_cli.service.time.sleep")
+    @patch("buaalogin_cli.service.login")
+    @patch("buaalogin_cli.service.get_status")
+    @patch("buaalogin_cli.service.WarmBrowser")
+    def test_keep_alive_reuses_and_closes_warm_browser(
+        self,
+        mock_warm_cls,
+        mock_get_status,
+        mock_login,
+        mock_sleep,
+        mock_exit,
+        sample_credentials,
+    ):
+        """测试多次登录复用同一个常驻浏览器，退出时关闭"""
+        from buaalogin_cli.service import NetworkStatus, keep_alive
+
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_sleep.side_effect = [None, KeyboardInterrupt()]
+
+        with pytest.raises(SystemExit):
+            keep_alive(
+                sample_credentials["username"],
+                sample_credentials["password"],
+                check_interval_sec=1,
+                warm_browser=True,
+                browser_idle_sec=120,
+            )
+
+        warm = mock_warm_cls.return_value
+        mock_warm_cls.assert_called_once_with(headless=True, idle_timeout_sec=120)
+        assert mock_login.call_count == 2
+        assert all(c.kwargs["browser"] is warm for c in mock_login.call_args_list)
+        assert warm.release_if_idle.call_count == 2
+        warm.close.assert_called_once()
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    @patch("buaalogin_cli.service.time.sleep")
+    @patch("buaalogin_cli.service.login")
+    @patch("buaalogin_cli.service.get_status")
+    @patch("buaalogin_cli.service.WarmBrowser")
+    def test_keep_alive_http_engine_ignores_warm_browser(
+        self,
+        mock_warm_cls,
+        mock_get_status,
+        mock_login,
+        mock_sleep,
+        mock_exit,
+        sample_credentials,
+    ):
+        """测试 HTTP 引擎不启动常驻浏览器"""
+        from buaalogin_cli.service import NetworkStatus, keep_alive
+
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_sleep.side_effect = KeyboardInterrupt()
+
+        with pytest.raises(SystemExit):
+            keep_alive(
+                sample_credentials["username"],
+                sample_credentials["password"],
+                check_interval_sec=1,
+                engine=LoginEngine.HTTP,
+                warm_browser=True,
+            )
+
+        mock_warm_cls.assert_not_called()
+        assert mock_login.call_args.kwargs["browser"] is None
+
+
+class TestKeepAliveIsolatedLogin:
+    """测试隔离登录模式"""
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    @patch("buaalogin_cli.service.time.sleep")
+    @patch("buaalogin_cli.service.login")
+    @patch("buaalogin_cli.service.get_status")
+    @patch("buaalogin_cli.service.WarmBrowser")
+    def test_isolation_replaces_warm_browser(
+        self,
+        mock_warm_cls,
+        mock_get_status,
+        mock_login,
+        mock_sleep,
+        mock_exit,
+        sample_credentials,
+    ):
+        """测试隔离登录时传入子进程限制，且不启动常驻浏览器"""
+        from buaalogin_cli.service import NetworkStatus, keep_alive
+        from buaalogin_cli.worker import Isolation
+
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_sleep.side_effect = KeyboardInterrupt()
+
+        with pytest.raises(SystemExit):
+            keep_alive(
+                sample_credentials["username"],
+                sample_credentials["password"],
+                check_interval_sec=1,
+                warm_browser=True,
+                isolate_login=True,
+                login_deadline_sec=30,
+                login_memory_limit_mb=2048,
+            )
+
+        mock_warm_cls.assert_not_called()
+        kwargs = mock_login.call_args.kwargs
+        assert kwargs["browser"] is None
+        assert kwargs["isolation"] == Isolation(30, 2048)
+
+
+class TestKeepAliveControlState:
+    """测试保活循环与控制套接字共享的状态"""
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    @patch("buaalogin_cli.service.time.sleep", side_effect=KeyboardInterrupt())
+    @patch("buaalogin_cli.service.login")
+    @patch("buaalogin_cli.service.get_status")
+    def test_loop_records_probe_and_forced_login(
+        self, mock_get_status, mock_login, mock_sleep, mock_exit, sample_credentials
+    ):
+        """测试记录探测结果，并在已登录时也执行控制命令转来的登录请求"""
+        from buaalogin_cli.control import DaemonState
+        from buaalogin_cli.scheduler import FixedScheduler
+        from buaalogin_cli.service import NetworkStatus, _keep_alive_loop
+
+        info = StatusInfo(NetworkStatus.LOGGED_IN, user="test_user")
+        mock_get_status.return_value = info
+        state = DaemonState()
+        state.request_relogin()
+
+        with pytest.raises(SystemExit):
+            _keep_alive_loop(
+                sample_credentials["username"],
+                sample_credentials["password"],
+                FixedScheduler(60),
+                headless=True,
+                engine=LoginEngine.HTTP,
+                browser=None,
+                resource_filter=ResourceProfile.DEFAULT,
+                login_timeout_sec=15,
+                state=state,
+            )
+
+        mock_login.assert_called_once()
+        assert state.probe is not None
+        assert state.probe.info == info
+        assert state.login is not None
+        assert state.login.ok
+        assert not state.take_relogin_request()
+
+
+class TestKeepAliveBreaker:
+    """测试保活循环的登录熔断"""
+
+    @staticmethod
+    def _run(credentials, breaker, state=None, config_watcher=None, overrides=()):
+        from buaalogin_cli.scheduler import FixedScheduler
+        from buaalogin_cli.service import _keep_alive_loop
+
+        with pytest.raises(SystemExit):
+            _keep_alive_loop(
+                credentials["username"],
+                credentials["password"],
+                FixedScheduler(60),
+                headless=True,
+                engine=LoginEngine.HTTP,
+                browser=None,
+                resource_filter=ResourceProfile.DEFAULT,
+                login_timeout_sec=15,
+                state=state,
+                login_breaker=breaker,
+                config_watcher=config_watcher,
+                config_overrides=frozenset(overrides),
+            )
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    @patch("buaalogin_cli.service.time.sleep")
+    @patch("buaalogin_cli.service.login")
+    @patch("buaalogin_cli.service.get_status")
+    def test_credential_error_pauses_until_config_changes(
+        self,
+        mock_get_status,
+        mock_login,
+        mock_sleep,
+        mock_exit,
+        tmp_path,
+    ):
+        """测试密码错误后暂停自动登录，配置文件更新后以新密码登录"""
+        from buaalogin_cli.breaker import BreakerState, CircuitBreaker
+        from buaalogin_cli.config import ConfigWatcher
+        from buaalogin_cli.control import DaemonState
+        from buaalogin_cli.service import LoginError, NetworkStatus
+
+        config = tmp_path / "config.json"
+        config.write_text('{"username": "user", "password": "old"}')
+        watcher = ConfigWatcher(config)
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_login.side_effect = [LoginError("E2553: Password is error."), None]
+        state = DaemonState()
+        seen = []
+
+        def sleep(_):
+            seen.append(state.breaker.state)
+            if len(seen) == 2:
+                config.write_text('{"username": "user", "password": "new!"}')
+            elif len(seen) == 3:
+                raise KeyboardInterrupt
+
+        mock_sleep.side_effect = sleep
+
+        # 保活进程以配置文件中的账号密码启动
+        self._run(
+            {"username": "user", "password": "old"},
+            CircuitBreaker(config_path=config),
+            state,
+            watcher,
+        )
+
+        assert seen == [BreakerState.OPEN, BreakerState.OPEN, BreakerState.CLOSED]
+        assert mock_login.call_count == 2
+        assert mock_login.call_args.args == ("user", "new!")
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    @patch("buaalogin_cli.service.time.sleep")
+    @patch("buaalogin_cli.service.login")
+    @patch("buaalogin_cli.service.get_status")
+    def test_transient_error_backs_off(
+        self, mock_get_status, mock_login, mock_sleep, mock_exit, sample_credentials
+    ):
+        """测试暂时性错误后退避期内不再自动登录"""
+        from buaalogin_cli.breaker import CircuitBreaker
+        from buaalogin_cli.service import LoginError, NetworkStatus
+
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_login.side_effect = LoginError("网关请求失败：timed out")
+        mock_sleep.side_effect = [None, None, KeyboardInterrupt()]
+
+        self._run(sample_credentials, CircuitBreaker(3600))
+
+        mock_login.assert_called_once()
+        assert mock_get_status.call_count == 3
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    @patch("buaalogin_cli.service.time.sleep")
+    @patch("buaalogin_cli.service.login")
+    @patch("buaalogin_cli.service.get_status")
+    def test_config_hot_reload_resets_backoff(
+        self,
+        mock_get_status,
+        mock_login,
+        mock_sleep,
+        mock_exit,
+        tmp_path,
+    ):
+        """测试退避期间更换密码后立即以新密码登录，新的检测间隔随之生效"""
+        from buaalogin_cli.breaker import CircuitBreaker
+        from buaalogin_cli.config import ConfigWatcher
+        from buaalogin_cli.service import LoginError, NetworkStatus
+
+        config = tmp_path / "config.json"
+        config.write_text('{"username": "user", "password": "old"}')
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_login.side_effect = [LoginError("网关请求失败：timed out"), None]
+        delays = []
+
+        def sleep(delay):
+            delays.append(delay)
+            if len(delays) == 2:
+                config.write_text(
+                    '{"username": "user", "password": "new!", "interval": 30}'
+                )
+            elif len(delays) == 3:
+                raise KeyboardInterrupt
+
+        mock_sleep.side_effect = sleep
+
+        self._run(
+            {"username": "user", "password": "old"},
+            CircuitBreaker(3600),
+            None,
+            ConfigWatcher(config),
+        )
+
+        assert mock_login.call_count == 2
+        assert mock_login.call_args.args == ("user", "new!")
+        assert delays == pytest.approx([60, 60, 30], abs=1)
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    @patch("buaalogin_cli.service.time.sleep")
+    @patch("buaalogin_cli.service.login")
+    @patch("buaalogin_cli.service.get_status")
+    def test_config_hot_reload_keeps_overrides(
+        self, mock_get_status, mock_login, mock_sleep, mock_exit, tmp_path
+    ):
+        """测试命令行或环境变量指定的配置项不随配置文件更新，其余照常生效"""
+        from buaalogin_cli.breaker import CircuitBreaker
+        from buaalogin_cli.config import ConfigWatcher
+        from buaalogin_cli.service import LoginError, NetworkStatus
+
+        config = tmp_path / "config.json"
+        config.write_text('{"username": "user", "password": "old"}')
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_login.side_effect = LoginError("网关请求失败：timed out")
+        delays = []
+
+        def sleep(delay):
+            delays.append(delay)
+            if len(delays) == 1:
+                config.write_text(
+                    '{"username": "user", "password": "new!", "interval": 30}'
+                )
+            elif len(delays) == 2:
+                raise KeyboardInterrupt
+
+        mock_sleep.side_effect = sleep
+
+        self._run(
+            {"username": "user", "password": "cli"},
+            CircuitBreaker(3600),
+            None,
+            ConfigWatcher(config),
+            overrides=("password",),
+        )
+
+        mock_login.assert_called_once_with("user", "cli", **mock_login.call_args.kwargs)
+        assert delays == pytest.approx([60, 30], abs=1)
+
+
+class TestKeepAliveResume:
+    """测试保活状态跨重启恢复"""
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    @patch("buaalogin_cli.service.time.sleep")
+    @patch("buaalogin_cli.service.login")
+    @patch("buaalogin_cli.service.get_status")
+    def test_restart_resumes_login_backoff(
+        self,
+        mock_get_status,
+        mock_login,
+        mock_sleep,
+        mock_exit,
+        sample_credentials,
+        isolated_state,
+    ):
+        """测试重启后沿用上次的登录退避，不立即再次登录"""
+        from buaalogin_cli import persist
+        from buaalogin_cli.breaker import BreakerState
+        from buaalogin_cli.service import LoginError, NetworkStatus, keep_alive
+
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_login.side_effect = LoginError("网关请求失败：timed out")
+
+        for _ in range(2):
+            mock_sleep.side_effect = KeyboardInterrupt()
+            with pytest.raises(SystemExit):
+                keep_alive(
+                    sample_credentials["username"],
+                    sample_credentials["password"],
+                    check_interval_sec=1,
+                    engine=LoginEngine.HTTP,
+                )
+
+        mock_login.assert_called_once()
+        saved = persist.StateStore(isolated_state).load()
+        assert saved is not None
+        assert saved.status == NetworkStatus.LOGGED_OUT
+        assert saved.breaker is not None
+        assert saved.breaker.state == BreakerState.BACKOFF
+        assert saved.breaker.failures == 1
+
+
+class TestKeepAliveLedger:
+    """测试在线时长账本"""
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    @patch("buaalogin_cli.service.time.sleep", side_effect=KeyboardInterrupt())
+    @patch("buaalogin_cli.service.login")
+    @patch("buaalogin_cli.service.get_status")
+    def test_records_relogin_and_exit(
+        self, mock_get_status, mock_login, mock_sleep, mock_exit, sample_credentials
+    ):
+        """测试记录启动时的状态、重新登录的结果与正常退出"""
+        from buaalogin_cli import ledger
+        from buaalogin_cli.service import NetworkStatus, keep_alive
+
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+
+        with pytest.raises(SystemExit):
+            keep_alive(
+                sample_credentials["username"],
+                sample_credentials["password"],
+                check_interval_sec=1,
+                engine=LoginEngine.HTTP,
+            )
+
+        lines = ledger.LEDGER_FILE.read_bytes().splitlines()
+        entries = [msgspec.json.decode(line, type=ledger.Entry) for line in lines]
+        assert [(e.old, e.new) for e in entries] == [
+            (None, NetworkStatus.LOGGED_OUT),
+            (NetworkStatus.LOGGED_OUT, NetworkStatus.LOGGED_IN),
+            (NetworkStatus.LOGGED_IN, None),
+        ]
+        assert entries[1].login_sec is not None
+
+
+class TestKeepAliveMetrics:
+    """测试保活循环更新指标"""
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    @patch("buaalogin_cli.service.time.sleep", side_effect=[None, KeyboardInterrupt()])
+    @patch("buaalogin_cli.service.login")
+    @patch("buaalogin_cli.service.get_status")
+    def test_loop_updates_metrics(
+        self, mock_get_status, mock_login, mock_sleep, mock_exit, sample_credentials
+    ):
+        """测试记录每次探测与登录结果"""
+        from buaalogin_cli.exporter import Metrics
+        from buaalogin_cli.scheduler import FixedScheduler
+        from buaalogin_cli.service import LoginError, NetworkStatus, _keep_alive_loop
+
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_login.side_effect = [LoginError("E2553: Password is error."), None]
+        metrics = Metrics()
+
+        with pytest.raises(SystemExit):
+            _keep_alive_loop(
+                sample_credentials["username"],
+                sample_credentials["password"],
+                FixedScheduler(60),
+                headless=True,
+                engine=LoginEngine.HTTP,
+                browser=None,
+                resource_filter=ResourceProfile.DEFAULT,
+                login_timeout_sec=15,
+                metrics=metrics,
+            )
+
+        text = metrics.render().decode()
+        assert 'buaalogin_probes_total{status="logged_out"} 2' in text
+        assert 'buaalogin_logins_total{result="success"} 1' in text
+        assert 'buaalogin_login_failures_total{reason="credential"} 1' in text
+        assert "buaalogin_probe_duration_seconds_count 2" in text
+        assert metrics.status == NetworkStatus.LOGGED_OUT
@@ -7,7 +7,9 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from buaalogin_cli.constants import ResourceProfile
 from buaalogin_cli.service import LoginError, NetworkStatus, login
+from buaalogin_cli.status import StatusInfo
 
 
 class TestLoginFlow:
@@ -18,7 +20,7 @@ class TestLoginFlow:
         self, mock_get_status, mock_playwright, sample_credentials
     ):
         """测试成功登录流程"""
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
         mock_page = mock_playwright["page"]
 
         # 模拟登录后跳转到成功页
@@ -39,7 +41,7 @@ class TestLoginFlow:
         self, mock_get_status, mock_playwright, sample_credentials
     ):
         """测试已登录状态直接返回，不启动浏览器"""
-        mock_get_status.return_value = NetworkStatus.LOGGED_IN
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_IN)
 
         login(
             sample_credentials["username"],
@@ -55,7 +57,7 @@ class TestLoginFlow:
         self, mock_get_status, mock_playwright, sample_credentials
     ):
         """测试登录时填写用户名和密码"""
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
         mock_page = mock_playwright["page"]
 
         # 模拟提交后跳转到成功页
@@ -81,7 +83,7 @@ class TestLoginFlow:
         self, mock_get_status, mock_playwright, sample_credentials
     ):
         """测试无头模式参数传递"""
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
         mock_page = mock_playwright["page"]
         type(mock_page).url = property(lambda self: "https://gw.buaa.edu.cn/success")
 
@@ -103,7 +105,7 @@ class TestLoginFlow:
         self, mock_get_status, mock_playwright, sample_credentials
     ):
         """测试可见模式参数传递"""
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
         mock_page = mock_playwright["page"]
         type(mock_page).url = property(lambda self: "https://gw.buaa.edu.cn/success")
 
@@ -125,7 +127,7 @@ class TestLoginFlow:
         self, mock_get_status, mock_playwright, sample_credentials
     ):
         """测试成功后关闭浏览器"""
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
         mock_page = mock_playwright["page"]
         type(mock_page).url = property(lambda self: "https://gw.buaa.edu.cn/success")
         mock_browser = mock_playwright["browser"]
@@ -144,7 +146,7 @@ class TestLoginFlow:
         self, mock_get_status, mock_playwright, sample_credentials
     ):
         """测试异常时也关闭浏览器"""
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
         mock_page = mock_playwright["page"]
         type(mock_page).url = property(
             lambda self: "https://gw.buaa.edu.cn/srun_portal_pc"
@@ -162,6 +164,37 @@ class TestLoginFlow:
         # 验证浏览器被关闭
         mock_browser.close.assert_called_once()
 
+    @patch("buaalogin_cli.service.get_status")
+    def test_login_installs_request_filter_by_default(
+        self, mock_get_status, mock_playwright, sample_credentials
+    ):
+        """测试默认在登录页上注册请求过滤"""
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_page = mock_playwright["page"]
+        type(mock_page).url = property(lambda self: "https://gw.buaa.edu.cn/success")
+
+        login(sample_credentials["username"], sample_credentials["password"])
+
+        mock_page.route.assert_called_once()
+        assert mock_page.route.call_args.args[0] == "**/*"
+
+    @patch("buaalogin_cli.service.get_status")
+    def test_login_without_request_filter(
+        self, mock_get_status, mock_playwright, sample_credentials
+    ):
+        """测试 off 预设不注册请求过滤"""
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_page = mock_playwright["page"]
+        type(mock_page).url = property(lambda self: "https://gw.buaa.edu.cn/success")
+
+        login(
+            sample_credentials["username"],
+            sample_credentials["password"],
+            resource_filter=ResourceProfile.OFF,
+        )
+
+        mock_page.route.assert_not_called()
+
 
 class TestLoginErrorHandling:
     """测试登录错误处理"""
@@ -173,7 +206,7 @@ class TestLoginErrorHandling:
         """测试页面超时错误"""
         from playwright.sync_api import TimeoutError as PlaywrightTimeout
 
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
         mock_page = mock_playwright["page"]
         mock_page.goto.side_effect = PlaywrightTimeout("Timeout")
 
@@ -191,7 +224,7 @@ class TestLoginErrorHandling:
         self, mock_get_status, mock_playwright, sample_credentials
     ):
         """测试通用错误转换为 LoginError"""
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
         mock_page = mock_playwright["page"]
         mock_page.goto.side_effect = RuntimeError("Unexpected error")
 
@@ -205,7 +238,7 @@ class TestLoginErrorHandling:
     def test_login_unknown_network_error(self, sample_credentials):
         """测试非校园网环境时抛出 LoginError"""
         with patch("buaalogin_cli.service.get_status") as mock_get_status:
-            mock_get_status.return_value = NetworkStatus.UNKNOWN_NETWORK
+            mock_get_status.return_value = StatusInfo(NetworkStatus.UNKNOWN_NETWORK)
 
             with pytest.raises(LoginError) as exc_info:
                 login(
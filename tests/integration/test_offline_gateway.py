@@ -0,0 +1,137 @@
+"""基于本地网关替身的端到端测试
+
+不 mock requests 与 Playwright，走真实的 HTTP 路径。
+"""
+
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from buaalogin_cli.constants import LoginEngine, ResourceProfile
+from buaalogin_cli.scheduler import FixedScheduler
+from buaalogin_cli.service import LoginError, _keep_alive_loop, login
+from buaalogin_cli.status import NetworkStatus, get_status
+
+
+def _chromium_installed() -> bool:
+    try:
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            return Path(p.chromium.executable_path).exists()
+    except Exception:
+        return False
+
+
+class TestStatusProbe:
+    """测试状态探测"""
+
+    def test_logged_out_then_logged_in(self, offline_gateway):
+        """测试探测结果随网关在线状态变化"""
+        assert get_status().status == NetworkStatus.LOGGED_OUT
+
+        offline_gateway.logged_in = True
+        info = get_status()
+
+        assert info.status == NetworkStatus.LOGGED_IN
+        assert info.user == "test_user"
+        assert info.client_ip == "10.0.0.2"
+
+    def test_drop_reports_unknown_network(self, offline_gateway):
+        """测试连接被断开时视为非校园网环境，随后恢复"""
+        offline_gateway.drop_next()
+        assert get_status().status == NetworkStatus.UNKNOWN_NETWORK
+        assert get_status().status == NetworkStatus.LOGGED_OUT
+
+    def test_injected_latency(self, offline_gateway):
+        """测试注入的响应延迟体现在探测耗时上"""
+        offline_gateway.latency = 0.2
+        start = time.perf_counter()
+        get_status()
+        assert time.perf_counter() - start >= 0.2
+
+
+class TestHttpLogin:
+    """测试纯 HTTP 引擎登录"""
+
+    def test_login_success(self, offline_gateway, sample_credentials):
+        """测试凭据正确时登录成功"""
+        login(
+            sample_credentials["username"],
+            sample_credentials["password"],
+            engine=LoginEngine.HTTP,
+        )
+
+        assert offline_gateway.logged_in
+        assert get_status().status == NetworkStatus.LOGGED_IN
+
+    def test_scripted_failure(self, offline_gateway, sample_credentials):
+        """测试预设的网关错误信息原样透出"""
+        offline_gateway.script_login("E2616: Arrearage users.")
+
+        with pytest.raises(LoginError, match="Arrearage"):
+            login(
+                sample_credentials["username"],
+                sample_credentials["password"],
+                engine=LoginEngine.HTTP,
+            )
+        assert not offline_gateway.logged_in
+
+
+@pytest.mark.skipif(not _chromium_installed(), reason="未安装 Playwright Chromium")
+class TestBrowserLogin:
+    """测试浏览器引擎在替身登录页上的真实登录"""
+
+    def test_login_success(self, offline_gateway, sample_credentials):
+        """测试选择器匹配替身登录页并登录成功"""
+        login(
+            sample_credentials["username"],
+            sample_credentials["password"],
+            resource_filter=ResourceProfile.OFF,
+        )
+        assert offline_gateway.logged_in
+
+    def test_wrong_password(self, offline_gateway, sample_credentials):
+        """测试从登录接口响应读取错误信息"""
+        with pytest.raises(LoginError, match="用户名或密码错误"):
+            login(
+                sample_credentials["username"],
+                "wrong",
+                resource_filter=ResourceProfile.OFF,
+            )
+
+
+class TestKeepAlive:
+    """测试保活循环"""
+
+    @patch("buaalogin_cli.service.sys.exit", side_effect=SystemExit(0))
+    def test_relogin_after_logout(self, mock_exit, offline_gateway, sample_credentials):
+        """测试被踢下线后下一轮检查重新登录"""
+        ticks = []
+
+        def fake_sleep(seconds):
+            ticks.append(offline_gateway.logged_in)
+            if len(ticks) == 1:
+                offline_gateway.logout()
+            else:
+                raise KeyboardInterrupt
+
+        with (
+            patch("buaalogin_cli.service.time.sleep", side_effect=fake_sleep),
+            pytest.raises(SystemExit),
+        ):
+            _keep_alive_loop(
+                sample_credentials["username"],
+                sample_credentials["password"],
+                FixedScheduler(60),
+                headless=True,
+                engine=LoginEngine.HTTP,
+                browser=None,
+                resource_filter=ResourceProfile.DEFAULT,
+                login_timeout_sec=5,
+            )
+
+        assert ticks == [True, True]
+        assert offline_gateway.login_count == 2
@@ -0,0 +1,134 @@
+"""CLI 冷启动基准测试
+
+以 ``python -X importtime`` 运行各子命令，检查：
+
+- 不需要的重量级依赖（Playwright、requests、loguru）没有被导入；
+- 导入耗时不超过各命令的预算；
+- 只读命令不会创建配置或日志目录。
+
+预算按本机实测值留出约 3 倍余量，用于发现成倍的回退而非细微波动。
+"""
+
+import os
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from buaalogin_cli.control import ControlServer, DaemonState, Wakeup
+from buaalogin_cli.status import NetworkStatus, StatusInfo
+
+HEAVY_MODULES = ("playwright", "requests", "loguru")
+
+# 命令 -> (导入耗时预算（毫秒），不允许导入的顶层包)
+BUDGETS: dict[tuple[str, ...], tuple[float, tuple[str, ...]]] = {
+    ("-h",): (600, HEAVY_MODULES),
+    ("config", "show"): (250, HEAVY_MODULES),
+    ("info",): (250, HEAVY_MODULES),
+    ("login", "-h"): (600, HEAVY_MODULES),
+    ("run", "-h"): (600, HEAVY_MODULES),
+}
+
+# 取多次运行中的最小值，排除偶发的调度抖动
+RUNS = 3
+
+
+class ImportProfile:
+    """一次 ``-X importtime`` 运行的解析结果。"""
+
+    def __init__(self, stderr: str):
+        self.modules: set[str] = set()
+        self.command_us = 0
+        started = False
+
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "[us]" in line:
+                continue
+            _, cumulative, name = line[len("import time:") :].split("|")
+            module = name.strip()
+            self.modules.add(module)
+            # 解释器自身启动（site、encodings 等）不计入命令的导入耗时
+            started = started or module.startswith("buaalogin_cli")
+            if started and not name.startswith("  "):
+                self.command_us += int(cumulative)
+
+    @property
+    def command_ms(self) -> float:
+        return self.command_us / 1000
+
+    def imported(self, package: str) -> bool:
+        return any(m == package or m.startswith(f"{package}.") for m in self.modules)
+
+
+@pytest.fixture
+def isolated_env(tmp_path):
+    """指向临时目录的 XDG 环境，避免读写真实配置与日志。"""
+    env = dict(os.environ)
+    for var in ("XDG_CONFIG_HOME", "XDG_STATE_HOME", "XDG_CACHE_HOME"):
+        env[var] = str(tmp_path / var.lower())
+    # platformdirs 只接受属主为当前用户、权限为 0700 的运行时目录
+    runtime_dir = tmp_path / "run"
+    runtime_dir.mkdir(mode=0o700)
+    env["XDG_RUNTIME_DIR"] = str(runtime_dir)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(Path(__file__).parents[2] / "src"), env.get("PYTHONPATH", "")]
+    )
+    return env
+
+
+def _profile(args: tuple[str, ...], env: dict[str, str]) -> ImportProfile:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "buaalogin_cli", *args],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert "Traceback" not in result.stderr, result.stderr
+    return ImportProfile(result.stderr)
+
+
+@pytest.mark.parametrize("args", list(BUDGETS), ids=" ".join)
+def test_cold_start_within_budget(args, isolated_env):
+    """测试各命令不导入多余依赖，且导入耗时在预算内"""
+    budget_ms, forbidden = BUDGETS[args]
+    profiles = [_profile(args, isolated_env) for _ in range(RUNS)]
+
+    loaded = [pkg for pkg in forbidden if profiles[0].imported(pkg)]
+    assert not loaded, f"`buaalogin {' '.join(args)}` 导入了 {loaded}"
+
+    best = min(p.command_ms for p in profiles)
+    assert best <= budget_ms, (
+        f"`buaalogin {' '.join(args)}` 导入耗时 {best:.0f} ms，超过预算 {budget_ms} ms"
+    )
+
+
+def test_read_only_commands_create_no_directories(isolated_env, tmp_path):
+    """测试只读命令不会创建配置与日志目录"""
+    for args in (("-h",), ("config", "show"), ("info",)):
+        _profile(args, isolated_env)
+
+    assert not (tmp_path / "xdg_config_home").exists()
+    assert not (tmp_path / "xdg_state_home").exists()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="需要 Unix 域套接字")
+def test_status_via_daemon_skips_gateway_stack(isolated_env, tmp_path):
+    """测试保活进程在运行时，status 不加载 requests 与 Playwright"""
+    path = tmp_path / "run" / "buaalogin-cli" / "control.sock"
+    state = DaemonState()
+    state.record_probe(StatusInfo(NetworkStatus.LOGGED_IN))
+    wakeup = Wakeup()
+    server = ControlServer(state, wakeup, path=path)
+    server.start()
+    try:
+        profile = _profile(("status",), isolated_env)
+    finally:
+        server.close()
+        wakeup.close()
+
+    assert profile.imported("buaalogin_cli.control")
+    assert not profile.imported("requests")
+    assert not profile.imported("playwright")
@@ -0,0 +1,349 @@
+"""本地深澜网关替身，供离线测试与基准测试使用
+
+实现真实网关中本工具用到的全部接口：
+
+- ``/``：302 跳转到带 ac_id 的登录页；
+- ``/srun_portal_pc``：登录页 HTML，使用与真实网关相同的表单选择器，
+  页面脚本向 ``srun_portal`` 提交登录；
+- ``/cgi-bin/get_challenge``、``/cgi-bin/srun_portal``：JSONP 接口，
+  按深澜协议校验 HTTP 引擎提交的加密参数；
+- ``/cgi-bin/rad_user_info``：在线信息；
+- ``/srun_portal_success``：登录成功页。
+
+可注入响应延迟、随机或指定次数的断连，并可按顺序预设登录结果。
+
+单独运行::
+
+    python tests/mock_gateway.py --port 8080 --latency 0.05
+    BUAA_GATEWAY_URL=http://127.0.0.1:8080 buaalogin status
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Self
+from urllib.parse import parse_qs, urlparse
+
+try:
+    from buaalogin_cli import srun
+except ImportError:  # 单独运行时 src 可能不在 sys.path 中
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+    from buaalogin_cli import srun
+
+AC_ID = "1"
+CLIENT_IP = "10.0.0.2"
+WRONG_PASSWORD_MSG = "E2901: (Third party 1)bind_user_info error! 用户名或密码错误"
+
+# 登录页：与真实网关相同的元素 id，页面脚本以明文参数调用 srun_portal
+# （真实网关在前端完成加密，替身只需区分成功与失败）
+PORTAL_HTML = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>北京航空航天大学校园网</title>
+<style>body { font-family: sans-serif; } .hidden { display: none; }</style>
+</head>
+<body>
+<form id="login-form" onsubmit="return false;">
+  <input id="username" name="username" type="text" placeholder="学号">
+  <input id="password" name="password" type="password" placeholder="密码">
+  <button id="login-account" type="button">登录</button>
+  <div id="message" class="hidden"></div>
+</form>
+<script>
+document.getElementById("login-account").addEventListener("click", async () => {
+  const params = new URLSearchParams({
+    action: "login",
+    username: document.getElementById("username").value,
+    password: document.getElementById("password").value,
+    ac_id: "__AC_ID__",
+    callback: "jQuery_portal",
+  });
+  const text = await (await fetch("/cgi-bin/srun_portal?" + params)).text();
+  const data = JSON.parse(text.slice(text.indexOf("(") + 1, text.lastIndexOf(")")));
+  if (data.error === "ok") {
+    location.href = "/srun_portal_success?ac_id=__AC_ID__";
+  } else {
+    const message = document.getElementById("message");
+    message.textContent = data.error_msg || data.error;
+    message.className = "";
+  }
+});
+</script>
+</body>
+</html>
+""".replace("__AC_ID__", AC_ID)
+
+SUCCESS_HTML = "<!DOCTYPE html><html><body><h1>登录成功</h1></body></html>"
+
+
+class MockGatewayHandler(BaseHTTPRequestHandler):
+    """请求处理：按路径分发，统一处理延迟与断连。"""
+
+    server: MockGateway
+    protocol_version = "HTTP/1.1"
+    # 响应头与正文分两次写出，开启 Nagle 时会与客户端延迟确认叠加出约 40ms 延迟
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        gw = self.server
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with gw.lock:
+            gw.requests.append(url.path)
+
+        if gw.should_drop():
+            self._drop()
+            return
+        if gw.latency > 0:
+            time.sleep(gw.latency)
+
+        if url.path == "/":
+            self.send_response(302)
+            self.send_header("Location", f"/srun_portal_pc?ac_id={AC_ID}&theme=buaa")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif url.path == "/srun_portal_pc":
+            self._reply(PORTAL_HTML, "text/html")
+        elif url.path == "/srun_portal_success":
+            self._reply(SUCCESS_HTML, "text/html")
+        elif url.path == "/cgi-bin/get_challenge":
+            self._jsonp(
+                query,
+                {"challenge": gw.token, "client_ip": CLIENT_IP, "error": "ok"},
+            )
+        elif url.path == "/cgi-bin/srun_portal":
+            self._jsonp(query, gw.handle_login(query))
+        elif url.path == "/cgi-bin/rad_user_info":
+            self._reply(gw.rad_user_info())
+        else:
+            self.send_error(404)
+
+    def _drop(self) -> None:
+        """不回复直接断开连接（RST），模拟网络中断。"""
+        self.close_connection = True
+        try:
+            self.connection.setsockopt(
+                socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+            )
+        except OSError:
+            pass
+
+    def _jsonp(self, query: dict[str, str], data: dict) -> None:
+        callback = query.get("callback", "callback")
+        self._reply(
+            f"{callback}({json.dumps(data, ensure_ascii=False)})",
+            "application/javascript",
+        )
+
+    def _reply(self, body: str, content_type: str = "text/plain") -> None:
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MockGateway(ThreadingHTTPServer):
+    """本地网关替身，只接受构造时给定的账号密码。
+
+    Args:
+        username: 接受的账号。
+        password: 接受的密码。
+        host: 监听地址。
+        port: 监听端口，0 表示随机分配。
+        latency: 每个请求的响应延迟（秒）。
+        drop_rate: 随机断连的概率（0~1）。
+        seed: 随机断连使用的种子。
+
+    Attributes:
+        logged_in: 当前是否在线，可直接修改以模拟掉线。
+        requests: 按顺序记录的请求路径。
+        connections: 已建立的 TCP 连接数。
+        login_count: 收到的登录请求数。
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        drop_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        super().__init__((host, port), MockGatewayHandler)
+        self.username = username
+        self.password = password
+        self.token = "challenge-token"
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.logged_in = False
+        self.login_time = 0
+        self.requests: list[str] = []
+        self.connections = 0
+        self.login_count = 0
+        self.lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._drops_left = 0
+        self._outcomes: deque[str | None] = deque()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # region 场景控制
+
+    def script_login(self, *outcomes: str | None) -> None:
+        """按顺序预设后续登录请求的结果。
+
+        每个结果为 ``"ok"``（无论凭据均成功）、错误信息字符串（失败），
+        或 None（按凭据正常校验）。预设用完后恢复正常校验。
+        """
+        with self.lock:
+            self._outcomes.extend(outcomes)
+
+    def drop_next(self, count: int = 1) -> None:
+        """接下来的 ``count`` 个请求直接断连。"""
+        with self.lock:
+            self._drops_left += count
+
+    def logout(self) -> None:
+        """模拟被网关踢下线。"""
+        with self.lock:
+            self.logged_in = False
+
+    def should_drop(self) -> bool:
+        with self.lock:
+            if self._drops_left > 0:
+                self._drops_left -= 1
+                return True
+            return self.drop_rate > 0 and self._rng.random() < self.drop_rate
+
+    # endregion
+
+    def rad_user_info(self) -> str:
+        with self.lock:
+            if not self.logged_in:
+                return "not_online_error"
+            now = int(time.time())
+            used = (now - self.login_time) * 1024
+            return (
+                f"{self.username},{self.login_time},{now},{used},0,,,0,0,0,0,0,"
+                f"{CLIENT_IP},0,0,0,0"
+            )
+
+    def handle_login(self, query: dict[str, str]) -> dict:
+        with self.lock:
+            self.login_count += 1
+            outcome = self._outcomes.popleft() if self._outcomes else None
+
+        if outcome is None:
+            accepted = self._check_credentials(query)
+        elif outcome == "ok":
+            accepted = True
+        else:
+            return {"error": "login_error", "error_msg": outcome}
+
+        if not accepted:
+            return {"error": "login_error", "error_msg": WRONG_PASSWORD_MSG}
+        with self.lock:
+            self.logged_in = True
+            self.login_time = int(time.time())
+        return {"error": "ok", "res": "ok", "suc_msg": "login_ok"}
+
+    def _check_credentials(self, query: dict[str, str]) -> bool:
+        if query.get("username") != self.username:
+            return False
+        password = query.get("password", "")
+        if not password.startswith("{MD5}"):
+            # 登录页脚本提交的明文参数
+            return password == self.password
+
+        # HTTP 引擎按深澜协议提交的加密参数
+        token = self.token
+        ip = query.get("ip", "")
+        ac_id = query.get("ac_id", "")
+        hmd5 = srun.hmac_md5(token, self.password)
+        info = srun.encode_info(self.username, self.password, ip, ac_id, token)
+        expected = srun.checksum(token, self.username, hmd5, ac_id, ip, info)
+        return (
+            password == "{MD5}" + hmd5
+            and query.get("info") == info
+            and query.get("chksum") == expected
+        )
+
+    def start(self) -> Self:
+        """在后台线程中开始服务。"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止服务并释放端口。"""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地深澜网关替身")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--user", default="test_user")
+    parser.add_argument("--password", default="test_password")
+    parser.add_argument("--latency", type=float, default=0.0, help="响应延迟（秒）")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="随机断连概率")
+    args = parser.parse_args()
+
+    gateway = MockGateway(
+        args.user,
+        args.password,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        drop_rate=args.drop_rate,
+    )
+    print(f"网关替身已启动: {gateway.url}（Ctrl+C 退出）")  # noqa: T201
+    try:
+        gateway.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gateway.server_close()
+
+
+if __name__ == "__main__":
+    main()
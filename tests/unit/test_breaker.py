@@ -0,0 +1,159 @@
+"""breaker 模块单元测试"""
+
+import os
+
+import pytest
+
+from buaalogin_cli.breaker import (
+    BreakerState,
+    CircuitBreaker,
+    FailureKind,
+    classify,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"username": "user", "password": "old"}')
+    return path
+
+
+@pytest.fixture
+def breaker(clock, config_path):
+    return CircuitBreaker(30, 120, config_path=config_path, clock=clock)
+
+
+@pytest.mark.parametrize(
+    ("error", "kind"),
+    [
+        ("E2553: Password is error.", FailureKind.CREDENTIAL),
+        ("E2531: User not found.", FailureKind.CREDENTIAL),
+        ("E2901: (Third party 1)bind_user2: ldap_bind error", FailureKind.CREDENTIAL),
+        ("密码错误", FailureKind.CREDENTIAL),
+        ("网关请求失败：timed out", FailureKind.TRANSIENT),
+        ("页面加载超时：goto", FailureKind.TRANSIENT),
+        ("E2620: You are already online.", FailureKind.TRANSIENT),
+    ],
+)
+def test_classify(error, kind):
+    """测试按错误信息区分凭据错误与暂时性错误"""
+    assert classify(error) == kind
+
+
+class TestBackoff:
+    """测试暂时性错误的指数退避"""
+
+    def test_delay_doubles_up_to_limit(self, breaker, clock):
+        """测试退避时间逐次翻倍，不超过上限"""
+        delays = []
+        for _ in range(4):
+            breaker.record_failure("网关请求失败")
+            delays.append(breaker.retry_in())
+            clock.now += breaker.retry_in()
+
+        assert delays == [30, 60, 120, 120]
+
+    def test_allows_after_backoff(self, breaker, clock):
+        """测试退避结束前不允许自动登录，结束后允许"""
+        breaker.record_failure("网关请求失败")
+        assert breaker.state == BreakerState.BACKOFF
+        assert not breaker.allow()
+
+        clock.now = 30
+        assert breaker.allow()
+
+    def test_success_resets(self, breaker):
+        """测试登录成功后复位"""
+        breaker.record_failure("网关请求失败")
+        breaker.record_success()
+
+        assert breaker.state == BreakerState.CLOSED
+        assert breaker.failures == 0
+        assert breaker.allow()
+
+    def test_status_reports_retry_time(self, breaker):
+        """测试状态快照包含退避结束时间"""
+        breaker.record_failure("网关请求失败")
+
+        status = breaker.status()
+
+        assert status.state == BreakerState.BACKOFF
+        assert status.failures == 1
+        assert status.retry_at is not None
+        assert status.error == "网关请求失败"
+
+
+class TestOpen:
+    """测试凭据错误时的熔断"""
+
+    def test_stays_open_until_config_changes(self, breaker, clock, config_path):
+        """测试熔断打开后不随时间恢复，配置文件变化时报告一次"""
+        breaker.record_failure("E2553: Password is error.")
+        clock.now = 10**6
+
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow()
+        assert not breaker.config_changed()
+
+        config_path.write_text('{"username": "user", "password": "new!"}')
+        assert breaker.config_changed()
+        assert not breaker.config_changed()
+
+    def test_detects_same_size_rewrite(self, breaker, config_path):
+        """测试大小不变的改写也能通过修改时间识别"""
+        breaker.record_failure("E2553: Password is error.")
+        st = config_path.stat()
+        config_path.write_text('{"username": "user", "password": "new"}')
+        os.utime(config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert breaker.config_changed()
+
+    def test_transient_failure_keeps_open(self, breaker):
+        """测试熔断期间的暂时性失败（如手动登录）不会解除熔断"""
+        breaker.record_failure("E2553: Password is error.")
+        breaker.record_failure("网关请求失败")
+
+        assert breaker.state == BreakerState.OPEN
+
+
+class TestRestore:
+    """测试从保存的状态恢复"""
+
+    def test_backoff_resumes_remaining_wait(self, breaker, clock, config_path):
+        """测试退避状态按剩余时间恢复"""
+        breaker.record_failure("网关请求失败")
+        breaker.record_failure("网关请求失败")
+
+        resumed = CircuitBreaker(30, 120, config_path=config_path, clock=clock)
+        resumed.restore(breaker.status())
+
+        assert resumed.state == BreakerState.BACKOFF
+        assert resumed.failures == 2
+        assert 59 <= resumed.retry_in() <= 60
+        assert not resumed.allow()
+
+    def test_open_detects_change_made_while_stopped(self, breaker, clock, config_path):
+        """测试停止期间修改的配置文件在恢复后被识别"""
+        breaker.record_failure("E2553: Password is error.")
+        status, stamp = breaker.status(), breaker.config_stamp
+        config_path.write_text('{"username": "user", "password": "new!"}')
+
+        resumed = CircuitBreaker(config_path=config_path, clock=clock)
+        resumed.restore(status, stamp)
+
+        assert not resumed.allow()
+        assert resumed.config_changed()
@@ -1,14 +1,29 @@
 """cli 模块单元测试"""
 
+import time
 from unittest.mock import Mock
 
+import pytest
+from msgspec import json as msgjson
 from typer.testing import CliRunner
 
-from buaalogin_cli import cli
+from buaalogin_cli import cli, locking
+from buaalogin_cli.breaker import BreakerState, BreakerStatus
+from buaalogin_cli.constants import LoginEngine, PollPolicy, ResourceProfile
+from buaalogin_cli.control import Command, LoginRecord, ProbeRecord, Response
+from buaalogin_cli.status import NetworkStatus, StatusInfo
 
 runner = CliRunner()
 
 
+@pytest.fixture(autouse=True)
+def no_daemon(monkeypatch):
+    """默认没有运行中的保活进程，避免连接到本机真实的控制套接字。"""
+    request = Mock(return_value=None)
+    monkeypatch.setattr("buaalogin_cli.control.request", request)
+    return request
+
+
 class TestRunCommand:
     """测试 run 命令"""
 
@@ -21,8 +36,8 @@ class TestRunCommand:
             "password": "test_pass",
         }
 
-        monkeypatch.setattr(cli.service, "keep_alive", keep_alive)
-        monkeypatch.setattr(cli, "config", mock_config)
+        monkeypatch.setattr("buaalogin_cli.service.keep_alive", keep_alive)
+        monkeypatch.setattr(cli, "get_config", lambda: mock_config)
 
         result = runner.invoke(cli.app, ["run"])
 
@@ -32,4 +47,303 @@ class TestRunCommand:
             "test_pass",
             60,
             headless=True,
+            engine=LoginEngine.BROWSER,
+            warm_browser=False,
+            browser_idle_sec=600,
+            resource_filter=ResourceProfile.DEFAULT,
+            login_timeout_sec=15,
+            poll_policy=PollPolicy.FIXED,
+            max_interval_sec=600,
+            watch_network=False,
+            control_socket=True,
+            isolate_login=False,
+            login_deadline_sec=90,
+            login_memory_limit_mb=0,
+            metrics_listen=None,
+            overrides=frozenset(),
         )
+
+    def test_run_uses_engine_from_config(self, monkeypatch):
+        """测试 run 从配置文件读取登录引擎"""
+        keep_alive = Mock()
+        mock_config = Mock()
+        mock_config.to_dict.return_value = {
+            "username": "test_user",
+            "password": "test_pass",
+            "engine": LoginEngine.HTTP,
+        }
+
+        monkeypatch.setattr("buaalogin_cli.service.keep_alive", keep_alive)
+        monkeypatch.setattr(cli, "get_config", lambda: mock_config)
+
+        result = runner.invoke(cli.app, ["run"])
+
+        assert result.exit_code == 0
+        assert keep_alive.call_args.kwargs["engine"] == LoginEngine.HTTP
+
+    def test_run_isolate_login_from_config(self, monkeypatch):
+        """测试 run 从配置文件读取隔离登录设置"""
+        keep_alive = Mock()
+        mock_config = Mock()
+        mock_config.to_dict.return_value = {
+            "username": "test_user",
+            "password": "test_pass",
+            "isolate_login": True,
+            "login_deadline": 45.0,
+            "login_memory_limit": 4096,
+        }
+
+        monkeypatch.setattr("buaalogin_cli.service.keep_alive", keep_alive)
+        monkeypatch.setattr(cli, "get_config", lambda: mock_config)
+
+        result = runner.invoke(cli.app, ["run"])
+
+        assert result.exit_code == 0
+        kwargs = keep_alive.call_args.kwargs
+        assert kwargs["isolate_login"] is True
+        assert kwargs["login_deadline_sec"] == 45.0
+        assert kwargs["login_memory_limit_mb"] == 4096
+
+    def test_run_reports_cli_and_env_overrides(self, monkeypatch):
+        """测试命令行参数与环境变量指定的配置项作为热更新时不覆盖的项传入"""
+        keep_alive = Mock()
+        mock_config = Mock()
+        mock_config.to_dict.return_value = {
+            "username": "test_user",
+            "password": "test_pass",
+            "interval": 120,
+        }
+        monkeypatch.setattr("buaalogin_cli.service.keep_alive", keep_alive)
+        monkeypatch.setattr(cli, "get_config", lambda: mock_config)
+        monkeypatch.setenv("BUAA_USERNAME", "env_user")
+
+        result = runner.invoke(cli.app, ["run", "-p", "cli_pass"])
+
+        assert result.exit_code == 0
+        assert keep_alive.call_args.args == ("env_user", "cli_pass", 120)
+        assert keep_alive.call_args.kwargs["overrides"] == {"username", "password"}
+
+    def test_run_json_log_from_config(self, monkeypatch):
+        """测试 run 按配置文件启用 JSON Lines 日志"""
+        setup_file = Mock()
+        mock_config = Mock()
+        mock_config.to_dict.return_value = {
+            "username": "test_user",
+            "password": "test_pass",
+            "json_log": True,
+        }
+
+        monkeypatch.setattr("buaalogin_cli.service.keep_alive", Mock())
+        monkeypatch.setattr("buaalogin_cli.log.setup_file", setup_file)
+        monkeypatch.setattr(cli, "get_config", lambda: mock_config)
+
+        result = runner.invoke(cli.app, ["run"])
+
+        assert result.exit_code == 0
+        setup_file.assert_called_once_with(json_lines=True)
+
+    @pytest.mark.skipif(not locking.is_supported(), reason="需要 fcntl")
+    def test_run_refuses_duplicate_daemon(self, monkeypatch):
+        """测试已有保活进程持有单实例锁时拒绝启动"""
+        keep_alive = Mock()
+        monkeypatch.setattr("buaalogin_cli.service.keep_alive", keep_alive)
+        holder = locking.FileLock(locking.DAEMON_LOCK)
+        holder.acquire()
+
+        try:
+            result = runner.invoke(cli.app, ["run", "-u", "user", "-p", "pw"])
+        finally:
+            holder.release()
+
+        assert result.exit_code == 1
+        assert "已有保活进程在运行" in result.stdout
+        keep_alive.assert_not_called()
+
+
+class TestStatusCommand:
+    """测试 status 命令"""
+
+    def test_status_json_outputs_probe_result(self, monkeypatch):
+        """测试 --json 输出探测结果并按状态设置退出码"""
+        info = StatusInfo(
+            NetworkStatus.LOGGED_IN,
+            user="test_user",
+            login_time=100,
+            online_seconds=60,
+            bytes_used=2048,
+            client_ip="10.0.0.2",
+        )
+        monkeypatch.setattr("buaalogin_cli.status.get_status", lambda: info)
+
+        result = runner.invoke(cli.app, ["status", "--json"])
+
+        assert result.exit_code == 0
+        assert msgjson.decode(result.stdout) == {
+            "status": "logged_in",
+            "user": "test_user",
+            "login_time": 100,
+            "online_seconds": 60,
+            "bytes_used": 2048,
+            "client_ip": "10.0.0.2",
+        }
+
+    def test_status_logged_out_exit_code(self, monkeypatch):
+        """测试未登录时退出码为 1"""
+        monkeypatch.setattr(
+            "buaalogin_cli.status.get_status",
+            lambda: StatusInfo(NetworkStatus.LOGGED_OUT),
+        )
+
+        result = runner.invoke(cli.app, ["status"])
+
+        assert result.exit_code == 1
+        assert "未登录" in result.stdout
+
+    def test_status_uses_daemon_probe(self, monkeypatch, no_daemon):
+        """测试有保活进程时直接返回其最近一次探测结果，不再访问网关"""
+        info = StatusInfo(NetworkStatus.LOGGED_IN, user="test_user")
+        no_daemon.return_value = Response(
+            pid=42, started_at=0, probe=ProbeRecord(info, time.time() - 5)
+        )
+        get_status = Mock()
+        monkeypatch.setattr("buaalogin_cli.status.get_status", get_status)
+
+        result = runner.invoke(cli.app, ["status"])
+
+        assert result.exit_code == 0
+        assert "PID 42" in result.stdout
+        no_daemon.assert_called_once_with(Command.LAST_PROBE)
+        get_status.assert_not_called()
+
+    def test_status_shows_open_breaker(self, monkeypatch, no_daemon):
+        """测试保活进程的熔断器打开时提示修改配置"""
+        info = StatusInfo(NetworkStatus.LOGGED_OUT)
+        no_daemon.return_value = Response(
+            pid=42,
+            started_at=0,
+            probe=ProbeRecord(info, time.time()),
+            breaker=BreakerStatus(
+                BreakerState.OPEN, 1, error="E2553: Password is error."
+            ),
+        )
+
+        result = runner.invoke(cli.app, ["status"])
+
+        assert result.exit_code == 1
+        assert "自动登录已暂停" in result.stdout
+        assert "E2553" in result.stdout
+
+    def test_status_direct_skips_daemon(self, monkeypatch, no_daemon):
+        """测试 --direct 不询问保活进程"""
+        monkeypatch.setattr(
+            "buaalogin_cli.status.get_status",
+            lambda: StatusInfo(NetworkStatus.LOGGED_IN),
+        )
+
+        result = runner.invoke(cli.app, ["status", "--direct"])
+
+        assert result.exit_code == 0
+        no_daemon.assert_not_called()
+
+
+class TestStatsCommand:
+    """测试 stats 命令"""
+
+    def test_stats_without_records(self):
+        """测试没有账本记录时提示暂无记录"""
+        result = runner.invoke(cli.app, ["stats"])
+
+        assert result.exit_code == 0
+        assert "暂无保活记录" in result.stdout
+
+    def test_stats_does_not_take_daemon_lock(self):
+        """测试只读检查保活进程，不获取锁、不写入自己的 PID"""
+        result = runner.invoke(cli.app, ["stats"])
+
+        assert result.exit_code == 0
+        assert not locking.DAEMON_LOCK.exists()
+
+    def test_stats_reports_uptime(self, tmp_path):
+        """测试输出在线率与掉线统计"""
+        from buaalogin_cli.ledger import Entry
+
+        now = time.time()
+        entries = [
+            Entry(now - 1000, None, NetworkStatus.LOGGED_IN),
+            Entry(now - 500, NetworkStatus.LOGGED_IN, NetworkStatus.LOGGED_OUT),
+            Entry(now - 490, NetworkStatus.LOGGED_OUT, NetworkStatus.LOGGED_IN, 2.0),
+            Entry(now - 100, NetworkStatus.LOGGED_IN, None),
+        ]
+        (tmp_path / "uptime.ledger").write_bytes(
+            b"".join(msgjson.encode(e) + b"\n" for e in entries)
+        )
+
+        result = runner.invoke(cli.app, ["stats", "--json"])
+
+        assert result.exit_code == 0
+        report = msgjson.decode(result.stdout)
+        assert report["outages"] == 1
+        assert report["up_sec"] == pytest.approx(890, abs=1)
+        assert report["mttr_sec"] == pytest.approx(10)
+
+        result = runner.invoke(cli.app, ["stats", "-d", "1"])
+        assert "掉线次数: 1" in result.stdout
+
+
+class TestLoginCommand:
+    """测试 login 命令"""
+
+    def test_login_delegates_to_daemon(self, monkeypatch, no_daemon):
+        """测试有保活进程时由其完成登录，无需本地凭据"""
+        no_daemon.return_value = Response(
+            pid=42, started_at=0, login=LoginRecord(time.time())
+        )
+        login = Mock()
+        monkeypatch.setattr("buaalogin_cli.service.login", login)
+
+        result = runner.invoke(cli.app, ["login"])
+
+        assert result.exit_code == 0
+        assert "保活进程" in result.stdout
+        assert no_daemon.call_args.args == (Command.RELOGIN,)
+        login.assert_not_called()
+
+    def test_login_reports_daemon_failure(self, no_daemon):
+        """测试保活进程登录失败时返回非零退出码"""
+        no_daemon.return_value = Response(
+            pid=42, started_at=0, login=LoginRecord(time.time(), "密码错误")
+        )
+
+        result = runner.invoke(cli.app, ["login"])
+
+        assert result.exit_code == 1
+        assert "密码错误" in result.stdout
+
+    def test_login_with_explicit_options_skips_daemon(self, monkeypatch, no_daemon):
+        """测试命令行指定了账号或登录选项时不交给保活进程，按这些参数登录"""
+        no_daemon.return_value = Response(
+            pid=42, started_at=0, login=LoginRecord(time.time())
+        )
+        login = Mock()
+        monkeypatch.setattr("buaalogin_cli.service.login", login)
+
+        result = runner.invoke(
+            cli.app,
+            ["login", "-u", "X", "-p", "Y", "--engine", "http"],
+        )
+
+        assert result.exit_code == 0
+        assert "直接在本进程登录" in result.stdout
+        no_daemon.assert_not_called()
+        assert login.call_args.args == ("X", "Y")
+        assert login.call_args.kwargs["engine"] == LoginEngine.HTTP
+
+    def test_login_falls_back_without_daemon(self, monkeypatch):
+        """测试没有保活进程时在本进程登录"""
+        login = Mock()
+        monkeypatch.setattr("buaalogin_cli.service.login", login)
+
+        result = runner.invoke(cli.app, ["login", "-u", "test_user", "-p", "pw"])
+
+        assert result.exit_code == 0
+        assert login.call_args.args == ("test_user", "pw")
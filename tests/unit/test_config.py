@@ -3,7 +3,7 @@
 import pytest
 from msgspec import UNSET, DecodeError
 
-from buaalogin_cli.config import Config
+from buaalogin_cli.config import Config, ConfigWatcher
 
 
 class TestConfigStruct:
@@ -127,3 +127,46 @@ class TestConfigSaveToJson:
         content = config_file.read_text()
         assert "only" in content
         assert "password" not in content
+
+
+class TestConfigWatcher:
+    """测试配置文件热更新"""
+
+    def test_default_path_resolved_at_call_time(self, isolated_config):
+        """测试未指定路径时监视调用时的 CONFIG_FILE"""
+        isolated_config.write_text('{"interval": 90}')
+
+        assert ConfigWatcher().config.interval == 90
+
+    def test_unchanged_file_returns_none(self, tmp_path):
+        path = tmp_path / "config.json"
+        path.write_text('{"interval": 60}')
+        watcher = ConfigWatcher(path)
+
+        assert watcher.config.interval == 60
+        assert watcher.poll() is None
+
+    def test_reports_changed_fields(self, tmp_path):
+        """测试只报告取值变化的字段，并整体替换配置"""
+        path = tmp_path / "config.json"
+        path.write_text('{"username": "user", "password": "old", "interval": 60}')
+        watcher = ConfigWatcher(path)
+
+        path.write_text('{"username": "user", "password": "new!", "interval": 60}')
+
+        assert watcher.poll() == {"password": "new!"}
+        assert watcher.config.password == "new!"
+        assert watcher.poll() is None
+
+    def test_created_and_invalid_file(self, tmp_path):
+        """测试配置文件新建后被读取，格式错误时抛出异常、修正后恢复"""
+        path = tmp_path / "config.json"
+        watcher = ConfigWatcher(path)
+        assert watcher.config == Config()
+
+        path.write_text("{not json")
+        with pytest.raises(DecodeError):
+            watcher.poll()
+
+        path.write_text('{"interval": 30}')
+        assert watcher.poll() == {"interval": 30}
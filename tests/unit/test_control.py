@@ -0,0 +1,138 @@
+"""control 模块单元测试"""
+
+import socket
+import threading
+
+import pytest
+
+from buaalogin_cli.control import (
+    Command,
+    ControlServer,
+    DaemonState,
+    Wakeup,
+    request,
+)
+from buaalogin_cli.status import NetworkStatus, StatusInfo
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="需要 Unix 域套接字"
+)
+
+
+@pytest.fixture
+def server(tmp_path):
+    """在临时目录下启动的控制服务。"""
+    state = DaemonState()
+    wakeup = Wakeup()
+    srv = ControlServer(state, wakeup, path=tmp_path / "ctl.sock")
+    srv.start()
+    yield srv
+    srv.close()
+    wakeup.close()
+
+
+def _fake_loop(srv: ControlServer, stop: threading.Event):
+    """模拟保活循环：被唤醒后记录一次探测，必要时记录登录。"""
+    while not stop.is_set():
+        if srv.wakeup.wait(0.05):
+            srv.state.record_probe(StatusInfo(NetworkStatus.LOGGED_IN))
+            if srv.state.take_relogin_request():
+                srv.state.record_login(None)
+
+
+class TestControlServer:
+    """测试控制套接字的请求应答"""
+
+    def test_no_daemon_returns_none(self, tmp_path):
+        """测试没有保活进程时返回 None"""
+        assert request(Command.STATUS, path=tmp_path / "missing.sock") is None
+
+    def test_last_probe(self, server):
+        """测试读取最近一次探测结果"""
+        info = StatusInfo(NetworkStatus.LOGGED_IN, user="test_user")
+        server.state.record_probe(info)
+
+        response = request(Command.LAST_PROBE, path=server.path)
+
+        assert response is not None
+        assert response.pid == server.state.pid
+        assert response.probe is not None
+        assert response.probe.info == info
+
+    def test_check_wakes_loop_and_waits_for_probe(self, server):
+        """测试 check 唤醒保活循环并返回新的探测结果"""
+        stop = threading.Event()
+        loop = threading.Thread(target=_fake_loop, args=(server, stop))
+        loop.start()
+        try:
+            response = request(Command.CHECK, timeout=5, path=server.path)
+        finally:
+            stop.set()
+            loop.join()
+
+        assert response is not None
+        assert response.error is None
+        assert response.probe is not None
+        assert server.state.probe_count == 1
+
+    def test_relogin_returns_login_result(self, server):
+        """测试 relogin 由保活循环执行登录并返回结果"""
+        stop = threading.Event()
+        loop = threading.Thread(target=_fake_loop, args=(server, stop))
+        loop.start()
+        try:
+            response = request(Command.RELOGIN, timeout=5, path=server.path)
+        finally:
+            stop.set()
+            loop.join()
+
+        assert response is not None
+        assert response.login is not None
+        assert response.login.ok
+
+    def test_check_timeout_reports_error(self, server):
+        """测试保活循环未响应时返回超时错误"""
+        response = request(Command.CHECK, timeout=0.1, path=server.path)
+
+        assert response is not None
+        assert response.error == "等待检查结果超时"
+
+    def test_refuses_second_server(self, server):
+        """测试同一路径已有保活进程时拒绝启动"""
+        second = ControlServer(DaemonState(), Wakeup(), path=server.path)
+        with pytest.raises(OSError, match="已有保活进程"):
+            second.start()
+
+    def test_replaces_stale_socket_file(self, tmp_path):
+        """测试清理上次异常退出遗留的套接字文件"""
+        path = tmp_path / "ctl.sock"
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(path))
+        stale.close()
+
+        srv = ControlServer(DaemonState(), Wakeup(), path=path)
+        srv.start()
+        try:
+            assert request(Command.STATUS, path=path) is not None
+        finally:
+            srv.close()
+        assert not path.exists()
+
+
+class TestWakeup:
+    """测试唤醒信号"""
+
+    def test_wait_times_out(self):
+        """测试未触发时等待到超时"""
+        wakeup = Wakeup()
+        assert wakeup.wait(0.01) is False
+        wakeup.close()
+
+    def test_set_wakes_and_clears(self):
+        """测试触发后立即返回，且只唤醒一次"""
+        wakeup = Wakeup()
+        wakeup.set()
+        wakeup.set()
+        assert wakeup.wait(5) is True
+        assert wakeup.wait(0.01) is False
+        wakeup.close()
@@ -0,0 +1,109 @@
+"""exporter 模块单元测试"""
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from buaalogin_cli import exporter
+from buaalogin_cli.breaker import FailureKind
+from buaalogin_cli.exporter import Histogram, Metrics, MetricsServer
+from buaalogin_cli.status import NetworkStatus
+
+
+def _samples(text: str) -> dict[str, str]:
+    """解析指标文本为 {样本名及标签: 值}。"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = value
+    return samples
+
+
+class TestMetrics:
+    """测试指标更新与文本格式"""
+
+    def test_counters_and_status_gauge(self):
+        """测试计数器按标签累加，当前状态为 1，其余为 0"""
+        metrics = Metrics()
+        metrics.observe_probe(NetworkStatus.LOGGED_OUT, 0.02)
+        metrics.observe_login(1.5, FailureKind.TRANSIENT)
+        metrics.observe_login(2.0)
+        metrics.observe_probe(NetworkStatus.LOGGED_IN, 0.03)
+
+        samples = _samples(metrics.render().decode())
+
+        assert samples['buaalogin_probes_total{status="logged_in"}'] == "1"
+        assert samples['buaalogin_probes_total{status="logged_out"}'] == "1"
+        assert samples['buaalogin_probes_total{status="unknown_network"}'] == "0"
+        assert samples['buaalogin_logins_total{result="success"}'] == "1"
+        assert samples['buaalogin_logins_total{result="failure"}'] == "1"
+        assert samples['buaalogin_login_failures_total{reason="transient"}'] == "1"
+        assert samples['buaalogin_login_failures_total{reason="credential"}'] == "0"
+        assert samples['buaalogin_network_status{status="logged_in"}'] == "1"
+        assert samples['buaalogin_network_status{status="logged_out"}'] == "0"
+        assert samples["buaalogin_login_duration_seconds_count"] == "2"
+
+    def test_ends_with_eof(self):
+        """测试文本以 # EOF 结尾"""
+        assert Metrics().render().endswith(b"# EOF\n")
+
+    def test_histogram_buckets_are_cumulative(self):
+        """测试直方图桶计数累计，+Inf 等于总数"""
+        histogram = Histogram("test_seconds", "测试", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        samples = _samples("\n".join(histogram.render()))
+
+        assert samples['buaalogin_test_seconds_bucket{le="0.1"}'] == "2"
+        assert samples['buaalogin_test_seconds_bucket{le="1.0"}'] == "3"
+        assert samples['buaalogin_test_seconds_bucket{le="+Inf"}'] == "4"
+        assert samples["buaalogin_test_seconds_count"] == "4"
+        assert float(samples["buaalogin_test_seconds_sum"]) == pytest.approx(5.65)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("9464", ("127.0.0.1", 9464)),
+        ("0.0.0.0:9464", ("0.0.0.0", 9464)),
+        ("[::]:9464", ("::", 9464)),
+        (":9464", ("127.0.0.1", 9464)),
+    ],
+)
+def test_parse_listen(value, expected):
+    """测试解析监听地址"""
+    assert exporter.parse_listen(value) == expected
+
+
+@pytest.mark.parametrize("value", ["abc", "localhost:", "70000"])
+def test_parse_listen_rejects_invalid(value):
+    """测试拒绝无效的监听地址"""
+    with pytest.raises(ValueError):  # noqa: PT011
+        exporter.parse_listen(value)
+
+
+class TestMetricsServer:
+    """测试指标端点"""
+
+    def test_serves_metrics(self):
+        """测试 GET /metrics 返回 OpenMetrics 文本，其他路径返回 404"""
+        metrics = Metrics()
+        metrics.observe_probe(NetworkStatus.LOGGED_IN, 0.01)
+        server = MetricsServer(metrics)
+        server.start()
+        try:
+            url = f"http://127.0.0.1:{server.port}"
+            with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+            with pytest.raises(urllib.error.HTTPError) as exc_info:
+                urllib.request.urlopen(f"{url}/other", timeout=5)
+        finally:
+            server.close()
+
+        assert content_type.startswith("application/openmetrics-text")
+        assert 'buaalogin_network_status{status="logged_in"} 1' in body
+        assert exc_info.value.code == 404
@@ -0,0 +1,71 @@
+"""gateway 模块单元测试"""
+
+import pytest
+
+from buaalogin_cli import gateway
+
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    """每个测试前后清空共享会话。"""
+    gateway.reset_session()
+    yield
+    gateway.reset_session()
+
+
+class TestCreateSession:
+    """测试网关会话配置"""
+
+    def test_ignores_environment_proxies(self, monkeypatch):
+        """测试不读取 HTTP(S)_PROXY 等环境变量"""
+        monkeypatch.setenv("HTTPS_PROXY", "http://127.0.0.1:1")
+        session = gateway.create_session()
+
+        assert session.trust_env is False
+        settings = session.merge_environment_settings(
+            "https://gw.buaa.edu.cn", {}, None, None, None
+        )
+        assert not settings["proxies"]
+
+    def test_pool_settings(self):
+        """测试连接池大小和禁用自动重试"""
+        session = gateway.create_session()
+        adapter = session.get_adapter("https://gw.buaa.edu.cn")
+
+        assert adapter._pool_connections == 1
+        assert adapter._pool_maxsize == 2
+        assert adapter.max_retries.total == 0
+
+    def test_default_headers(self):
+        """测试默认携带 User-Agent"""
+        session = gateway.create_session()
+        assert session.headers["User-Agent"] == "Mozilla/5.0"
+
+
+class TestSharedSession:
+    """测试共享会话的复用与重置"""
+
+    def test_get_session_is_reused(self):
+        """测试多次获取返回同一会话"""
+        assert gateway.get_session() is gateway.get_session()
+
+    def test_reset_session_drops_pool(self):
+        """测试重置后创建新会话"""
+        first = gateway.get_session()
+        gateway.reset_session()
+        assert gateway.get_session() is not first
+
+    def test_reset_without_session(self):
+        """测试未创建会话时重置不报错"""
+        gateway.reset_session()
+        gateway.reset_session()
+
+    def test_keep_alive_reuses_connection(self, srun_gateway):
+        """测试连续请求复用同一条 TCP 连接"""
+        session = gateway.get_session()
+        url = f"{srun_gateway.url}/cgi-bin/rad_user_info"
+
+        session.get(url, timeout=5)
+        session.get(url, timeout=5)
+
+        assert srun_gateway.connections == 1
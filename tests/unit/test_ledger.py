@@ -0,0 +1,170 @@
+"""ledger 模块单元测试"""
+
+import msgspec
+import pytest
+
+from buaalogin_cli import ledger
+from buaalogin_cli.breaker import FailureKind
+from buaalogin_cli.ledger import DAY_SEC, Entry, Ledger
+from buaalogin_cli.status import NetworkStatus
+
+IN = NetworkStatus.LOGGED_IN
+OUT = NetworkStatus.LOGGED_OUT
+D0 = 20000 * DAY_SEC
+
+# 第 0 天掉线一次（100 秒，中途一次暂时性失败），第 1 天正常退出后重启，
+# 启动时未登录，60 秒后恢复，此后一直在线
+HISTORY = [
+    Entry(D0, None, IN),
+    Entry(D0 + 1000, IN, OUT),
+    Entry(D0 + 1010, OUT, OUT, 2.0, FailureKind.TRANSIENT),
+    Entry(D0 + 1100, OUT, IN, 1.5),
+    Entry(D0 + DAY_SEC + 500, IN, None),
+    Entry(D0 + DAY_SEC + 1000, None, OUT),
+    Entry(D0 + DAY_SEC + 1060, OUT, IN, 3.0),
+]
+NOW = D0 + 2 * DAY_SEC + 100
+
+
+def _write(path, entries) -> None:
+    with open(path, "ab") as f:
+        for entry in entries:
+            f.write(msgspec.json.encode(entry) + b"\n")
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return tmp_path / "uptime.ledger", tmp_path / "uptime.index"
+
+
+def _summarize(paths, days=None, *, now=NOW, running=True):
+    path, index_path = paths
+    return ledger.summarize(
+        days, running=running, now=now, path=path, index_path=index_path
+    )
+
+
+class TestLedger:
+    """测试账本写入"""
+
+    def test_records_only_changes_and_logins(self, tmp_path):
+        """测试状态不变时不写入，登录结果与退出总会写入"""
+        path = tmp_path / "uptime.ledger"
+        writer = Ledger(path)
+
+        writer.record(IN)
+        writer.record(IN)
+        writer.record(OUT)
+        writer.record(OUT, login_sec=1.0, error=FailureKind.CREDENTIAL)
+        writer.stop()
+
+        lines = path.read_bytes().splitlines()
+        entries = [msgspec.json.decode(line, type=Entry) for line in lines]
+        assert [(e.old, e.new) for e in entries] == [
+            (None, IN),
+            (IN, OUT),
+            (OUT, OUT),
+            (OUT, None),
+        ]
+        assert entries[2].error == FailureKind.CREDENTIAL
+
+    def test_default_path(self, tmp_path):
+        """测试默认写入 LEDGER_FILE"""
+        Ledger().record(IN)
+        assert (tmp_path / "uptime.ledger").exists()
+
+
+class TestSummarize:
+    """测试统计"""
+
+    def test_all_records(self, paths):
+        """测试全部记录的在线率、掉线次数、恢复时间与登录耗时"""
+        _write(paths[0], HISTORY)
+
+        report = _summarize(paths)
+
+        assert report.start is None
+        assert report.up_sec == pytest.approx(2 * DAY_SEC - 560)
+        assert report.down_sec == pytest.approx(160)
+        assert report.uptime == pytest.approx(report.up_sec / (2 * DAY_SEC - 400))
+        assert report.outages == 2
+        assert report.mttr_sec == pytest.approx(80)
+        assert report.relogins == 2
+        assert (report.relogin_p50, report.relogin_p99) == (1.5, 3.0)
+        assert report.failures == {FailureKind.TRANSIENT: 1}
+
+    def test_window(self, paths):
+        """测试只统计窗口内的部分"""
+        _write(paths[0], HISTORY)
+
+        report = _summarize(paths, 1)
+
+        assert report.start == NOW - DAY_SEC
+        assert report.up_sec == pytest.approx(400 + DAY_SEC - 960)
+        assert report.down_sec == pytest.approx(60)
+        assert report.outages == 1
+        assert report.relogin_p50 == 3.0
+        assert report.failures == {}
+
+    def test_stopped_daemon_tail_not_counted(self, paths):
+        """测试保活进程未运行时，最后一条记录之后的时间不计入"""
+        _write(paths[0], HISTORY[:5])
+
+        report = _summarize(paths, running=False)
+
+        assert report.up_sec == pytest.approx(DAY_SEC + 400)
+
+    def test_crash_gap_not_counted(self, paths):
+        """测试异常退出（没有退出记录）到下次启动之间的空档不计入"""
+        _write(paths[0], [Entry(D0, None, IN), Entry(D0 + 5000, None, IN)])
+
+        report = _summarize(paths, now=D0 + 6000, running=False)
+
+        assert report.up_sec == 0
+        assert report.outages == 0
+
+    def test_empty_ledger(self, paths):
+        """测试没有记录时没有在线率"""
+        report = _summarize(paths)
+
+        assert report.uptime is None
+        assert report.up_sec == 0
+
+
+class TestIndex:
+    """测试按日汇总的索引"""
+
+    def test_incremental_matches_full_scan(self, paths, tmp_path):
+        """测试分多次增量汇总与一次性汇总结果相同"""
+        _write(paths[0], HISTORY[:4])
+        _summarize(paths, now=D0 + DAY_SEC + 10)
+        _write(paths[0], HISTORY[4:])
+        incremental = _summarize(paths)
+
+        fresh = (paths[0], tmp_path / "fresh.index")
+        assert incremental == _summarize(fresh)
+
+    def test_completed_days_are_not_rescanned(self, paths):
+        """测试已汇总的日期不再读取账本"""
+        _write(paths[0], HISTORY)
+        expected = _summarize(paths, 1)
+
+        # 覆盖第 0 天的记录（长度不变），索引中的汇总不受影响
+        data = paths[0].read_bytes()
+        first_day_end = data.index(b"\n", data.index(b"1.5")) + 1
+        paths[0].write_bytes(b" " * (first_day_end - 1) + b"\n" + data[first_day_end:])
+
+        assert _summarize(paths, 1) == expected
+        assert _summarize(paths).outages == 2
+
+    def test_truncated_ledger_rebuilds_index(self, paths):
+        """测试账本被截断后重建索引"""
+        _write(paths[0], HISTORY)
+        _summarize(paths)
+        paths[0].write_bytes(b"")
+        _write(paths[0], [Entry(NOW - 100, None, IN)])
+
+        report = _summarize(paths)
+
+        assert report.up_sec == pytest.approx(100)
+        assert report.outages == 0
@@ -0,0 +1,183 @@
+"""locking 模块单元测试"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from buaalogin_cli import locking
+from buaalogin_cli.locking import FileLock
+from buaalogin_cli.service import LoginError, _single_flight
+from buaalogin_cli.status import NetworkStatus, StatusInfo
+
+SRC_DIR = Path(__file__).parents[2] / "src"
+pytestmark = pytest.mark.skipif(not locking.is_supported(), reason="需要 fcntl")
+
+
+class TestFileLock:
+    """测试文件锁"""
+
+    def test_exclusive_and_records_holder(self, tmp_path):
+        """测试锁互斥，并记录持有者 PID"""
+        path = tmp_path / "run" / "test.lock"
+        first, second = FileLock(path), FileLock(path)
+
+        assert first.acquire()
+        assert not second.acquire()
+        assert second.holder_pid() == os.getpid()
+
+        first.release()
+        assert second.acquire()
+        second.release()
+
+    def test_acquire_timeout(self, tmp_path):
+        """测试等待超时后返回 False"""
+        path = tmp_path / "test.lock"
+        holder = FileLock(path)
+        holder.acquire()
+
+        start = time.monotonic()
+        assert not FileLock(path).acquire(timeout=0.3)
+        assert time.monotonic() - start >= 0.3
+        holder.release()
+
+    def test_released_when_holder_process_dies(self, tmp_path, monkeypatch):
+        """测试持有锁的进程被杀死后锁自动释放"""
+        path = tmp_path / "test.lock"
+        code = textwrap.dedent(
+            f"""
+            import sys, time
+            from pathlib import Path
+            from buaalogin_cli.locking import FileLock
+            lock = FileLock(Path({str(path)!r}))
+            lock.acquire()
+            print("locked", flush=True)
+            time.sleep(60)
+            """
+        )
+        monkeypatch.setenv("PYTHONPATH", str(SRC_DIR))
+        proc = subprocess.Popen(
+            [sys.executable, "-c", code], stdout=subprocess.PIPE, text=True
+        )
+        try:
+            assert proc.stdout.readline().strip() == "locked"
+            lock = FileLock(path)
+            assert not lock.acquire()
+            assert lock.holder_pid() == proc.pid
+            assert lock.holder_alive()
+        finally:
+            proc.kill()
+            proc.wait()
+
+        assert not lock.holder_alive()
+        assert lock.acquire(timeout=2)
+        lock.release()
+
+
+class TestSingleFlight:
+    """测试单飞登录"""
+
+    @staticmethod
+    def _leader(started: threading.Event, error: Exception | None = None):
+        def run() -> None:
+            started.set()
+            time.sleep(0.3)
+            if error is not None:
+                raise error
+
+        return run
+
+    def _follow(self, started: threading.Event) -> tuple[list, list]:
+        """在先行者登录期间调用 `_single_flight`，返回 (是否自行登录, 异常)。"""
+        ran, errors = [], []
+        started.wait(5)
+        try:
+            _single_flight(lambda: ran.append(True))
+        except LoginError as e:
+            errors.append(e)
+        return ran, errors
+
+    def test_follower_reuses_success(self):
+        """测试等待者复用先行者的成功结果，不再自行登录"""
+        started = threading.Event()
+        leader = threading.Thread(target=_single_flight, args=(self._leader(started),))
+        leader.start()
+
+        ran, errors = self._follow(started)
+        leader.join()
+
+        assert ran == []
+        assert errors == []
+
+    def test_follower_reuses_failure(self):
+        """测试等待者复用先行者的失败结果"""
+        started = threading.Event()
+
+        def lead() -> None:
+            with pytest.raises(LoginError):
+                _single_flight(self._leader(started, LoginError("E2901: 密码错误")))
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+
+        ran, errors = self._follow(started)
+        leader.join()
+
+        assert ran == []
+        assert [str(e) for e in errors] == ["E2901: 密码错误"]
+
+    def test_follower_reuses_result_written_before_waiting(self, monkeypatch):
+        """测试先行者在两次加锁之间完成登录时，等待者仍复用其结果"""
+        holder = FileLock(locking.LOGIN_LOCK)
+        holder.acquire()
+        holder_pid = FileLock.holder_pid
+
+        def finish_then_report(lock):
+            if holder.locked:
+                locking.write_result(None, path=locking.LOGIN_RESULT)
+                holder.release()
+            return holder_pid(lock)
+
+        monkeypatch.setattr(FileLock, "holder_pid", finish_then_report)
+        ran = []
+        _single_flight(lambda: ran.append(True))
+
+        assert ran == []
+
+    def test_follower_skips_login_when_already_online(self, monkeypatch):
+        """测试先行者未留下结果，但网络已登录时等待者不再登录"""
+        monkeypatch.setattr(
+            "buaalogin_cli.service.get_status",
+            lambda: StatusInfo(NetworkStatus.LOGGED_IN),
+        )
+        holder = FileLock(locking.LOGIN_LOCK)
+        holder.acquire()
+        threading.Timer(0.2, holder.release).start()
+
+        ran = []
+        _single_flight(lambda: ran.append(True))
+
+        assert ran == []
+
+    def test_follower_logs_in_when_leader_left_no_result(self, monkeypatch):
+        """测试先行者未留下结果（如异常退出）时由等待者登录"""
+        monkeypatch.setattr(
+            "buaalogin_cli.service.get_status",
+            lambda: StatusInfo(NetworkStatus.LOGGED_OUT),
+        )
+        holder = FileLock(locking.LOGIN_LOCK)
+        holder.acquire()
+        threading.Timer(0.2, holder.release).start()
+
+        ran = []
+        _single_flight(lambda: ran.append(True))
+
+        assert ran == [True]
+        result = locking.read_result(path=locking.LOGIN_RESULT)
+        assert result is not None
+        assert result.error is None
@@ -0,0 +1,281 @@
+"""log 模块单元测试"""
+
+import json
+import os
+import threading
+import time
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from buaalogin_cli import log as log_module
+from buaalogin_cli.log import (
+    LOG_FORMAT_FILE,
+    Deduplicator,
+    QueuedFileSink,
+    encode_json,
+    logger,
+)
+
+
+@pytest.fixture
+def make_sink(tmp_path):
+    """创建写入临时目录的 sink 并接入 logger，测试结束后移除。"""
+    created = []
+
+    def make(**kwargs) -> QueuedFileSink:
+        sink = QueuedFileSink(tmp_path / "buaalogin.log", **kwargs)
+        handler_id = logger.add(sink, format=LOG_FORMAT_FILE, level="DEBUG")
+        created.append((handler_id, sink))
+        return sink
+
+    yield make
+    for handler_id, sink in created:
+        logger.remove(handler_id)
+        sink.close()
+
+
+def _zip_lines(path) -> list[str]:
+    with zipfile.ZipFile(path) as zf:
+        (name,) = zf.namelist()
+        return zf.read(name).decode().splitlines()
+
+
+class TestQueuedFileSink:
+    """测试后台写入的文件日志"""
+
+    def test_writes_formatted_records(self, make_sink):
+        """测试按顺序写入格式化后的日志，每条一行"""
+        sink = make_sink()
+        log = logger.bind(trigger="run")
+        for i in range(3):
+            log.info(f"第 {i} 条")
+
+        assert sink.flush(timeout=5)
+        lines = sink.path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 3
+        assert "| INFO     | [run     ] |" in lines[0]
+        assert lines[2].endswith("第 2 条")
+
+    def test_close_writes_remaining_records(self, make_sink):
+        """测试关闭时写完队列中剩余的日志"""
+        sink = make_sink()
+        for i in range(500):
+            logger.debug(f"记录 {i}")
+        sink.close()
+
+        lines = sink.path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 500
+
+    def test_rotates_and_compresses(self, make_sink):
+        """测试超过大小后轮转为 zip 归档，不丢失日志"""
+        sink = make_sink(rotation_bytes=2000)
+        for i in range(100):
+            logger.info(f"记录 {i:03d}")
+        sink.close()
+
+        archives = sink.archives()
+        assert archives
+        assert all(p.name.endswith(".log.zip") for p in archives)
+        lines = [line for p in archives for line in _zip_lines(p)]
+        lines += sink.path.read_text(encoding="utf-8").splitlines()
+        assert [line[-3:] for line in lines] == [f"{i:03d}" for i in range(100)]
+
+    def test_compression_does_not_block_writes(self, make_sink, monkeypatch):
+        """测试压缩归档期间写入照常进行"""
+        release = threading.Event()
+        compress = QueuedFileSink._compress
+
+        def slow_compress(self, archive):
+            release.wait(5)
+            compress(self, archive)
+
+        monkeypatch.setattr(QueuedFileSink, "_compress", slow_compress)
+        sink = make_sink(rotation_bytes=500)
+        for i in range(20):
+            logger.info(f"记录 {i}")
+
+        start = time.monotonic()
+        assert sink.flush(timeout=5)
+        assert time.monotonic() - start < 1
+        assert any(p.suffix == ".log" for p in sink.archives())
+
+        release.set()
+        sink.close()
+        assert all(p.name.endswith(".log.zip") for p in sink.archives())
+
+    def test_startup_compresses_pending_and_removes_expired(self, tmp_path):
+        """测试启动时补压上次未压缩的归档，并清理过期归档及其索引"""
+        pending = tmp_path / "buaalogin.2024-01-02_00-00-00_000000.log"
+        pending.write_text("未压缩\n", encoding="utf-8")
+        expired = tmp_path / "buaalogin.2024-01-01_00-00-00_000000.log.zip"
+        expired.write_bytes(b"")
+        sidecar = tmp_path / f"{expired.name}.idx"
+        sidecar.write_bytes(b"")
+        old = time.time() - 30 * 24 * 3600
+        os.utime(expired, (old, old))
+        os.utime(sidecar, (old, old))
+
+        sink = QueuedFileSink(tmp_path / "buaalogin.log")
+        sink.close()
+
+        assert [p.name for p in sink.archives()] == [f"{pending.name}.zip"]
+        assert not sidecar.exists()
+        assert _zip_lines(sink.archives()[0]) == ["未压缩"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def dedup(monkeypatch):
+    """换上使用假时钟的去重器，返回 (去重器, 时钟, 输出的日志)。"""
+    clock = FakeClock()
+    deduplicator = Deduplicator(3600, clock=clock)
+    monkeypatch.setattr(log_module, "_dedup", deduplicator)
+    emitted = []
+    handler_id = logger.add(
+        lambda message: emitted.append(message.record),
+        format="{message}",
+        level="DEBUG",
+        filter=log_module._not_repeated,
+    )
+    yield deduplicator, clock, emitted
+    logger.remove(handler_id)
+
+
+def _messages(records) -> list[str]:
+    return [r["message"] for r in records]
+
+
+class TestDeduplicator:
+    """测试重复日志合并"""
+
+    def test_repeats_collapsed_into_periodic_summary(self, dedup):
+        """测试重复日志只输出第一条，之后按间隔输出汇总"""
+        _, clock, emitted = dedup
+        log = logger.bind(trigger="run")
+        for _ in range(120):
+            log.info("已登录，无需操作")
+            log.debug("下次检查: 60.0 秒后")
+            clock.now += 60
+
+        assert _messages(emitted) == [
+            "已登录，无需操作",
+            "下次检查: 60.0 秒后",
+            "已登录，无需操作（1 小时内重复 60 次）",
+            "下次检查: 60.0 秒后（1 小时内重复 60 次）",
+        ]
+
+    def test_state_change_emitted_with_pending_summary(self, dedup):
+        """测试状态变化立即输出，之前被合并的日志先补上汇总"""
+        _, clock, emitted = dedup
+        log = logger.bind(trigger="run")
+        for _ in range(10):
+            log.info("已登录，无需操作")
+            clock.now += 60
+        log.warning("未登录，正在重新登录...")
+        log.success("登录成功")
+        log.info("已登录，无需操作")
+
+        assert _messages(emitted) == [
+            "已登录，无需操作",
+            "已登录，无需操作（9 分钟内重复 9 次）",
+            "未登录，正在重新登录...",
+            "登录成功",
+            "已登录，无需操作",
+        ]
+        summary = emitted[1]
+        assert summary["level"].name == "INFO"
+        assert summary["function"] == "test_state_change_emitted_with_pending_summary"
+
+    def test_triggers_tracked_separately(self, dedup):
+        """测试不同 trigger 的相同消息分别计数，DEBUG 新消息不打断合并"""
+        _, _, emitted = dedup
+        for trigger in ("run", "status", "run", "status"):
+            logger.bind(trigger=trigger).debug("正在检测网络状态")
+        logger.bind(trigger="run").debug("网络状态: 未登录")
+        logger.bind(trigger="run").debug("正在检测网络状态")
+
+        assert [(r["extra"]["trigger"], r["message"]) for r in emitted] == [
+            ("run", "正在检测网络状态"),
+            ("status", "正在检测网络状态"),
+            ("run", "网络状态: 未登录"),
+        ]
+
+    def test_flush_emits_pending_summaries(self, dedup):
+        """测试 flush 为被合并的日志输出汇总"""
+        deduplicator, clock, emitted = dedup
+        for _ in range(3):
+            logger.bind(trigger="run").info("已登录，无需操作")
+            clock.now += 30
+        deduplicator.flush()
+
+        assert _messages(emitted) == [
+            "已登录，无需操作",
+            "已登录，无需操作（60 秒内重复 2 次）",
+        ]
+
+    def test_unfiltered_handlers_receive_everything(self, dedup):
+        """测试未设过滤器的 handler 仍收到每一条日志"""
+        everything = []
+        handler_id = logger.add(lambda m: everything.append(m), level="DEBUG")
+        for _ in range(3):
+            logger.bind(trigger="run").info("已登录，无需操作")
+        logger.remove(handler_id)
+
+        assert len(everything) == 3
+        assert len(dedup[2]) == 1
+
+
+class TestJsonLines:
+    """测试 JSON Lines 日志"""
+
+    def test_records_encoded_one_per_line(self, tmp_path):
+        """测试每条记录编码为一行 JSON，附带 bind 的字段"""
+        sink = QueuedFileSink(tmp_path / "buaalogin.jsonl", encode=encode_json)
+        handler_id = logger.add(sink, format="{message}", level="DEBUG")
+        try:
+            logger.bind(trigger="run", status="logged_in", probe_sec=0.0123).info(
+                "已登录，无需操作"
+            )
+            try:
+                raise ValueError("网关无响应")
+            except ValueError:
+                logger.bind(trigger="run").exception("发生错误")
+        finally:
+            logger.remove(handler_id)
+            sink.close()
+
+        first, second = [
+            json.loads(line) for line in sink.path.read_text("utf-8").splitlines()
+        ]
+        assert first["level"] == "INFO"
+        assert first["trigger"] == "run"
+        assert first["module"] == "tests.unit.test_log"
+        assert first["function"] == "test_records_encoded_one_per_line"
+        assert first["message"] == "已登录，无需操作"
+        assert first["extra"] == {"status": "logged_in", "probe_sec": 0.0123}
+        assert datetime.fromisoformat(first["time"]).tzinfo is not None
+        assert "exception" not in first
+        assert second["level"] == "ERROR"
+        assert "ValueError: 网关无响应" in second["exception"]
+
+    def test_unsupported_extra_falls_back_to_repr(self, tmp_path):
+        """测试 extra 中无法编码的值按 repr 输出"""
+        sink = QueuedFileSink(tmp_path / "buaalogin.jsonl", encode=encode_json)
+        handler_id = logger.add(sink, format="{message}", level="DEBUG")
+        try:
+            logger.bind(trigger="run", path=tmp_path).debug("路径")
+        finally:
+            logger.remove(handler_id)
+            sink.close()
+
+        record = json.loads(sink.path.read_text("utf-8"))
+        assert record["extra"] == {"path": repr(tmp_path)}
@@ -0,0 +1,162 @@
+"""logsearch 模块单元测试"""
+
+import zipfile
+from datetime import datetime
+
+import pytest
+from typer.testing import CliRunner
+
+from buaalogin_cli import cli, logsearch
+from buaalogin_cli.logsearch import Query, parse_time, search
+
+runner = CliRunner()
+
+TRACEBACK = "Traceback (most recent call last):\nValueError: 网关无响应\n"
+
+
+def _line(at: str, level: str, trigger: str, message: str) -> str:
+    return (
+        f"{at} | {level:<8} | [{trigger:<8}] | "
+        f"buaalogin_cli.service:_keep_alive_loop:700 - {message}\n"
+    )
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    """两个压缩归档、一个未压缩归档与当前日志文件，按时间先后排列。"""
+    day1 = _line("2024-05-01 08:00:00", "INFO", "run", "已登录，无需操作") + _line(
+        "2024-05-01 09:00:00", "WARNING", "run", "未登录，正在重新登录..."
+    )
+    day2 = _line("2024-05-02 08:00:00", "DEBUG", "status", "正在检测网络状态") + (
+        _line("2024-05-02 09:00:00", "ERROR", "run", "发生错误") + TRACEBACK
+    )
+    day3 = _line("2024-05-03 08:00:00", "SUCCESS", "login", "登录成功")
+    live = _line("2024-05-04 08:00:00", "INFO", "run", "已登录，无需操作")
+
+    for name, text in (
+        ("buaalogin-cli.2024-05-01_23-59-59_000000.log", day1),
+        ("buaalogin-cli.2024-05-02_23-59-59_000000.log", day2),
+    ):
+        with zipfile.ZipFile(tmp_path / f"{name}.zip", "w") as zf:
+            zf.writestr(name, text)
+    (tmp_path / "buaalogin-cli.2024-05-03_23-59-59_000000.log").write_text(
+        day3, encoding="utf-8"
+    )
+    log_file = tmp_path / "buaalogin-cli.log"
+    log_file.write_text(live, encoding="utf-8")
+    return log_file
+
+
+def _messages(query: Query, log_file) -> list[str]:
+    return [
+        text.split(" - ", 1)[1].splitlines()[0]
+        for text in search(query, log_file=log_file)
+    ]
+
+
+class TestParseTime:
+    """测试时间参数解析"""
+
+    NOW = datetime(2024, 5, 4, 12, 30, 0)
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            ("2024-05-01", "2024-05-01 00:00:00"),
+            ("2024-05-01 08:00", "2024-05-01 08:00:00"),
+            ("2024-05-01T08:00:30", "2024-05-01 08:00:30"),
+            ("08:15", "2024-05-04 08:15:00"),
+            ("2h", "2024-05-04 10:30:00"),
+            ("1.5d", "2024-05-03 00:30:00"),
+        ],
+    )
+    def test_formats(self, value, expected):
+        assert parse_time(value, now=self.NOW) == expected
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="无法识别的时间"):
+            parse_time("yesterday", now=self.NOW)
+
+
+class TestSearch:
+    """测试日志检索"""
+
+    def test_streams_archives_and_live_file_in_order(self, log_dir):
+        """测试按时间顺序读取各归档与当前日志，续行归入所属记录"""
+        texts = list(search(Query(), log_file=log_dir))
+
+        assert len(texts) == 6
+        assert texts[3].endswith(TRACEBACK)
+        assert _messages(Query(), log_dir) == [
+            "已登录，无需操作",
+            "未登录，正在重新登录...",
+            "正在检测网络状态",
+            "发生错误",
+            "登录成功",
+            "已登录，无需操作",
+        ]
+
+    def test_filters(self, log_dir):
+        """测试按时间范围、级别与来源筛选"""
+        query = Query(since="2024-05-01 09:00:00", until="2024-05-03 08:00:00")
+        assert _messages(query, log_dir) == [
+            "未登录，正在重新登录...",
+            "正在检测网络状态",
+            "发生错误",
+        ]
+        assert _messages(Query(level="WARNING"), log_dir) == [
+            "未登录，正在重新登录...",
+            "发生错误",
+        ]
+        assert _messages(Query(triggers=frozenset({"login", "status"})), log_dir) == [
+            "正在检测网络状态",
+            "登录成功",
+        ]
+
+    def test_index_skips_unrelated_archives(self, log_dir, monkeypatch):
+        """测试建立索引后，按时间筛选只打开时间范围相交的文件"""
+        list(search(Query(), log_file=log_dir))
+        assert len(list(log_dir.parent.glob("*.idx"))) == 3
+
+        opened = []
+        lines = logsearch._lines
+        monkeypatch.setattr(
+            logsearch, "_lines", lambda path: opened.append(path.name) or lines(path)
+        )
+        query = Query(since="2024-05-02 00:00:00", until="2024-05-02 23:00:00")
+
+        assert _messages(query, log_dir) == ["正在检测网络状态", "发生错误"]
+        assert opened == ["buaalogin-cli.2024-05-02_23-59-59_000000.log.zip"]
+
+    def test_stale_index_rebuilt(self, log_dir):
+        """测试归档变化后索引失效并重建"""
+        list(search(Query(), log_file=log_dir))
+        archive = log_dir.parent / "buaalogin-cli.2024-05-03_23-59-59_000000.log"
+        archive.write_text(
+            _line("2024-05-03 10:00:00", "INFO", "run", "已更新"), encoding="utf-8"
+        )
+
+        query = Query(since="2024-05-03 09:00:00", until="2024-05-04 00:00:00")
+        assert _messages(query, log_dir) == ["已更新"]
+
+
+class TestLogsCommand:
+    """测试 logs 命令"""
+
+    def test_prints_matching_records(self, log_dir, monkeypatch):
+        monkeypatch.setattr(logsearch, "LOG_FILE", log_dir)
+
+        result = runner.invoke(
+            cli.app, ["logs", "--since", "2024-05-02", "-l", "error", "-t", "run"]
+        )
+
+        assert result.exit_code == 0
+        assert result.stdout.startswith("2024-05-02 09:00:00 | ERROR")
+        assert result.stdout.endswith(TRACEBACK)
+
+    def test_rejects_unknown_level(self, log_dir, monkeypatch):
+        monkeypatch.setattr(logsearch, "LOG_FILE", log_dir)
+
+        result = runner.invoke(cli.app, ["logs", "-l", "verbose"])
+
+        assert result.exit_code == 2
@@ -0,0 +1,108 @@
+"""netwatch 模块单元测试"""
+
+import socket
+import struct
+
+import pytest
+
+from buaalogin_cli import netwatch
+from buaalogin_cli.netwatch import (
+    RTM_NEWADDR,
+    RTM_NEWLINK,
+    NetlinkWatcher,
+    create_watcher,
+    is_relevant,
+)
+
+
+def _nlmsg(msg_type: int, body: bytes = b"") -> bytes:
+    length = 16 + len(body)
+    padding = b"\0" * ((4 - length % 4) % 4)
+    return struct.pack("=IHHII", length, msg_type, 0, 0, 0) + body + padding
+
+
+def _link_msg(change: int) -> bytes:
+    return _nlmsg(RTM_NEWLINK, struct.pack("=BxHiII", 0, 1, 2, 0x1043, change))
+
+
+class TestIsRelevant:
+    """测试 rtnetlink 消息过滤"""
+
+    def test_address_change_is_relevant(self):
+        """测试地址变化视为相关"""
+        assert is_relevant(_nlmsg(RTM_NEWADDR, b"\0" * 8))
+
+    def test_link_state_change_is_relevant(self):
+        """测试链路 UP/RUNNING 变化视为相关"""
+        assert is_relevant(_link_msg(change=0x40))
+
+    def test_link_stats_message_is_ignored(self):
+        """测试无状态变化的链路消息（如无线统计）被忽略"""
+        assert not is_relevant(_link_msg(change=0))
+
+    def test_relevant_message_after_ignored_one(self):
+        """测试一批消息中任意一条相关即视为相关"""
+        data = _link_msg(change=0) + _nlmsg(RTM_NEWADDR, b"\0" * 8)
+        assert is_relevant(data)
+
+    def test_truncated_data(self):
+        """测试截断的数据不会抛出异常"""
+        assert not is_relevant(b"\x01\x02")
+
+
+class TestNetlinkWatcher:
+    """测试使用套接字对模拟的 netlink 监听"""
+
+    @pytest.fixture
+    def socket_pair(self):
+        reader, writer = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        yield reader, writer
+        reader.close()
+        writer.close()
+
+    def test_wait_times_out_without_events(self, socket_pair):
+        """测试无事件时等待到超时并返回 False"""
+        reader, _ = socket_pair
+        assert NetlinkWatcher(reader).wait(0.05) is False
+
+    def test_wait_wakes_on_change(self, socket_pair):
+        """测试收到相关消息时提前返回 True"""
+        reader, writer = socket_pair
+        writer.send(_nlmsg(RTM_NEWADDR, b"\0" * 8))
+        watcher = NetlinkWatcher(reader, settle_sec=0.01)
+        assert watcher.wait(5) is True
+
+    def test_wait_ignores_irrelevant_messages(self, socket_pair):
+        """测试只收到无关消息时不会唤醒"""
+        reader, writer = socket_pair
+        writer.send(_link_msg(change=0))
+        assert NetlinkWatcher(reader).wait(0.05) is False
+
+    def test_settle_drains_burst(self, socket_pair):
+        """测试唤醒后读尽同一批变化，不会再次唤醒"""
+        reader, writer = socket_pair
+        for _ in range(3):
+            writer.send(_nlmsg(RTM_NEWADDR, b"\0" * 8))
+        watcher = NetlinkWatcher(reader, settle_sec=0.01)
+
+        assert watcher.wait(5) is True
+        assert watcher.wait(0.05) is False
+
+
+class TestCreateWatcher:
+    """测试平台不支持时回退到轮询"""
+
+    def test_returns_none_without_netlink(self, monkeypatch):
+        """测试无 AF_NETLINK 的平台返回 None"""
+        monkeypatch.delattr(netwatch.socket, "AF_NETLINK", raising=False)
+        assert create_watcher() is None
+
+    def test_returns_none_when_socket_fails(self, monkeypatch):
+        """测试无法创建套接字时返回 None"""
+
+        def fail():
+            raise PermissionError("denied")
+
+        monkeypatch.setattr(netwatch, "_open_rtnetlink", fail)
+        if hasattr(socket, "AF_NETLINK"):
+            assert create_watcher() is None
@@ -0,0 +1,70 @@
+"""persist 模块单元测试"""
+
+from buaalogin_cli import persist
+from buaalogin_cli.breaker import BreakerState, BreakerStatus
+from buaalogin_cli.persist import KeepAliveState, StateStore
+from buaalogin_cli.scheduler import SchedulerState
+from buaalogin_cli.status import NetworkStatus
+
+
+def _state(**kwargs) -> KeepAliveState:
+    kwargs.setdefault("saved_at", 1000.0)
+    return KeepAliveState(**kwargs)
+
+
+class TestStateStore:
+    """测试状态文件读写"""
+
+    def test_round_trip(self, tmp_path):
+        """测试保存后可由新的实例读回"""
+        path = tmp_path / "keepalive.state"
+        state = _state(
+            credentials=persist.fingerprint("user", "pw"),
+            status=NetworkStatus.LOGGED_OUT,
+            last_login_at=900.0,
+            breaker=BreakerStatus(BreakerState.OPEN, 1, error="E2553"),
+            config_stamp=(123, 45),
+            scheduler=SchedulerState(NetworkStatus.LOGGED_OUT, True, 0),
+            login_durations=[1.5, 2.0],
+        )
+
+        assert StateStore(path).save(state)
+
+        assert StateStore(path).load() == state
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_default_path(self, isolated_state):
+        """测试默认使用 STATE_FILE"""
+        StateStore().save(_state())
+        assert isolated_state.exists()
+
+    def test_skips_unchanged_state(self, tmp_path):
+        """测试只有保存时间不同的状态不重复写入"""
+        store = StateStore(tmp_path / "keepalive.state")
+
+        assert store.save(_state(status=NetworkStatus.LOGGED_IN))
+        assert not store.save(_state(status=NetworkStatus.LOGGED_IN, saved_at=2000.0))
+        assert store.save(_state(status=NetworkStatus.LOGGED_OUT, saved_at=2000.0))
+
+    def test_ignores_corrupt_file(self, tmp_path):
+        """测试文件损坏时返回 None"""
+        path = tmp_path / "keepalive.state"
+        path.write_bytes(b"\xc1garbage")
+
+        assert StateStore(path).load() is None
+
+    def test_ignores_other_version(self, tmp_path):
+        """测试格式版本不符时返回 None"""
+        path = tmp_path / "keepalive.state"
+        StateStore(path).save(_state(version=persist.STATE_VERSION + 1))
+
+        assert StateStore(path).load() is None
+
+
+def test_fingerprint_does_not_contain_password():
+    """测试指纹随凭据变化，且不包含明文密码"""
+    a = persist.fingerprint("user", "secret")
+
+    assert a == persist.fingerprint("user", "secret")
+    assert a != persist.fingerprint("user", "secret2")
+    assert "secret" not in a
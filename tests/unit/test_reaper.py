@@ -0,0 +1,136 @@
+"""reaper 模块单元测试"""
+
+import os
+import subprocess
+import sys
+
+import msgspec
+import pytest
+
+from buaalogin_cli import reaper
+from buaalogin_cli.reaper import BrowserProcess, Reaper
+
+pytestmark = pytest.mark.skipif(not reaper.is_supported(), reason="需要 /proc")
+
+
+@pytest.fixture
+def spawn():
+    """启动子进程，测试结束时清理。"""
+    procs = []
+
+    def start(argv0: str) -> subprocess.Popen:
+        # 以 sleep 冒充浏览器：argv[0] 决定 /proc/<pid>/cmdline 中的进程名
+        proc = subprocess.Popen([argv0, "60"], executable="sleep")
+        procs.append(proc)
+        return proc
+
+    yield start
+    for proc in procs:
+        proc.kill()
+        proc.wait()
+
+
+def _dead_pid() -> int:
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def _started(pid: int) -> int:
+    stat = reaper._stat(pid)
+    assert stat is not None
+    return stat[1]
+
+
+def _write(path, records: list[BrowserProcess]) -> None:
+    path.write_bytes(msgspec.json.encode(records))
+
+
+def _read(path) -> list[BrowserProcess]:
+    return msgspec.json.decode(path.read_bytes(), type=list[BrowserProcess])
+
+
+class TestTrack:
+    """测试记录浏览器进程"""
+
+    def test_records_browser_children_once(self, spawn, tmp_path):
+        """测试只记录浏览器子进程，重复记录不会产生重复项"""
+        path = tmp_path / "browsers.json"
+        browser = spawn("headless_shell")
+        spawn("not-a-browser")
+
+        assert reaper.track(path=path) == 1
+        assert reaper.track(path=path) == 0
+        assert _read(path) == [
+            BrowserProcess(browser.pid, _started(browser.pid), os.getpid())
+        ]
+
+    def test_default_path_resolved_at_call_time(self, spawn, isolated_browsers):
+        """测试未指定路径时使用调用时的 BROWSER_PIDFILE"""
+        spawn("chromium")
+
+        assert reaper.track() == 1
+        assert len(_read(isolated_browsers)) == 1
+
+    def test_no_browsers_leaves_no_file(self, tmp_path):
+        """测试没有浏览器进程时不创建 pidfile"""
+        path = tmp_path / "browsers.json"
+
+        assert reaper.track(path=path) == 0
+        assert not path.exists()
+
+
+class TestReap:
+    """测试清理残留浏览器"""
+
+    def test_keeps_browsers_of_live_owner(self, spawn, tmp_path):
+        """测试仍由存活记录者管理的浏览器不会被清理"""
+        path = tmp_path / "browsers.json"
+        browser = spawn("chromium")
+        reaper.track(path=path)
+
+        assert reaper.reap(path=path) == (0, 0)
+        assert browser.poll() is None
+        assert len(_read(path)) == 1
+
+    def test_kills_orphans_of_dead_owner(self, spawn, tmp_path):
+        """测试记录者已退出的浏览器被结束，并报告回收的内存"""
+        path = tmp_path / "browsers.json"
+        browser = spawn("chrome")
+        _write(path, [BrowserProcess(browser.pid, _started(browser.pid), _dead_pid())])
+
+        killed, rss_kb = reaper.reap(path=path)
+
+        assert killed == 1
+        assert rss_kb > 0
+        assert browser.wait(timeout=5) is not None
+        assert _read(path) == []
+
+    def test_ignores_reused_pid(self, spawn, tmp_path):
+        """测试 PID 被复用（启动时间不同）时不结束该进程，只删除记录"""
+        path = tmp_path / "browsers.json"
+        other = spawn("headless_shell")
+        _write(path, [BrowserProcess(other.pid, _started(other.pid) - 1, _dead_pid())])
+
+        assert reaper.reap(path=path) == (0, 0)
+        assert other.poll() is None
+        assert _read(path) == []
+
+    def test_corrupt_pidfile_is_ignored(self, tmp_path):
+        """测试 pidfile 损坏时忽略旧记录"""
+        path = tmp_path / "browsers.json"
+        path.write_text("not json")
+
+        assert reaper.reap(path=path) == (0, 0)
+
+
+def test_reaper_tick_respects_interval(tmp_path, monkeypatch):
+    """测试定期清理按间隔执行"""
+    calls = []
+    monkeypatch.setattr(reaper, "reap", lambda path: calls.append(path) or (0, 0))
+    periodic = Reaper(600, path=tmp_path / "browsers.json")
+
+    periodic.tick()
+    periodic.tick()
+
+    assert len(calls) == 1
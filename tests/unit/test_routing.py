@@ -0,0 +1,105 @@
+"""routing 模块单元测试"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from buaalogin_cli.constants import ResourceProfile
+from buaalogin_cli.routing import FilterProfile, RequestFilter, create_filter
+
+GW = "https://gw.buaa.edu.cn"
+
+
+def _route(url: str, resource_type: str) -> MagicMock:
+    route = MagicMock()
+    route.request.url = url
+    route.request.resource_type = resource_type
+    return route
+
+
+class TestDefaultProfile:
+    """测试默认过滤规则"""
+
+    @pytest.mark.parametrize(
+        ("url", "resource_type", "expected"),
+        [
+            (f"{GW}/srun_portal_pc?ac_id=1", "document", True),
+            (f"{GW}/static/js/srun_portal.js", "script", True),
+            (f"{GW}/cgi-bin/srun_portal?action=login", "xhr", True),
+            (f"{GW}/static/css/style.css", "stylesheet", True),
+            (f"{GW}/static/images/bg.jpg", "image", False),
+            (f"{GW}/static/fonts/iconfont.woff2", "font", False),
+            ("https://cdn.example.com/jquery.js", "script", False),
+            ("https://hm.baidu.com/hm.js?abc", "script", False),
+        ],
+    )
+    def test_allows(self, url, resource_type, expected):
+        """测试默认规则只放行网关自身的页面、脚本、样式与接口"""
+        request_filter = create_filter(ResourceProfile.DEFAULT)
+        assert request_filter is not None
+        assert request_filter.allows(url, resource_type) is expected
+
+    def test_strict_blocks_stylesheet(self):
+        """测试 strict 规则拦截样式表"""
+        request_filter = create_filter(ResourceProfile.STRICT)
+        assert request_filter is not None
+        assert not request_filter.allows(f"{GW}/static/css/style.css", "stylesheet")
+
+    def test_off_returns_none(self):
+        """测试 off 不创建过滤器"""
+        assert create_filter(ResourceProfile.OFF) is None
+
+
+class TestRequestFilter:
+    """测试路由处理与统计"""
+
+    def test_allow_patterns_override_host(self):
+        """测试额外放行的 URL 正则不受主机限制"""
+        request_filter = RequestFilter(
+            FilterProfile(
+                resource_types=frozenset({"script"}),
+                allow_patterns=(r"cdn\.example\.com/jquery",),
+            )
+        )
+        assert request_filter.allows("https://cdn.example.com/jquery.js", "image")
+
+    def test_handle_counts_allowed_and_blocked(self):
+        """测试放行与拦截分别调用 continue_/abort 并计数"""
+        request_filter = create_filter(ResourceProfile.DEFAULT)
+        assert request_filter is not None
+
+        allowed = _route(f"{GW}/", "document")
+        image = _route(f"{GW}/a.png", "image")
+        font = _route(f"{GW}/a.woff", "font")
+        for route in (allowed, image, font, _route(f"{GW}/b.png", "image")):
+            request_filter._handle(route)
+
+        allowed.continue_.assert_called_once_with()
+        image.abort.assert_called_once_with()
+        assert request_filter.allowed == 1
+        assert request_filter.blocked_total == 3
+        assert request_filter.blocked == {"image": 2, "font": 1}
+
+    def test_allowed_bytes_from_content_length(self):
+        """测试按 Content-Length 累计放行字节数"""
+        request_filter = create_filter(ResourceProfile.DEFAULT)
+        assert request_filter is not None
+
+        for length in ("2048", None, "1024"):
+            response = MagicMock()
+            response.headers = {"content-length": length} if length else {}
+            request_filter._on_response(response)
+
+        assert request_filter.allowed_bytes == 3072
+        assert "3.0 KB" in request_filter.summary()
+
+    def test_install_registers_route(self):
+        """测试在页面上注册路由和响应监听"""
+        request_filter = create_filter(ResourceProfile.DEFAULT)
+        assert request_filter is not None
+        page = MagicMock()
+
+        request_filter.install(page)
+
+        page.route.assert_called_once_with("**/*", request_filter._handle)
+        page.on.assert_called_once_with("response", request_filter._on_response)
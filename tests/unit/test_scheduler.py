@@ -0,0 +1,253 @@
+"""scheduler 模块单元测试"""
+
+import itertools
+import random
+
+import pytest
+
+from buaalogin_cli.constants import PollPolicy
+from buaalogin_cli.scheduler import (
+    AdaptiveScheduler,
+    FixedScheduler,
+    Scheduler,
+    create_scheduler,
+)
+from buaalogin_cli.status import NetworkStatus
+
+IN = NetworkStatus.LOGGED_IN
+OUT = NetworkStatus.LOGGED_OUT
+UNKNOWN = NetworkStatus.UNKNOWN_NETWORK
+
+
+class VirtualClock:
+    """虚拟时钟：sleep 直接推进时间。"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TestFixedScheduler:
+    """测试固定间隔调度"""
+
+    def test_no_drift_when_tick_takes_time(self):
+        """测试检测耗时从等待时间中扣除，周期保持不变"""
+        clock = VirtualClock()
+        scheduler = FixedScheduler(60, clock=clock)
+        starts = []
+
+        for _ in range(5):
+            scheduler.start_tick()
+            starts.append(clock.now)
+            clock.advance(2.5)  # 模拟探测耗时
+            scheduler.wait(IN)
+
+        assert clock.sleeps == [57.5] * 5
+        assert [b - a for a, b in itertools.pairwise(starts)] == [60.0] * 4
+
+    def test_oversleep_does_not_accumulate(self):
+        """测试 sleep 多睡的时间不会累积到后续周期"""
+        clock = VirtualClock()
+        scheduler = FixedScheduler(60, clock=clock)
+
+        scheduler.start_tick()
+        scheduler.wait(IN)
+        clock.advance(0.3)  # 唤醒延迟
+        scheduler.start_tick()
+        scheduler.wait(IN)
+
+        assert clock.now == pytest.approx(1000 + 120)
+
+    def test_resync_after_long_lag(self):
+        """测试严重滞后（如系统休眠）后以当前时间重新对齐"""
+        clock = VirtualClock()
+        scheduler = FixedScheduler(60, clock=clock)
+
+        scheduler.start_tick()
+        scheduler.wait(IN)
+        clock.advance(3600)
+        scheduler.start_tick()
+        scheduler.wait(IN)
+
+        assert clock.sleeps[-1] == 60
+
+    def test_error_retries_sooner(self):
+        """测试异常后最多等待 10 秒"""
+        clock = VirtualClock()
+        assert FixedScheduler(60, clock=clock).wait(None) == 10
+        assert FixedScheduler(5, clock=clock).wait(None) == 5
+
+    def test_tick_longer_than_interval_does_not_sleep(self):
+        """测试单轮耗时超过间隔时立即开始下一轮"""
+        clock = VirtualClock()
+        scheduler = FixedScheduler(10, clock=clock)
+
+        scheduler.start_tick()
+        clock.advance(15)
+        scheduler.wait(OUT, relogin=True)
+
+        assert clock.sleeps == [0.0]
+
+
+class TestAdaptiveScheduler:
+    """测试自适应调度"""
+
+    @staticmethod
+    def _scheduler(**kwargs) -> AdaptiveScheduler:
+        kwargs.setdefault("jitter", 0)
+        return AdaptiveScheduler(60, clock=VirtualClock(), **kwargs)
+
+    def test_steady_state_uses_interval(self):
+        """测试持续在线时使用基础间隔"""
+        scheduler = self._scheduler()
+        assert [scheduler.next_delay(IN, relogin=False) for _ in range(3)] == [60] * 3
+
+    def test_backoff_while_unknown_network(self):
+        """测试持续离线时指数退避直至上限"""
+        scheduler = self._scheduler(max_interval=400)
+        delays = [scheduler.next_delay(UNKNOWN, relogin=False) for _ in range(6)]
+        assert delays == [60, 120, 240, 400, 400, 400]
+
+    def test_backoff_resets_when_back_on_campus(self):
+        """测试回到校园网后退避计数清零"""
+        scheduler = self._scheduler()
+        for _ in range(4):
+            scheduler.next_delay(UNKNOWN, relogin=False)
+        assert scheduler.next_delay(IN, relogin=False) == 60
+        assert scheduler.next_delay(UNKNOWN, relogin=False) == 5  # 掉线快速复查
+
+    def test_fast_path_after_login(self):
+        """测试登录后快速复查"""
+        scheduler = self._scheduler()
+        assert scheduler.next_delay(OUT, relogin=True) == 5
+        assert scheduler.next_delay(IN, relogin=False) == 60
+
+    def test_repeated_relogin_is_not_fast(self):
+        """测试连续登录（如持续失败）时不再快速重试"""
+        scheduler = self._scheduler()
+        delays = [scheduler.next_delay(OUT, relogin=True) for _ in range(3)]
+        assert delays == [5, 60, 60]
+
+    def test_fast_path_after_drop(self):
+        """测试从在线掉到离线时快速复查"""
+        scheduler = self._scheduler()
+        scheduler.next_delay(IN, relogin=False)
+        assert scheduler.next_delay(UNKNOWN, relogin=False) == 5
+
+    def test_jitter_bounds(self):
+        """测试抖动在 ±jitter 比例范围内且并非恒定"""
+        scheduler = AdaptiveScheduler(
+            60, jitter=0.1, clock=VirtualClock(), rng=random.Random(42)
+        )
+        delays = [scheduler.next_delay(IN, relogin=False) for _ in range(50)]
+        assert all(54 <= d <= 66 for d in delays)
+        assert len(set(delays)) > 1
+
+    def test_fast_interval_never_exceeds_interval(self):
+        """测试快速复查间隔不超过基础间隔"""
+        scheduler = AdaptiveScheduler(3, jitter=0, clock=VirtualClock())
+        assert scheduler.next_delay(OUT, relogin=True) == 3
+
+    def test_restore_resumes_backoff(self):
+        """测试导出的状态恢复到新调度器后继续退避"""
+        scheduler = self._scheduler(max_interval=400)
+        for _ in range(3):
+            scheduler.next_delay(UNKNOWN, relogin=False)
+
+        resumed = self._scheduler(max_interval=400)
+        resumed.restore(scheduler.export_state())
+
+        assert resumed.next_delay(UNKNOWN, relogin=False) == 400
+
+    def test_reconfigure_recomputes_bounds(self):
+        """测试热更新间隔后重新计算快速复查间隔与退避上限"""
+        scheduler = self._scheduler(max_interval=400)
+        scheduler.reconfigure(3, max_interval=10)
+        assert scheduler.next_delay(OUT, relogin=True) == 3
+        delays = [scheduler.next_delay(UNKNOWN, relogin=False) for _ in range(4)]
+        assert delays == [3, 6, 10, 10]
+
+        scheduler.reconfigure(60)
+        assert (scheduler.fast_interval, scheduler.max_interval) == (5, 60)
+
+
+class TestCreateScheduler:
+    """测试按策略创建调度器"""
+
+    def test_incomplete_subclass_rejected(self):
+        """测试未实现 next_delay 的调度器在创建时即报错"""
+
+        class Incomplete(Scheduler):
+            pass
+
+        with pytest.raises(TypeError, match="next_delay"):
+            Incomplete(60)
+
+    def test_policies(self):
+        """测试策略名称映射到调度器类型"""
+        assert isinstance(create_scheduler(PollPolicy.FIXED, 60), FixedScheduler)
+        adaptive = create_scheduler(PollPolicy.ADAPTIVE, 60, max_interval=900)
+        assert isinstance(adaptive, AdaptiveScheduler)
+        assert adaptive.max_interval == 900
+
+
+class FakeWatcher:
+    """按预设结果返回的网络变化监听器。"""
+
+    def __init__(self, clock: VirtualClock, wake_after: float | None):
+        self.clock = clock
+        self.wake_after = wake_after
+        self.timeouts: list[float] = []
+
+    def wait(self, timeout: float) -> bool:
+        self.timeouts.append(timeout)
+        if self.wake_after is not None and self.wake_after < timeout:
+            self.clock.advance(self.wake_after)
+            return True
+        self.clock.advance(timeout)
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class TestSchedulerWithWatcher:
+    """测试网络变化唤醒"""
+
+    def test_waits_on_watcher_instead_of_sleep(self):
+        """测试提供监听器时由监听器负责等待"""
+        clock = VirtualClock()
+        watcher = FakeWatcher(clock, wake_after=None)
+        scheduler = FixedScheduler(600, clock=clock, watcher=watcher)
+
+        scheduler.start_tick()
+        scheduler.plan(IN)
+        assert scheduler.sleep() is False
+        assert watcher.timeouts == [600]
+        assert clock.sleeps == []
+
+    def test_wake_realigns_next_tick(self):
+        """测试提前唤醒后以唤醒时间为基准计算下一次截止时间"""
+        clock = VirtualClock()
+        watcher = FakeWatcher(clock, wake_after=30)
+        scheduler = FixedScheduler(600, clock=clock, watcher=watcher)
+
+        scheduler.start_tick()
+        scheduler.plan(IN)
+        assert scheduler.sleep() is True
+
+        watcher.wake_after = None
+        scheduler.start_tick()
+        scheduler.plan(IN)
+        scheduler.sleep()
+        assert watcher.timeouts[-1] == 600
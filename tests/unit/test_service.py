@@ -4,59 +4,23 @@ import sys
 from unittest.mock import MagicMock, patch
 
 import pytest
-import requests
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
 
+from buaalogin_cli import srun
+from buaalogin_cli.constants import LoginEngine
 from buaalogin_cli.service import (
     LOGIN_BUTTON_SELECTOR,
     PASSWORD_SELECTOR,
     USERNAME_SELECTOR,
     LoginError,
     NetworkStatus,
-    _get_error_message,
+    WarmBrowser,
     _install_browser,
-    get_status,
+    _is_login_result,
+    _read_login_error,
+    _submit_login_form,
 )
-
-
-class TestGetStatus:
-    """测试 get_status 函数"""
-
-    def test_logged_in_returns_logged_in(self):
-        """测试已登录状态返回 LOGGED_IN（API 返回用户信息）"""
-        with patch("buaalogin_cli.service.requests.get") as mock_get:
-            mock_response = MagicMock()
-            # API 返回逗号分隔的用户信息表示已登录
-            mock_response.text = "93830,1770015058,1770020128,59831052"
-            mock_get.return_value = mock_response
-
-            result = get_status()
-            assert result == NetworkStatus.LOGGED_IN
-
-    def test_logged_out_with_not_online_error(self):
-        """测试 API 返回 not_online_error 时返回 LOGGED_OUT"""
-        with patch("buaalogin_cli.service.requests.get") as mock_get:
-            mock_response = MagicMock()
-            mock_response.text = "not_online_error"
-            mock_get.return_value = mock_response
-
-            result = get_status()
-            assert result == NetworkStatus.LOGGED_OUT
-
-    def test_connection_error_returns_unknown_network(self):
-        """测试连接错误返回 UNKNOWN_NETWORK"""
-        with patch("buaalogin_cli.service.requests.get") as mock_get:
-            mock_get.side_effect = requests.ConnectionError("Connection failed")
-
-            result = get_status()
-            assert result == NetworkStatus.UNKNOWN_NETWORK
-
-    def test_timeout_returns_unknown_network(self):
-        """测试超时返回 UNKNOWN_NETWORK"""
-        with patch("buaalogin_cli.service.requests.get") as mock_get:
-            mock_get.side_effect = requests.Timeout("Connection timed out")
-
-            result = get_status()
-            assert result == NetworkStatus.UNKNOWN_NETWORK
+from buaalogin_cli.status import StatusInfo
 
 
 class TestLogin:
@@ -67,7 +31,7 @@ class TestLogin:
         """测试已登录时直接返回，不启动浏览器"""
         from buaalogin_cli.service import login
 
-        mock_get_status.return_value = NetworkStatus.LOGGED_IN
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_IN)
 
         # 不应抛出异常，也不应启动 playwright
         with patch("buaalogin_cli.service.sync_playwright") as mock_pw:
@@ -79,7 +43,7 @@ class TestLogin:
         """测试非校园网环境时抛出 LoginError"""
         from buaalogin_cli.service import login
 
-        mock_get_status.return_value = NetworkStatus.UNKNOWN_NETWORK
+        mock_get_status.return_value = StatusInfo(NetworkStatus.UNKNOWN_NETWORK)
 
         with pytest.raises(LoginError) as exc_info:
             login("user", "pass")
@@ -90,7 +54,7 @@ class TestLogin:
         """测试登录时使用候选选择器填写输入框并点击按钮。"""
         from buaalogin_cli.service import login
 
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
 
         with patch("buaalogin_cli.service.sync_playwright") as mock_pw:
             mock_browser = MagicMock()
@@ -131,6 +95,45 @@ class TestLogin:
         password_locator.fill.assert_called_once_with("pass")
         button_locator.click.assert_called_once_with()
 
+    @patch("buaalogin_cli.service.srun.login")
+    @patch("buaalogin_cli.service.get_status")
+    def test_login_http_engine_skips_browser(self, mock_get_status, mock_srun_login):
+        """测试 HTTP 引擎直接调用认证接口，不启动浏览器"""
+        from buaalogin_cli.service import login
+
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+
+        with patch("buaalogin_cli.service.sync_playwright") as mock_pw:
+            login("user", "pass", engine=LoginEngine.HTTP)
+            mock_pw.assert_not_called()
+
+        mock_srun_login.assert_called_once()
+        assert mock_srun_login.call_args.args == ("user", "pass")
+        assert mock_srun_login.call_args.kwargs["timeout"] == 15.0
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            srun.SrunAuthError("login_error", "用户名或密码错误"),
+            srun.SrunNetworkError("网关请求失败"),
+            srun.SrunProtocolError("无法解析网关响应"),
+        ],
+    )
+    @patch("buaalogin_cli.service.srun.login")
+    @patch("buaalogin_cli.service.get_status")
+    def test_login_http_engine_maps_errors_to_login_error(
+        self, mock_get_status, mock_srun_login, error
+    ):
+        """测试 HTTP 引擎的协议异常被转换为 LoginError"""
+        from buaalogin_cli.service import login
+
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        mock_srun_login.side_effect = error
+
+        with pytest.raises(LoginError, match=str(error)) as exc_info:
+            login("user", "pass", engine=LoginEngine.HTTP)
+        assert exc_info.value.__cause__ is error
+
 
 class TestInstallBrowser:
     """测试浏览器安装逻辑"""
@@ -174,7 +177,7 @@ class TestBrowserAutoInstall:
         """测试浏览器不存在时自动安装"""
         from buaalogin_cli.service import login
 
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
 
         with patch("buaalogin_cli.service.sync_playwright") as mock_pw:
             mock_browser = MagicMock()
@@ -205,7 +208,7 @@ class TestBrowserAutoInstall:
         """测试浏览器已存在时跳过安装"""
         from buaalogin_cli.service import login
 
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
         fake_browser = tmp_path / "chromium"
         fake_browser.write_text("")
 
@@ -241,7 +244,7 @@ class TestBrowserAutoInstall:
         """测试自动安装失败时转换为 LoginError"""
         from buaalogin_cli.service import login
 
-        mock_get_status.return_value = NetworkStatus.LOGGED_OUT
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
 
         with patch("buaalogin_cli.service.sync_playwright") as mock_pw:
             chromium = mock_pw.return_value.__enter__.return_value.chromium
@@ -254,37 +257,188 @@ class TestBrowserAutoInstall:
         mock_install.assert_called_once()
 
 
-class TestGetErrorMessage:
-    """测试 _get_error_message 函数"""
+class TestWarmBrowser:
+    """测试常驻浏览器"""
 
-    def test_error_message_found(self):
-        """测试找到错误信息"""
-        mock_page = MagicMock()
-        mock_elem = MagicMock()
-        mock_elem.is_visible.return_value = True
-        mock_elem.text_content.return_value = "用户名或密码错误"
-        mock_page.locator.return_value.first = mock_elem
+    @pytest.fixture
+    def mock_pw(self, tmp_path):
+        fake_browser = tmp_path / "chromium"
+        fake_browser.write_text("")
+        with patch("buaalogin_cli.service.sync_playwright") as mock_pw:
+            playwright = mock_pw.return_value.start.return_value
+            playwright.chromium.executable_path = str(fake_browser)
+            yield playwright
+
+    def test_page_reuses_browser_across_logins(self, mock_pw):
+        """测试多次打开页面只启动一次浏览器，每次使用新的 context"""
+        browser = mock_pw.chromium.launch.return_value
+        browser.is_connected.return_value = True
+        warm = WarmBrowser()
+
+        with warm.page():
+            pass
+        with warm.page():
+            pass
+
+        mock_pw.chromium.launch.assert_called_once()
+        assert browser.new_context.call_count == 2
+        assert browser.new_context.return_value.close.call_count == 2
+
+    def test_relaunches_after_crash(self, mock_pw):
+        """测试浏览器断开后自动重启"""
+        browser = mock_pw.chromium.launch.return_value
+        browser.is_connected.return_value = True
+        warm = WarmBrowser()
+
+        with warm.page():
+            pass
+        browser.is_connected.return_value = False
+        with warm.page():
+            pass
+
+        assert mock_pw.chromium.launch.call_count == 2
+        browser.close.assert_called_once()
+
+    def test_relaunches_when_new_context_fails(self, mock_pw):
+        """测试驱动失效导致 new_context 失败时重启后重试"""
+        browser = mock_pw.chromium.launch.return_value
+        browser.is_connected.return_value = True
+        browser.new_context.side_effect = [Exception("Target closed"), MagicMock()]
+        warm = WarmBrowser()
+
+        with warm.page():
+            pass
+
+        assert mock_pw.chromium.launch.call_count == 2
+
+    def test_release_if_idle(self, mock_pw):
+        """测试空闲超时后释放浏览器"""
+        browser = mock_pw.chromium.launch.return_value
+        browser.is_connected.return_value = True
+        warm = WarmBrowser(idle_timeout_sec=60)
+
+        with warm.page():
+            pass
+        assert warm.release_if_idle() is False
+
+        warm._last_used -= 61
+        assert warm.release_if_idle() is True
+        browser.close.assert_called_once()
+        mock_pw.stop.assert_called_once()
+        assert warm.is_running is False
 
-        result = _get_error_message(mock_page)
-        assert result == "用户名或密码错误"
+    @patch("buaalogin_cli.service.get_status")
+    def test_login_with_warm_browser_does_not_launch(self, mock_get_status):
+        """测试传入常驻浏览器时登录不再临时启动浏览器"""
+        from buaalogin_cli.service import login
 
-    def test_no_error_message(self):
-        """测试未找到错误信息"""
-        mock_page = MagicMock()
-        mock_elem = MagicMock()
-        mock_elem.is_visible.return_value = False
-        mock_page.locator.return_value.first = mock_elem
+        mock_get_status.return_value = StatusInfo(NetworkStatus.LOGGED_OUT)
+        warm = MagicMock()
+        page = warm.page.return_value.__enter__.return_value
+        page.url = "https://gw.buaa.edu.cn/success"
 
-        result = _get_error_message(mock_page)
-        assert result == "未知错误"
+        with patch("buaalogin_cli.service.sync_playwright") as mock_pw:
+            login("user", "pass", browser=warm)
+            mock_pw.assert_not_called()
 
-    def test_exception_handling(self):
-        """测试异常处理"""
-        mock_page = MagicMock()
-        mock_page.locator.side_effect = Exception("Locator error")
+        page.goto.assert_called_once()
 
-        result = _get_error_message(mock_page)
-        assert result == "无法获取错误信息"
+
+class TestReadLoginError:
+    """测试 _read_login_error 函数"""
+
+    def test_error_message_from_json_body(self):
+        """测试从登录接口 JSON 响应读取错误信息"""
+        response = MagicMock()
+        response.text.return_value = (
+            'jQuery_1({"error": "login_error", "error_msg": "用户名或密码错误"})'
+        )
+
+        assert _read_login_error(response) == "用户名或密码错误"
+
+    def test_success_returns_none(self):
+        """测试登录成功时返回 None"""
+        response = MagicMock()
+        response.text.return_value = 'jQuery_1({"error": "ok", "res": "ok"})'
+
+        assert _read_login_error(response) is None
+
+    def test_unparsable_body(self):
+        """测试无法解析响应体时返回提示"""
+        response = MagicMock()
+        response.text.return_value = "<html></html>"
+
+        assert _read_login_error(response) == "无法获取错误信息"
+
+
+class TestSubmitLoginForm:
+    """测试提交登录后的结果判定"""
+
+    @staticmethod
+    def _page(url: str = "https://gw.buaa.edu.cn/srun_portal_pc") -> MagicMock:
+        page = MagicMock()
+        page.url = url
+        return page
+
+    def test_waits_for_login_response_instead_of_sleeping(self):
+        """测试等待登录接口响应，而不是固定等待 3 秒"""
+        page = self._page()
+        response = page.expect_response.return_value.__enter__.return_value.value
+        response.url = "https://gw.buaa.edu.cn/cgi-bin/srun_portal?action=login"
+        response.text.return_value = 'cb({"error": "ok"})'
+
+        _submit_login_form(page, "user", "pass", timeout_sec=5)
+
+        page.wait_for_timeout.assert_not_called()
+        assert page.expect_response.call_args.kwargs["timeout"] == 5000
+
+    def test_login_error_from_response_body(self):
+        """测试登录失败时使用响应体中的错误信息"""
+        page = self._page()
+        response = page.expect_response.return_value.__enter__.return_value.value
+        response.url = "https://gw.buaa.edu.cn/cgi-bin/srun_portal?action=login"
+        response.text.return_value = (
+            'cb({"error": "login_error", "error_msg": "E2531: 用户不存在"})'
+        )
+
+        with pytest.raises(LoginError, match="E2531: 用户不存在"):
+            _submit_login_form(page, "user", "pass")
+
+    def test_timeout_raises_login_error(self):
+        """测试超时未收到结果时抛出 LoginError"""
+        page = self._page()
+        page.expect_response.return_value.__enter__.side_effect = PlaywrightTimeout(
+            "Timeout"
+        )
+
+        with pytest.raises(LoginError, match="等待登录结果超时"):
+            _submit_login_form(page, "user", "pass", timeout_sec=2)
+
+    def test_timeout_but_navigated_to_success(self):
+        """测试超时但页面已跳转到成功页时视为成功"""
+        page = self._page("https://gw.buaa.edu.cn/srun_portal_success")
+        page.expect_response.return_value.__enter__.side_effect = PlaywrightTimeout(
+            "Timeout"
+        )
+
+        _submit_login_form(page, "user", "pass")
+
+    @pytest.mark.parametrize(
+        ("url", "resource_type", "expected"),
+        [
+            ("https://gw.buaa.edu.cn/cgi-bin/srun_portal?action=login", "xhr", True),
+            ("https://gw.buaa.edu.cn/srun_portal_success?ac_id=1", "document", True),
+            ("https://gw.buaa.edu.cn/static/success.png", "image", False),
+            ("https://gw.buaa.edu.cn/cgi-bin/rad_user_info", "xhr", False),
+        ],
+    )
+    def test_is_login_result(self, url, resource_type, expected):
+        """测试只匹配登录接口响应或成功页导航"""
+        response = MagicMock()
+        response.url = url
+        response.request.resource_type = resource_type
+
+        assert _is_login_result(response) is expected
 
 
 class TestLoginError:
@@ -298,22 +452,3 @@ class TestLoginError:
     def test_login_error_is_exception(self):
         """测试 LoginError 是 Exception 子类"""
         assert issubclass(LoginError, Exception)
-
-
-class TestNetworkStatus:
-    """测试 NetworkStatus 枚举"""
-
-    def test_enum_values_exist(self):
-        """测试枚举值存在"""
-        assert hasattr(NetworkStatus, "UNKNOWN_NETWORK")
-        assert hasattr(NetworkStatus, "LOGGED_OUT")
-        assert hasattr(NetworkStatus, "LOGGED_IN")
-
-    def test_enum_values_are_unique(self):
-        """测试枚举值唯一"""
-        values = [
-            NetworkStatus.UNKNOWN_NETWORK,
-            NetworkStatus.LOGGED_OUT,
-            NetworkStatus.LOGGED_IN,
-        ]
-        assert len(values) == len(set(values))
@@ -0,0 +1,117 @@
+"""srun 模块单元测试"""
+
+import time
+
+import pytest
+
+from buaalogin_cli import srun
+from buaalogin_cli.srun import (
+    SrunAuthError,
+    SrunClient,
+    SrunNetworkError,
+    SrunProtocolError,
+    checksum,
+    encode_info,
+    hmac_md5,
+    parse_jsonp,
+    xencode,
+)
+
+
+class TestEncoding:
+    """测试加密参数生成（与深澜前端实现的结果比对）"""
+
+    def test_encode_info_matches_reference(self):
+        """测试 info 参数与参考实现一致"""
+        info = encode_info(
+            "test_user", "test_password", "10.0.0.2", "1", "challenge-token"
+        )
+        assert info == (
+            "{SRBX1}RBfjYS1IH4a376b9UmarXULOusWlFxWWDn2PcMtY4F3lvX7JCj+vMsExHdGPncSJn"
+            "IO2IpTJ9lfpfXsQPbSAQqPSh2s0/D4oBBRm0z4mN7bAcsRZL1r5TLYHkY+x2pxh4YXFYSdaRft="
+        )
+
+    def test_hmac_md5(self):
+        """测试 HMAC-MD5 以 challenge 为密钥"""
+        assert hmac_md5("challenge-token", "test_password") == (
+            "030d17a2b98da738c37be554b173f45c"
+        )
+
+    def test_xencode_empty_message(self):
+        """测试空消息返回空字符串"""
+        assert xencode("", "key") == ""
+
+    def test_checksum_is_sha1_hex(self):
+        """测试 chksum 为 40 位十六进制 SHA1"""
+        value = checksum("t", "u", "h", "1", "10.0.0.2", "info")
+        assert len(value) == 40
+        int(value, 16)
+
+
+class TestParseJsonp:
+    """测试 JSONP 响应解析"""
+
+    def test_parse_callback_wrapped(self):
+        """测试解析带回调包裹的响应"""
+        assert parse_jsonp('jQuery_1({"error": "ok"})') == {"error": "ok"}
+
+    def test_parse_plain_json(self):
+        """测试解析裸 JSON 响应"""
+        assert parse_jsonp('{"error": "ok"}') == {"error": "ok"}
+
+    def test_parse_invalid_raises_protocol_error(self):
+        """测试无法解析时抛出 SrunProtocolError"""
+        with pytest.raises(SrunProtocolError):
+            parse_jsonp("<html>not json</html>")
+
+
+class TestSrunClient:
+    """测试 SrunClient 与本地网关替身的交互"""
+
+    def test_get_ac_id_from_redirect(self, srun_gateway):
+        """测试从首页重定向地址读取 ac_id"""
+        assert SrunClient(srun_gateway.url).get_ac_id() == "1"
+
+    def test_login_success(self, srun_gateway, sample_credentials):
+        """测试凭据正确时登录成功"""
+        result = srun.login(
+            sample_credentials["username"],
+            sample_credentials["password"],
+            base_url=srun_gateway.url,
+        )
+
+        assert result["error"] == "ok"
+        assert srun_gateway.logged_in
+        assert srun_gateway.requests == [
+            "/",
+            "/srun_portal_pc",
+            "/cgi-bin/get_challenge",
+            "/cgi-bin/srun_portal",
+        ]
+
+    def test_login_wrong_password_raises_auth_error(
+        self, srun_gateway, sample_credentials
+    ):
+        """测试密码错误时抛出 SrunAuthError 并携带网关错误信息"""
+        with pytest.raises(SrunAuthError, match="用户名或密码错误") as exc_info:
+            srun.login(
+                sample_credentials["username"], "wrong", base_url=srun_gateway.url
+            )
+
+        assert exc_info.value.code == "login_error"
+        assert not srun_gateway.logged_in
+
+    def test_login_is_fast(self, srun_gateway, sample_credentials):
+        """测试纯 HTTP 登录在本地网关上耗时远小于浏览器登录"""
+        start = time.perf_counter()
+        srun.login(
+            sample_credentials["username"],
+            sample_credentials["password"],
+            base_url=srun_gateway.url,
+        )
+        assert time.perf_counter() - start < 1.0
+
+    def test_unreachable_gateway_raises_network_error(self):
+        """测试网关不可达时抛出 SrunNetworkError"""
+        with pytest.raises(SrunNetworkError):
+            SrunClient("http://127.0.0.1:9", timeout=0.5).get_ac_id()
@@ -0,0 +1,163 @@
+"""status 模块单元测试"""
+
+from unittest.mock import patch
+
+import pytest
+import requests
+from msgspec import json as msgjson
+
+from buaalogin_cli import log as log_module
+from buaalogin_cli.log import Deduplicator, logger
+from buaalogin_cli.status import (
+    NetworkStatus,
+    StatusInfo,
+    get_status,
+    parse_rad_user_info,
+)
+
+
+class TestParseRadUserInfo:
+    """测试 rad_user_info 响应解析"""
+
+    def test_not_online(self):
+        """测试 not_online_error 解析为 LOGGED_OUT"""
+        assert parse_rad_user_info("not_online_error\n") == StatusInfo(
+            NetworkStatus.LOGGED_OUT
+        )
+
+    def test_session_fields(self):
+        """测试解析账号、登录时间、在线时长和流量"""
+        info = parse_rad_user_info("93830,1770015058,1770020128,59831052")
+
+        assert info.status == NetworkStatus.LOGGED_IN
+        assert info.user == "93830"
+        assert info.login_time == 1770015058
+        assert info.online_seconds == 5070
+        assert info.bytes_used == 59831052
+        assert info.client_ip is None
+
+    def test_client_ip(self):
+        """测试从后续字段中识别本机 IP"""
+        info = parse_rad_user_info(
+            "test_user,1770015058,1770020128,59831052,0,0,0,0,10.134.2.17,,0"
+        )
+        assert info.client_ip == "10.134.2.17"
+
+    def test_malformed_numbers(self):
+        """测试字段缺失或非数字时对应属性为 None，仍视为已登录"""
+        info = parse_rad_user_info("test_user,abc")
+
+        assert info.status == NetworkStatus.LOGGED_IN
+        assert info.user == "test_user"
+        assert info.login_time is None
+        assert info.online_seconds is None
+        assert info.bytes_used is None
+
+    def test_json_encoding(self):
+        """测试可直接编码为 JSON，状态以字符串表示"""
+        info = parse_rad_user_info("u,100,160,2048")
+        data = msgjson.decode(msgjson.encode(info))
+
+        assert data == {
+            "status": "logged_in",
+            "user": "u",
+            "login_time": 100,
+            "online_seconds": 60,
+            "bytes_used": 2048,
+            "client_ip": None,
+        }
+
+
+class TestGetStatus:
+    """测试 get_status 函数"""
+
+    @pytest.fixture
+    def mock_session(self):
+        with patch("buaalogin_cli.gateway.get_session") as mock_get_session:
+            yield mock_get_session.return_value
+
+    def test_logged_in_returns_logged_in(self, mock_session):
+        """测试已登录状态返回 LOGGED_IN（API 返回用户信息）"""
+        # API 返回逗号分隔的用户信息表示已登录
+        mock_session.get.return_value.text = "93830,1770015058,1770020128,59831052"
+
+        result = get_status()
+        assert result.status == NetworkStatus.LOGGED_IN
+        assert result.bytes_used == 59831052
+
+    def test_logged_out_with_not_online_error(self, mock_session):
+        """测试 API 返回 not_online_error 时返回 LOGGED_OUT"""
+        mock_session.get.return_value.text = "not_online_error"
+
+        result = get_status()
+        assert result.status == NetworkStatus.LOGGED_OUT
+
+    @patch("buaalogin_cli.gateway.reset_session")
+    def test_connection_error_returns_unknown_network(self, mock_reset, mock_session):
+        """测试连接错误返回 UNKNOWN_NETWORK，并重置连接池"""
+        mock_session.get.side_effect = requests.ConnectionError("Connection failed")
+
+        result = get_status()
+        assert result.status == NetworkStatus.UNKNOWN_NETWORK
+        mock_reset.assert_called_once_with()
+
+    @patch("buaalogin_cli.gateway.reset_session")
+    def test_timeout_returns_unknown_network(self, mock_reset, mock_session):
+        """测试超时返回 UNKNOWN_NETWORK"""
+        mock_session.get.side_effect = requests.Timeout("Connection timed out")
+
+        result = get_status()
+        assert result.status == NetworkStatus.UNKNOWN_NETWORK
+
+    def test_uses_shared_session(self, mock_session):
+        """测试复用共享会话，而非每次调用 requests.get"""
+        mock_session.get.return_value.text = "not_online_error"
+
+        with patch("requests.get") as mock_get:
+            get_status()
+            get_status()
+            mock_get.assert_not_called()
+
+        assert mock_session.get.call_count == 2
+
+    def test_probe_logs_collapse_across_ticks(self, mock_session, monkeypatch):
+        """测试每次响应的时间与流量不同，探测日志仍能合并为重复日志"""
+        deduplicator = Deduplicator(3600, clock=lambda: 0.0)
+        monkeypatch.setattr(log_module, "_dedup", deduplicator)
+        emitted = []
+        handler_id = logger.add(
+            lambda message: emitted.append(message.record["message"]),
+            format="{message}",
+            level="DEBUG",
+            filter=log_module._not_repeated,
+        )
+        try:
+            for tick in range(5):
+                mock_session.get.return_value.text = (
+                    f"93830,1770015058,{1770020128 + 60 * tick},{59831052 + tick}"
+                )
+                get_status()
+        finally:
+            logger.remove(handler_id)
+
+        assert len(emitted) == 2
+        assert emitted[1] == "网络状态: 已登录 (账号: 93830, IP: 未知)"
+
+
+class TestNetworkStatus:
+    """测试 NetworkStatus 枚举"""
+
+    def test_enum_values_exist(self):
+        """测试枚举值存在"""
+        assert hasattr(NetworkStatus, "UNKNOWN_NETWORK")
+        assert hasattr(NetworkStatus, "LOGGED_OUT")
+        assert hasattr(NetworkStatus, "LOGGED_IN")
+
+    def test_enum_values_are_unique(self):
+        """测试枚举值唯一"""
+        values = [
+            NetworkStatus.UNKNOWN_NETWORK,
+            NetworkStatus.LOGGED_OUT,
+            NetworkStatus.LOGGED_IN,
+        ]
+        assert len(values) == len(set(values))
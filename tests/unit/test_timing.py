@@ -0,0 +1,136 @@
+"""timing 模块单元测试"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from buaalogin_cli import timing
+from buaalogin_cli.log import logger
+from buaalogin_cli.service import _submit_login_form
+from buaalogin_cli.timing import RollingHistogram, SpanStats, span, trace
+
+
+@pytest.fixture
+def records():
+    """收集 timing 输出的日志记录。"""
+    collected = []
+    handler_id = logger.add(
+        lambda message: collected.append(message.record),
+        level="DEBUG",
+        filter=lambda record: "spans" in record["extra"],
+    )
+    yield collected
+    logger.remove(handler_id)
+
+
+class TestTrace:
+    """测试嵌套计时区间"""
+
+    def test_nested_spans_form_tree(self, records):
+        """测试嵌套的区间按层级记录，并输出一条结构化日志"""
+        stats = SpanStats()
+        with trace("login", stats=stats):
+            with span("launch"):
+                pass
+            with span("page"):
+                with span("goto"):
+                    pass
+                with span("load-state"):
+                    pass
+
+        assert len(records) == 1
+        tree = records[0]["extra"]["spans"]
+        assert tree["name"] == "login"
+        assert [c["name"] for c in tree["children"]] == ["launch", "page"]
+        assert [c["name"] for c in tree["children"][1]["children"]] == [
+            "goto",
+            "load-state",
+        ]
+        assert records[0]["extra"]["ok"] is True
+        assert set(stats.summaries()) == {
+            "login",
+            "launch",
+            "page",
+            "page.goto",
+            "page.load-state",
+        }
+
+    def test_span_outside_trace_is_noop(self, records):
+        """测试没有进行中的 trace 时 span 不记录"""
+        with span("launch"):
+            pass
+
+        assert records == []
+
+    def test_failure_is_recorded(self, records):
+        """测试异常时仍输出日志并标记失败，异常照常抛出"""
+        stats = SpanStats()
+        with pytest.raises(ValueError, match="boom"), trace("login", stats=stats):
+            with span("goto"):
+                raise ValueError("boom")
+
+        assert records[0]["extra"]["ok"] is False
+        assert "失败" in records[0]["message"]
+        assert stats.summaries()["goto"].count == 1
+
+    def test_nested_trace_becomes_span(self, records):
+        """测试嵌套的 trace 只由最外层输出"""
+        stats = SpanStats()
+        with trace("outer", stats=stats), trace("inner", stats=stats):
+            pass
+
+        assert len(records) == 1
+        assert records[0]["extra"]["spans"]["children"][0]["name"] == "inner"
+
+
+class TestRollingHistogram:
+    """测试滚动直方图"""
+
+    def test_window_drops_old_samples(self):
+        """测试只保留最近的样本"""
+        histogram = RollingHistogram(window=3)
+        for value in (10.0, 0.1, 0.2, 0.3):
+            histogram.observe(value)
+
+        summary = histogram.summary()
+        assert summary.count == 3
+        assert summary.max == 0.3
+
+    def test_quantiles_and_buckets(self):
+        """测试分位数与分桶计数"""
+        histogram = RollingHistogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 2.0):
+            histogram.observe(value)
+
+        assert histogram.counts() == [1, 2, 1]
+        assert histogram.quantile(0.5) == 0.5
+        assert histogram.quantile(1.0) == 2.0
+
+    def test_empty(self):
+        """测试没有样本时返回零值"""
+        histogram = RollingHistogram()
+
+        assert histogram.summary().count == 0
+        assert histogram.quantile(0.95) == 0.0
+        assert timing.format_summaries({"login": histogram.summary()}) == ""
+
+
+def test_submit_login_form_records_phases(records):
+    """测试登录表单提交的各阶段均有计时"""
+    page = MagicMock()
+    page.url = "https://gw.buaa.edu.cn/srun_portal_pc"
+    response = page.expect_response.return_value.__enter__.return_value.value
+    response.url = "https://gw.buaa.edu.cn/cgi-bin/srun_portal?action=login"
+    response.text.return_value = 'cb({"error": "ok"})'
+    stats = SpanStats()
+
+    with trace("login", stats=stats):
+        _submit_login_form(page, "user", "pass")
+
+    assert set(stats.summaries()) >= {
+        "page.goto",
+        "page.load-state",
+        "fill",
+        "submit.click",
+        "submit.result",
+    }
@@ -0,0 +1,125 @@
+"""worker 模块单元测试"""
+
+import os
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+from buaalogin_cli import timing, worker
+from buaalogin_cli.log import logger
+from buaalogin_cli.service import LoginError
+from buaalogin_cli.worker import Isolation
+
+SRC_DIR = Path(__file__).parents[2] / "src"
+
+# 以替身 login 运行真实的子进程入口，验证管道协议
+FAKE_WORKER = textwrap.dedent(
+    """
+    import sys
+    from buaalogin_cli import service, timing, worker
+
+    def fake_login(username, password, **kwargs):
+        with timing.trace("login"):
+            with timing.span("goto"):
+                service.logger.bind(trigger="login").info(f"登录 {username}")
+        if password != "pw":
+            raise service.LoginError("E2901: 密码错误")
+
+    service.login = fake_login
+    sys.exit(worker.main())
+    """
+)
+
+
+@pytest.fixture
+def worker_command(monkeypatch):
+    """替换子进程命令，返回设置函数。"""
+    monkeypatch.setenv(
+        "PYTHONPATH", os.pathsep.join([str(SRC_DIR), os.environ.get("PYTHONPATH", "")])
+    )
+
+    def use(code: str) -> None:
+        monkeypatch.setattr(
+            worker, "_worker_command", lambda: [sys.executable, "-c", code]
+        )
+
+    return use
+
+
+@pytest.fixture
+def messages():
+    collected = []
+    handler_id = logger.add(
+        lambda m: collected.append(m.record["message"]), level="DEBUG"
+    )
+    yield collected
+    logger.remove(handler_id)
+
+
+class TestLoginIsolated:
+    """测试隔离登录"""
+
+    def test_success_forwards_logs_and_spans(self, worker_command, messages):
+        """测试成功时转发子进程日志，并计入子进程的计时"""
+        worker_command(FAKE_WORKER)
+        timing.login_stats.clear()
+
+        worker.login_isolated("user", "pw", isolation=Isolation())
+
+        assert "登录 user" in messages
+        assert set(timing.login_stats.summaries()) == {"login", "goto"}
+        timing.login_stats.clear()
+
+    def test_login_error_from_child(self, worker_command):
+        """测试子进程登录失败时抛出其错误信息"""
+        worker_command(FAKE_WORKER)
+
+        with pytest.raises(LoginError, match="E2901: 密码错误"):
+            worker.login_isolated("user", "wrong", isolation=Isolation())
+
+    def test_crash_raises_login_error(self, worker_command):
+        """测试子进程异常退出时抛出 LoginError"""
+        worker_command("import sys; sys.exit(3)")
+
+        with pytest.raises(LoginError, match="退出码 3"):
+            worker.login_isolated("user", "pw", isolation=Isolation())
+
+    @pytest.mark.skipif(os.name != "posix", reason="需要进程组")
+    def test_deadline_kills_process_group(self, worker_command, tmp_path):
+        """测试超过截止时间后子进程及其子孙进程均被结束"""
+        pid_file = tmp_path / "grandchild.pid"
+        worker_command(
+            textwrap.dedent(
+                f"""
+                import subprocess, sys, time
+                child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+                open({str(pid_file)!r}, "w").write(str(child.pid))
+                time.sleep(60)
+                """
+            )
+        )
+
+        start = time.monotonic()
+        with pytest.raises(LoginError, match="强制终止"):
+            worker.login_isolated("user", "pw", isolation=Isolation(deadline_sec=1))
+
+        assert time.monotonic() - start < 10
+        grandchild = int(pid_file.read_text())
+        assert _wait_gone(grandchild)
+
+
+def _wait_gone(pid: int, timeout: float = 5.0) -> bool:
+    """等待进程退出（被 init 回收前的僵尸进程也视为已退出）。"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            stat = Path(f"/proc/{pid}/stat").read_text()
+        except FileNotFoundError:
+            return True
+        if stat[stat.rfind(")") + 2] == "Z":
+            return True
+        time.sleep(0.05)
+    return False